@@ -1,14 +1,63 @@
 # app/api/v1/endpoints/flood.py
+import asyncio
 import logging
 import traceback
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from contextlib import aclosing
+from typing import List
+from fastapi import (
+    APIRouter, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect, status,
+)
+from fastapi.responses import StreamingResponse
+from app.core.executor import ExecutorSaturatedError
+from app.services.camera_service import CameraSession
 from app.services.flood_service import FloodModelService
-from app.models.flood import FloodPredictionResponse
+from app.models.flood import FloodPredictionRequest, FloodPredictionResponse, FloodBatchPredictionItem
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _ensure_models_ready():
+    if not FloodModelService.is_ready():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction models are not ready yet. Check /readyz or the server startup logs.",
+        )
+
+
+def _to_http_exception(e: Exception, endpoint: str) -> HTTPException:
+    """Map a prediction-pipeline error onto the HTTP error the frontend expects."""
+    if isinstance(e, HTTPException):
+        return e
+
+    if isinstance(e, ExecutorSaturatedError):
+        logger.warning(f"Inference capacity exhausted: {e}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction service is at capacity. Please retry shortly.",
+        )
+
+    if isinstance(e, FileNotFoundError):
+        logger.error(f"Model file missing: {e}")
+        return HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Model file not found: {e}. Ensure all model files exist in /ml_models/.",
+        )
+
+    if isinstance(e, ValueError):
+        logger.warning(f"Invalid input to {endpoint}: {e}")
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    logger.error(f"Unexpected error in {endpoint}:\n" + traceback.format_exc())
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=str(e),
+    )
+
+
 @router.post("/predict-flood/", response_model=FloodPredictionResponse)
 async def predict_flood(image: UploadFile = File(...), request: str = Form(...)):
     """
@@ -21,37 +70,119 @@ async def predict_flood(image: UploadFile = File(...), request: str = Form(...))
     All error detail values are plain strings so the frontend renders them directly.
     """
     try:
-        if not (
-            FloodModelService.vgg_model
-            and FloodModelService.xgb_model
-            and FloodModelService.scaler
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Prediction models are not loaded. Please check server startup logs.",
-            )
+        _ensure_models_ready()
         return await FloodModelService.predict_flood(image, request)
+    except Exception as e:
+        raise _to_http_exception(e, "predict-flood")
 
-    except HTTPException:
-        raise
 
-    except FileNotFoundError as e:
-        logger.error(f"Model file missing: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Model file not found: {e}. Ensure all model files exist in /ml_models/.",
-        )
+@router.post("/predict-flood/batch", response_model=List[FloodPredictionResponse])
+async def predict_flood_batch(
+    images: List[UploadFile] = File(...),
+    request: str = Form(...),
+    stream: bool = Form(False),
+):
+    """
+    Batched flood prediction for many drain-camera images in one call.
 
-    except ValueError as e:
-        logger.warning(f"Invalid input to predict-flood: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e),
-        )
+    `request` is a JSON list of {"lat", "lon"} objects, one per uploaded image
+    in the same order. Returns a list of FloodPredictionResponse in upload
+    order, or — with stream=true — an NDJSON stream of
+    {"index", "result"} lines emitted as each row completes.
+    """
+    try:
+        _ensure_models_ready()
+        results = await FloodModelService.predict_flood_batch(images, request)
+    except Exception as e:
+        raise _to_http_exception(e, "predict-flood/batch")
+
+    if stream:
+        async def ndjson():
+            # aclosing: a client disconnect cancels the rows still in flight
+            async with aclosing(results):
+                async for index, result in results:
+                    item = FloodBatchPredictionItem(index=index, result=result)
+                    yield item.model_dump_json() + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    ordered = [None] * len(images)
+    async with aclosing(results):
+        async for index, result in results:
+            ordered[index] = result
+    return ordered
+
+
+@router.websocket("/predict-flood/stream")
+async def predict_flood_stream(websocket: WebSocket):
+    """
+    Persistent ingestion for fixed drain cameras.
+
+    The camera sends one JSON text message {"lat", "lon"} to register, then
+    streams frames as binary messages. The server answers
+    {"event": "registered"} and afterwards pushes
+    {"event": "prediction", "frame", "result"} only when the flood risk
+    changes; `result` is a FloodPredictionResponse. Unchanged scenes skip the
+    CNN and inference runs at most once per
+    CAMERA_MIN_INFERENCE_INTERVAL_SECONDS per camera (see CameraSession).
+    Per-frame problems are reported as {"event": "error", "detail"} without
+    closing the connection.
+    """
+    await websocket.accept()
+    if not FloodModelService.is_ready():
+        await websocket.close(code=1013, reason="Prediction models are not ready yet.")
+        return
 
+    try:
+        registration = FloodPredictionRequest(**await websocket.receive_json())
+    except WebSocketDisconnect:
+        return
     except Exception as e:
-        logger.error("Unexpected error in predict-flood:\n" + traceback.format_exc())
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        )
+        await websocket.close(code=1007, reason=f"Invalid registration: {e}"[:120])
+        return
+
+    session = CameraSession(registration.lat, registration.lon)
+    send_lock = asyncio.Lock()
+
+    async def send(message: dict):
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def send_error(e: Exception):
+        CameraSession.errors += 1
+        await send({"event": "error", "detail": _to_http_exception(e, "predict-flood/stream").detail})
+
+    async def receive_frames():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is None:
+                continue  # frames are binary; ignore stray text messages
+            try:
+                session.submit(message["bytes"])
+            except ValueError as e:
+                await send_error(e)
+
+    async def push_updates():
+        while True:
+            try:
+                update = await session.process_next()
+            except Exception as e:
+                await send_error(e)
+                continue
+            if update is not None:
+                await send(update)
+
+    await send({"event": "registered", "lat": registration.lat, "lon": registration.lon})
+    tasks = [asyncio.create_task(receive_frames()), asyncio.create_task(push_updates())]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.error(f"Camera stream at ({registration.lat}, {registration.lon}) failed: {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        session.close()
@@ -0,0 +1,30 @@
+# app/api/v1/endpoints/health.py
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from app.services.flood_service import FloodModelService
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+async def healthz():
+    """
+    Liveness probe. Answers as soon as the event loop is serving requests,
+    independent of model loading.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    """
+    Readiness probe. 200 only once every model is loaded and warmed up;
+    503 (with per-model status) while the service is still starting.
+    """
+    model_status = FloodModelService.status()
+    if model_status["ready"]:
+        return {"status": "ready", **model_status}
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "starting", **model_status},
+    )
@@ -0,0 +1,24 @@
+# app/api/v1/endpoints/metrics.py
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint (text exposition format).
+
+    - flood_stage_seconds{stage}        : histogram per pipeline stage / span
+    - upstream_request_seconds{upstream}: histogram per Weatherbit / Nominatim / MSG91 call
+    - upstream_errors_total{upstream}   : failed upstream calls
+    - flood_predictions_total{risk,cached}
+    - flood_alerts_total{outcome}       : queued / coalesced / dropped / sent / failed
+    - cache_hits_total, cache_misses_total, cache_entries {cache}
+    - executor_queue_depth, executor_busy_workers, executor_rejected_total {pool}
+    - alert_queue_depth, models_ready
+
+    Counters are per process; with several workers, scrape each one.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,19 +1,77 @@
 # app/api/v1/endpoints/s3.py
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
-from app.services.s3_service import S3Service
+import json
+from typing import Literal, Optional
+from urllib.parse import quote
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from app.core.config import settings
+from app.core.executor import InferenceExecutor
+from app.services.s3_service import S3ImagePrefetcher, S3Service
 
 router = APIRouter()
 
+# Response headers carrying the image details in stream mode (exposed via CORS)
+IMAGE_HEADERS = ["X-Image-Folder", "X-Image-Key", "X-Image-Metadata"]
+
+
+def _image_headers(image: dict) -> dict:
+    headers = {
+        "X-Image-Folder": quote(image["folder"]),
+        "X-Image-Key": quote(image["imageKey"]),
+        "X-Image-Metadata": json.dumps(image["metadata"]),
+        "Cache-Control": "no-store",
+    }
+    if image.get("contentLength") is not None:
+        headers["Content-Length"] = str(image["contentLength"])
+    return headers
+
+
+def _stream(image: dict) -> StreamingResponse:
+    body = image["body"]
+
+    def chunks():
+        # Sync iterator — Starlette runs it in a thread, one chunk at a time
+        try:
+            yield from body.iter_chunks(settings.S3_STREAM_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    return StreamingResponse(chunks(), media_type=image["contentType"], headers=_image_headers(image))
+
 
 @router.get("/get-latest-s3-image")
-async def get_latest_s3_image():
+async def get_latest_s3_image(
+    mode: Optional[Literal["base64", "stream", "presigned"]] = Query(
+        None, description="Response mode; defaults to settings.S3_IMAGE_DEFAULT_MODE"
+    ),
+):
     """
-    Retrieve a random image from S3 and return it as base64.
+    Retrieve a random image from S3 — from the in-memory prefetch buffer when
+    it has one ready (base64 / stream modes), otherwise straight from S3.
+
+    - base64    : JSON {imageBase64, folder, imageKey, metadata} (original shape)
+    - stream    : the raw image bytes, streamed from S3 without buffering;
+                  folder, key (URL-encoded) and metadata (JSON) in X-Image-* headers
+    - presigned : JSON {url, expiresIn, folder, imageKey, metadata}; the client
+                  downloads the image straight from S3
     """
+    mode = mode or settings.S3_IMAGE_DEFAULT_MODE
     try:
-        service = S3Service()
-        result = service.get_random_image_base64()
+        # base64 / stream are served from the prefetch buffer when it has an image
+        if mode != "presigned":
+            image = S3ImagePrefetcher.take()
+            if image is not None:
+                if mode == "stream":
+                    return Response(image["data"], media_type=image["contentType"], headers=_image_headers(image))
+                return JSONResponse(content=S3Service.to_base64_response(image))
+
+        service = await InferenceExecutor.run_io(S3Service.instance)
+        if mode == "stream":
+            return _stream(await InferenceExecutor.run_io(service.open_random_image))
+        if mode == "presigned":
+            result = await InferenceExecutor.run_io(service.get_random_image_presigned)
+        else:
+            result = await InferenceExecutor.run_io(service.get_random_image_base64)
         return JSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
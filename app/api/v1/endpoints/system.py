@@ -0,0 +1,50 @@
+# app/api/v1/endpoints/system.py
+from fastapi import APIRouter
+from app.core.executor import InferenceExecutor
+from app.core.http import HttpClients
+from app.core.pipeline import StageGraph
+from app.services.alert_service import AlertDispatcher
+from app.services.camera_service import CameraSession
+from app.services.flood_service import FloodModelService
+from app.services.s3_service import S3ImagePrefetcher, S3Service
+from app.services.weather_service import WeatherService
+from app.utils.mlpipeline import MlPipeline
+from app.utils.weather import DataProcessing
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_stats():
+    """
+    Runtime statistics for capacity tuning.
+
+    - executor    : queue depth, busy workers and totals for the io / cpu pools
+    - vgg_batcher : queue depth and achieved batch sizes for VGG16 inference
+    - shap_cache  : hit / miss counts for cached SHAP rows
+    - weather_cache : hit / miss / coalesced counts for Weatherbit lookups
+    - http_pools  : open / idle / waiting connections per outbound upstream
+    - geocode_cache : hit / miss / coalesced counts for Nominatim lookups
+    - stages      : average / max wall time per /predict-flood/ pipeline stage
+    - alerts      : alert queue depth, send latency, coalesced and dropped counts
+    - startup     : import / load seconds per component at startup
+    - prediction_cache : hit / miss / coalesced counts for repeated /predict-flood/ requests
+    - cameras     : connected cameras and frames received / skipped / run / pushed
+    - s3          : image keys per folder in the key index and its age
+    - s3_prefetch : buffered sample images per folder, bytes held and hit / miss counts
+    """
+    return {
+        "executor": InferenceExecutor.stats(),
+        "vgg_batcher": FloodModelService.vgg_batcher().stats(),
+        "shap_cache": MlPipeline.shap_cache.stats(),
+        "weather_cache": DataProcessing.stats(),
+        "http_pools": HttpClients.stats(),
+        "geocode_cache": WeatherService.stats(),
+        "stages": StageGraph.stats(),
+        "alerts": AlertDispatcher.stats(),
+        "startup": FloodModelService.startup_report,
+        "prediction_cache": FloodModelService.prediction_stats(),
+        "cameras": CameraSession.stats(),
+        "s3": S3Service.stats(),
+        "s3_prefetch": S3ImagePrefetcher.stats(),
+    }
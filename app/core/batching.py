@@ -0,0 +1,119 @@
+# app/core/batching.py
+import asyncio
+import contextvars
+import logging
+
+from app.core.executor import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item requests into one batched call.
+
+    Callers `await submit(item)`; a background worker drains the queue until
+    it holds `max_batch_size` items or `max_wait_ms` has passed since the
+    first one arrived, runs `predict_batch(items)` once on the cpu pool and
+    fans the per-item results back to the waiting callers. While a batch is
+    running, new arrivals queue up and form the next batch.
+    """
+
+    def __init__(self, predict_batch, max_batch_size: int = 8, max_wait_ms: float = 10):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._batches = 0
+        self._items = 0
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            # Fresh context: the worker outlives the request that started it
+            self._worker = asyncio.get_running_loop().create_task(
+                self._run(), context=contextvars.Context()
+            )
+
+    async def submit(self, item):
+        """Queue one item and wait for its individual result."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already waiting without yielding
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (client disconnect) are dropped from the batch
+            batch = [(item, fut) for item, fut in batch if not fut.done()]
+            if not batch:
+                continue
+
+            try:
+                results = await InferenceExecutor.run_cpu(
+                    self.predict_batch, [item for item, _ in batch]
+                )
+            except asyncio.CancelledError:
+                # close() mid-batch: the in-flight callers must not wait forever either
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(RuntimeError("Batcher closed"))
+                raise
+            except Exception as e:
+                logger.error(f"Batched inference failed for {len(batch)} item(s): {e}")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            self._batches += 1
+            self._items += len(batch)
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+        }
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        # Fail anything still queued so no caller waits forever
+        while self._queue is not None and not self._queue.empty():
+            _, fut = self._queue.get_nowait()
+            if not fut.done():
+                fut.set_exception(RuntimeError("Batcher closed"))
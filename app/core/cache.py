@@ -0,0 +1,135 @@
+# app/core/cache.py
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with an optional per-entry TTL.
+
+    Expiry uses wall-clock time so entries can be persisted and reloaded
+    across restarts. maxsize=0 disables the cache (every lookup misses).
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at | None, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float | None = None):
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def dump(self) -> list:
+        """Unexpired entries as (key, expires_at, value), oldest first."""
+        now = time.time()
+        with self._lock:
+            return [
+                (key, expires_at, value)
+                for key, (expires_at, value) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def load(self, entries):
+        """Restore entries produced by dump(), skipping any that have expired."""
+        now = time.time()
+        with self._lock:
+            for key, expires_at, value in entries:
+                if expires_at is None or expires_at > now:
+                    self._data[key] = (expires_at, value)
+                    self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key onto one execution.
+
+    The first coroutine to ask for a key starts the call as a task; callers
+    arriving while it is in flight await the same task and receive the same
+    result (or exception) instead of repeating the upstream call. The task is
+    shielded, so one caller disconnecting does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: dict = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        call = self._calls.get(key)
+        if call is None:
+            self.calls += 1
+            call = self._calls[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            call.add_done_callback(lambda task: self._finish(key, task))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(call)
+
+    def __contains__(self, key) -> bool:
+        """True while a call for `key` is in flight."""
+        return key in self._calls
+
+    def _finish(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
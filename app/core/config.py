@@ -1,6 +1,7 @@
 # app/core/config.py
+import os
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Literal
 
 
 class Settings(BaseSettings):
@@ -28,6 +29,24 @@ class Settings(BaseSettings):
     RECIPIENT_EMAIL: str  # Destination address (e.g. BMC flood control)
     RECIPIENT_NAME: str = "BMC Flood Control Department"
 
+    # ── S3 sample images ───────────────────────────────────────────
+    S3_ENDPOINT_URL: str = ""  # e.g. a MinIO / moto URL; "" = AWS
+    S3_MAX_POOL_CONNECTIONS: int = 20  # shared boto3 client connection pool
+    S3_INDEX_REFRESH_SECONDS: int = 300  # background re-listing of the image folders
+    S3_IMAGE_DEFAULT_MODE: Literal["base64", "stream", "presigned"] = "base64"  # /get-latest-s3-image
+    S3_PRESIGNED_URL_EXPIRY_SECONDS: int = 300
+    S3_STREAM_CHUNK_SIZE: int = 64 * 1024  # bytes per chunk in stream mode
+    S3_PREFETCH_SIZE: int = 12  # random images buffered in memory, split across folders; 0 = off
+    S3_PREFETCH_MAX_BYTES: int = 64 * 1024 * 1024  # memory cap for the prefetch buffer
+    S3_PREFETCH_CONCURRENCY: int = 4  # parallel downloads while refilling
+    S3_PREFETCH_RETRY_SECONDS: float = 5.0  # pause after a failed refill
+
+    # ── Alert dispatch ─────────────────────────────────────────────
+    ALERT_QUEUE_MAXSIZE: int = 1000  # queued alerts before new ones are dropped
+    ALERT_COALESCE_WINDOW_SECONDS: int = 1800  # one alert per location + risk per window
+    ALERT_COALESCE_PRECISION: int = 4  # lat/lon decimals identifying a location
+    ALERT_BATCH_MAX_SIZE: int = 20  # alerts combined into one MSG91 call
+
     # ── CORS ───────────────────────────────────────────────────────
     ALLOWED_ORIGINS: List[str] = ["*"]
 
@@ -60,6 +79,77 @@ class Settings(BaseSettings):
     XGB_MODEL_PATH: str = "ml_models/xgb.pkl"
     SCALER_PATH: str = "ml_models/scaler.pkl"
 
+    # ── ML: VGG16 inference backend ────────────────────────────────
+    VGG16_BACKEND: Literal["keras", "onnx", "tflite"] = "keras"
+    VGG16_ONNX_PATH: str = "ml_models/vgg16_model.onnx"  # from app.tools.export_onnx
+    ONNX_INTRA_OP_THREADS: int = 0  # 0 = onnxruntime default
+    VGG16_PRECISION: Literal["fp32", "fp16", "int8"] = "fp32"  # quantized modes run on TFLite
+    VGG16_MIN_AGREEMENT: float = 0.98  # refuse quantized mode below this class agreement
+    TFLITE_NUM_THREADS: int = 0  # 0 = TFLite default
+
+    # ── Model warm-up ──────────────────────────────────────────────
+    WARMUP_ENABLED: bool = True  # run synthetic inputs through every model before /readyz
+
+    # ── Inference executor ─────────────────────────────────────────
+    INFERENCE_IO_WORKERS: int = 16  # threads for blocking network / disk stages
+    INFERENCE_CPU_WORKERS: int = os.cpu_count() or 2  # threads for CNN / SHAP stages
+    INFERENCE_CPU_MAX_QUEUE: int = 64  # queued CPU jobs before 503; 0 = unbounded
+
+    # ── VGG16 micro-batching ───────────────────────────────────────
+    VGG_BATCH_MAX_SIZE: int = 8  # images per forward pass
+    VGG_BATCH_MAX_WAIT_MS: float = 10  # how long the first image waits for company
+    PREDICT_BATCH_MAX_IMAGES: int = 32  # images accepted by /predict-flood/batch
+    VGG_JPEG_DRAFT_DECODE: bool = True  # decode large JPEGs at reduced scale
+
+    # ── Outbound HTTP pools ────────────────────────────────────────
+    HTTP2_ENABLED: bool = True  # used when the optional 'h2' package is installed
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle pooled connection is kept
+    NOMINATIM_URL: str = "https://nominatim.openstreetmap.org/reverse"
+    NOMINATIM_MAX_CONNECTIONS: int = 4  # Nominatim allows ~1 req/s anyway
+    NOMINATIM_MAX_KEEPALIVE: int = 2
+    MSG91_MAX_CONNECTIONS: int = 10
+    MSG91_MAX_KEEPALIVE: int = 5
+
+    # ── Reverse-geocode cache ──────────────────────────────────────
+    GEOCODE_CACHE_PRECISION: int = 4  # lat/lon decimals per entry (4 ≈ 11 m)
+    GEOCODE_CACHE_TTL_SECONDS: int = 30 * 24 * 3600  # addresses rarely change
+    GEOCODE_CACHE_SIZE: int = 10000
+    GEOCODE_CACHE_PATH: str = ""  # JSON file persisted across restarts; "" = memory only
+    GEOCODE_CACHE_SAVE_SECONDS: int = 600  # periodic save of new entries to GEOCODE_CACHE_PATH; 0 = shutdown only
+    GEOCODE_NEGATIVE_TTL_SECONDS: int = 600  # empty (no address) results are retried after this
+    GEOCODE_MIN_INTERVAL_SECONDS: float = 1.0  # Nominatim usage policy
+    GEOCODE_PREDICT_TIMEOUT_SECONDS: float = 3.0  # predictions stop waiting and use the placeholder
+
+    # ── Weatherbit client ──────────────────────────────────────────
+    WEATHERBIT_URL: str = "https://api.weatherbit.io/v2.0/current"
+    WEATHER_CONNECT_TIMEOUT: float = 3.0  # seconds
+    WEATHER_READ_TIMEOUT: float = 8.0  # seconds
+    WEATHER_MAX_CONNECTIONS: int = 20
+    WEATHER_MAX_KEEPALIVE: int = 10
+    WEATHER_MAX_RETRIES: int = 2  # retries on transport errors / 5xx
+    WEATHER_RETRY_BACKOFF: float = 0.25  # seconds, doubled per attempt, full jitter
+
+    # ── Weather cache ──────────────────────────────────────────────
+    WEATHER_CACHE_PRECISION: int = 2  # lat/lon decimals per bucket (2 ≈ 1.1 km)
+    WEATHER_CACHE_TTL_SECONDS: int = 900  # Weatherbit refreshes observations ~15 min
+    WEATHER_CACHE_SIZE: int = 2048  # buckets kept; 0 = off
+
+    # ── Prediction cache ───────────────────────────────────────────
+    PREDICTION_CACHE_SIZE: int = 1024  # cached /predict-flood/ responses; 0 = off
+    PREDICTION_CACHE_PRECISION: int = 4  # lat/lon decimals in the key (4 ≈ 11 m, one camera)
+
+    # ── Camera streaming (WebSocket) ───────────────────────────────
+    CAMERA_MIN_INFERENCE_INTERVAL_SECONDS: float = 5.0  # per camera; newer frames replace older
+    CAMERA_CHANGE_THRESHOLD_BITS: int = 6  # dHash bits (of 64) that count as a changed scene
+    CAMERA_MAX_FRAME_BYTES: int = 10 * 1024 * 1024
+
+    # ── SHAP ───────────────────────────────────────────────────────
+    SHAP_CACHE_SIZE: int = 4096  # cached SHAP rows keyed by scaled features; 0 = off
+    SHAP_MODE: Literal["shap", "native"] = "shap"  # native = XGBoost pred_contribs; opt in after check_shap_parity
+
+    # ── Observability ──────────────────────────────────────────────
+    SERVER_TIMING_ENABLED: bool = True  # per-request Server-Timing header with stage spans
+
     class Config:
         env_file = ".env"
 
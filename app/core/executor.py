@@ -0,0 +1,137 @@
+# app/core/executor.py
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a bounded pool already holds its maximum number of queued jobs."""
+
+
+class _WorkerPool:
+    """
+    Thread pool that keeps track of how many jobs are waiting and how many
+    workers are busy, and optionally rejects work once its queue is full.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int = 0):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-pool"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._busy = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _invoke(self, job: dict, fn, args, kwargs):
+        with self._lock:
+            if not job["dequeued"]:
+                self._queued -= 1
+                job["dequeued"] = True
+            self._busy += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._busy -= 1
+                self._completed += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` on this pool and await its result."""
+        with self._lock:
+            if self.max_queue and self._queued >= self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturatedError(
+                    f"{self.name} pool is saturated ({self._queued} jobs queued)"
+                )
+            self._queued += 1
+
+        job = {"dequeued": False}
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context vars (per-request timing spans) into the worker
+        context = contextvars.copy_context()
+        try:
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(context.run, self._invoke, job, fn, args, kwargs),
+            )
+        except asyncio.CancelledError:
+            # A job cancelled before a worker picked it up never reaches _invoke
+            with self._lock:
+                if not job["dequeued"]:
+                    self._queued -= 1
+                    job["dequeued"] = True
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "busy_workers": self._busy,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class InferenceExecutor:
+    """
+    Dispatches blocking pipeline stages off the event loop.
+
+    - io  : unbounded-queue thread pool for blocking network / disk calls
+    - cpu : small, bounded pool for CNN / SHAP / XGBoost work, sized to the
+            number of cores so concurrent requests cannot oversubscribe them
+    """
+
+    _io: _WorkerPool | None = None
+    _cpu: _WorkerPool | None = None
+
+    @classmethod
+    def _pools(cls) -> tuple[_WorkerPool, _WorkerPool]:
+        if cls._io is None:
+            cls._io = _WorkerPool("io", settings.INFERENCE_IO_WORKERS)
+        if cls._cpu is None:
+            cls._cpu = _WorkerPool(
+                "cpu",
+                settings.INFERENCE_CPU_WORKERS,
+                max_queue=settings.INFERENCE_CPU_MAX_QUEUE,
+            )
+        return cls._io, cls._cpu
+
+    @classmethod
+    async def run_io(cls, fn, *args, **kwargs):
+        """Run an I/O-bound callable on the io pool."""
+        return await cls._pools()[0].run(fn, *args, **kwargs)
+
+    @classmethod
+    async def run_cpu(cls, fn, *args, **kwargs):
+        """Run a CPU-bound callable on the bounded cpu pool."""
+        return await cls._pools()[1].run(fn, *args, **kwargs)
+
+    @classmethod
+    def stats(cls) -> dict:
+        io, cpu = cls._pools()
+        return {"io": io.stats(), "cpu": cpu.stats()}
+
+    @classmethod
+    def shutdown(cls):
+        for pool in (cls._io, cls._cpu):
+            if pool is not None:
+                pool.shutdown()
+        cls._io = cls._cpu = None
+        logger.info("Inference executor shut down.")
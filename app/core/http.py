@@ -0,0 +1,141 @@
+# app/core/http.py
+import logging
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upstream names used with HttpClients.get()
+NOMINATIM = "nominatim"
+MSG91 = "msg91"
+WEATHERBIT = "weatherbit"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (optional: installed via httpx[http2])
+        return True
+    except ImportError:
+        return False
+
+
+def _upstream_config() -> dict:
+    """Per-upstream timeouts, pool limits and default headers."""
+    expiry = settings.HTTP_KEEPALIVE_EXPIRY
+    return {
+        NOMINATIM: {
+            "timeout": httpx.Timeout(10),
+            "limits": httpx.Limits(
+                max_connections=settings.NOMINATIM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.NOMINATIM_MAX_KEEPALIVE,
+                keepalive_expiry=expiry,
+            ),
+            "headers": {"User-Agent": "xai-flows-api/1.0"},
+        },
+        MSG91: {
+            "timeout": httpx.Timeout(10),
+            "limits": httpx.Limits(
+                max_connections=settings.MSG91_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.MSG91_MAX_KEEPALIVE,
+                keepalive_expiry=expiry,
+            ),
+            "headers": {},
+        },
+        WEATHERBIT: {
+            "timeout": httpx.Timeout(
+                settings.WEATHER_READ_TIMEOUT, connect=settings.WEATHER_CONNECT_TIMEOUT
+            ),
+            "limits": httpx.Limits(
+                max_connections=settings.WEATHER_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WEATHER_MAX_KEEPALIVE,
+                keepalive_expiry=expiry,
+            ),
+            "headers": {},
+        },
+    }
+
+
+class HttpClients:
+    """
+    One pooled httpx.AsyncClient per upstream, shared by every request.
+
+    Created in the application lifespan and closed on shutdown, so geocode,
+    email and weather calls reuse warm keep-alive (and, where the upstream
+    supports it, HTTP/2) connections instead of paying DNS + TCP + TLS per call.
+    Clients are also created lazily on first use, for scripts running outside
+    the app.
+    """
+
+    _clients: dict[str, httpx.AsyncClient] = {}
+
+    @classmethod
+    def _create(cls, name: str) -> httpx.AsyncClient:
+        config = _upstream_config()[name]
+        http2 = settings.HTTP2_ENABLED and _http2_available()
+        return httpx.AsyncClient(
+            timeout=config["timeout"],
+            limits=config["limits"],
+            headers=config["headers"],
+            http2=http2,
+        )
+
+    @classmethod
+    def get(cls, name: str) -> httpx.AsyncClient:
+        client = cls._clients.get(name)
+        if client is None or client.is_closed:
+            client = cls._clients[name] = cls._create(name)
+        return client
+
+    @classmethod
+    async def startup(cls):
+        if settings.HTTP2_ENABLED and not _http2_available():
+            logger.warning("HTTP/2 requested but 'h2' is not installed — using HTTP/1.1.")
+        for name in _upstream_config():
+            cls.get(name)
+        logger.info(f"HTTP client pools ready: {', '.join(cls._clients)}")
+
+    @classmethod
+    async def shutdown(cls):
+        for client in cls._clients.values():
+            await client.aclose()
+        cls._clients = {}
+        logger.info("HTTP client pools closed.")
+
+    @staticmethod
+    def _pool_stats(client: httpx.AsyncClient) -> dict:
+        """
+        Connection counts from httpcore's pool, or {} when they are not
+        available. httpx has no public pool API, so every private attribute
+        is looked up with getattr and the counts are simply omitted if an
+        httpx/httpcore release renames them.
+        """
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        try:
+            connections = list(connections)
+            requests = list(getattr(pool, "_requests", []))
+            return {
+                "open": sum(not c.is_closed() for c in connections),
+                "idle": sum(c.is_idle() for c in connections),
+                "active": sum(not c.is_idle() and not c.is_closed() for c in connections),
+                "waiting": sum(
+                    1 for r in requests if getattr(r, "connection", None) is None
+                ),
+            }
+        except Exception:
+            return {}
+
+    @classmethod
+    def stats(cls) -> dict:
+        limits = _upstream_config()
+        http2 = settings.HTTP2_ENABLED and _http2_available()
+        return {
+            name: {
+                "http2": http2,
+                "max_connections": limits[name]["limits"].max_connections,
+                **cls._pool_stats(client),
+            }
+            for name, client in cls._clients.items()
+        }
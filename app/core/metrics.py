@@ -0,0 +1,189 @@
+# app/core/metrics.py
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core.config import settings
+
+# Per-request list of (span name, seconds), installed by ServerTimingMiddleware.
+# Only the list is mutated below the middleware, so spans recorded in child
+# tasks and (via InferenceExecutor's copied context) worker threads land in it.
+_request_spans: contextvars.ContextVar[list | None] = contextvars.ContextVar("request_spans", default=None)
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_SECONDS = Histogram(
+    "flood_stage_seconds",
+    "Wall time per prediction pipeline stage or span.",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+UPSTREAM_SECONDS = Histogram(
+    "upstream_request_seconds",
+    "Wall time per outbound upstream call (including failed ones).",
+    ["upstream"],
+    buckets=_LATENCY_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors",
+    "Outbound upstream calls that raised or returned an error status.",
+    ["upstream"],
+)
+PREDICTIONS = Counter(
+    "flood_predictions",
+    "Flood predictions returned, by risk level and whether served from cache.",
+    ["risk", "cached"],
+)
+ALERTS = Counter(
+    "flood_alerts",
+    "Flood alert outcomes: queued, coalesced, dropped, sent, failed.",
+    ["outcome"],
+)
+
+
+def record_span(name: str, seconds: float):
+    """Observe `seconds` under flood_stage_seconds{stage=name} and add it to Server-Timing."""
+    STAGE_SECONDS.labels(name).observe(seconds)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+@contextmanager
+def span(name: str):
+    """Time the enclosed block as stage `name` (see record_span)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator form of span() for synchronous functions."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def upstream_call(upstream: str):
+    """
+    Time one outbound call to `upstream`; an exception counts as an upstream
+    error. Call upstream_error() for error responses that do not raise.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.labels(upstream).inc()
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        UPSTREAM_SECONDS.labels(upstream).observe(seconds)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((upstream, seconds))
+
+
+def upstream_error(upstream: str):
+    UPSTREAM_ERRORS.labels(upstream).inc()
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that collects the spans recorded while handling an HTTP
+    request and returns them in a `Server-Timing` header, e.g.
+    `weather;dur=81.2, cnn;dur=35.0, total;dur=120.4`. Spans recorded after
+    the response has started (streamed bodies) are not included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SERVER_TIMING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        spans: list = []
+        token = _request_spans.set(spans)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in spans]
+                entries.append(f"total;dur={(time.perf_counter() - start) * 1000:.1f}")
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", ", ".join(entries).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_spans.reset(token)
+
+
+class _StatsCollector:
+    """
+    Exposes the counters the services already keep for /api/v1/stats (cache
+    hits, queue depths) at scrape time, instead of instrumenting them twice.
+    """
+
+    def describe(self):
+        # Nothing up front — collect() imports services that import this module
+        return []
+
+    def collect(self):
+        # Deferred — these modules import app.core.metrics themselves
+        from app.core.executor import InferenceExecutor
+        from app.services.alert_service import AlertDispatcher
+        from app.services.flood_service import FloodModelService
+        from app.services.weather_service import WeatherService
+        from app.utils.mlpipeline import MlPipeline
+        from app.utils.weather import DataProcessing
+
+        caches = {
+            "prediction": FloodModelService.prediction_cache.stats(),
+            "weather": DataProcessing.cache.stats(),
+            "geocode": WeatherService.cache.stats(),
+            "shap": MlPipeline.shap_cache.stats(),
+        }
+        hits = CounterMetricFamily("cache_hits", "Cache lookups served from memory.", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that missed.", labels=["cache"])
+        size = GaugeMetricFamily("cache_entries", "Entries currently held per cache.", labels=["cache"])
+        for name, stats in caches.items():
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            size.add_metric([name], stats["size"])
+        yield hits
+        yield misses
+        yield size
+
+        queued = GaugeMetricFamily("executor_queue_depth", "Jobs waiting per executor pool.", labels=["pool"])
+        busy = GaugeMetricFamily("executor_busy_workers", "Busy workers per executor pool.", labels=["pool"])
+        rejected = CounterMetricFamily("executor_rejected", "Jobs rejected by a saturated pool.", labels=["pool"])
+        for pool, stats in InferenceExecutor.stats().items():
+            queued.add_metric([pool], stats["queue_depth"])
+            busy.add_metric([pool], stats["busy_workers"])
+            rejected.add_metric([pool], stats["rejected"])
+        yield queued
+        yield busy
+        yield rejected
+
+        yield GaugeMetricFamily(
+            "alert_queue_depth", "Alerts waiting to be sent.", value=AlertDispatcher.stats()["queue_depth"]
+        )
+        yield GaugeMetricFamily("models_ready", "1 once models are loaded and warmed up.", value=int(FloodModelService.is_ready()))
+
+
+REGISTRY.register(_StatsCollector())
@@ -0,0 +1,87 @@
+# app/core/pipeline.py
+import asyncio
+import threading
+import time
+
+from app.core.metrics import record_span
+
+
+class StageGraph:
+    """
+    Minimal async DAG runner for request pipelines.
+
+    Stages are added with the names of the stages they depend on; each stage
+    starts as soon as its dependencies have finished and receives their
+    results as positional arguments (in `after` order). Independent stages
+    therefore overlap, and end-to-end latency approaches the slowest path
+    through the graph rather than the sum of all stages.
+
+    If any stage fails, every stage still pending is cancelled and the error
+    is re-raised from run().
+    """
+
+    # Aggregate wall time per stage name across all runs, for /stats
+    _totals: dict = {}
+    _totals_lock = threading.Lock()
+
+    def __init__(self):
+        self._stages: dict = {}  # name -> (fn, after)
+        self.timings: dict = {}  # name -> seconds, filled in by run()
+
+    def add(self, name: str, fn, after: tuple = ()) -> "StageGraph":
+        """Register `async fn(*results_of_after)` as stage `name`."""
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' already defined")
+        unknown = [dep for dep in after if dep not in self._stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on undefined stage(s) {unknown}")
+        self._stages[name] = (fn, tuple(after))
+        return self
+
+    async def _run_stage(self, name: str, tasks: dict):
+        fn, after = self._stages[name]
+        args = [await tasks[dep] for dep in after]
+        start = time.perf_counter()
+        try:
+            return await fn(*args)
+        finally:
+            self.timings[name] = time.perf_counter() - start
+            record_span(name, self.timings[name])
+
+    async def run(self) -> dict:
+        """Run every stage and return {name: result}."""
+        tasks: dict = {}
+        # Insertion order is a valid topological order (add() enforces it)
+        for name in self._stages:
+            tasks[name] = asyncio.ensure_future(self._run_stage(name, tasks))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            StageGraph._record(self.timings)
+        return {name: task.result() for name, task in tasks.items()}
+
+    @classmethod
+    def _record(cls, timings: dict):
+        with cls._totals_lock:
+            for name, seconds in timings.items():
+                entry = cls._totals.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+                entry["count"] += 1
+                entry["total"] += seconds
+                entry["max"] = max(entry["max"], seconds)
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._totals_lock:
+            return {
+                name: {
+                    "count": e["count"],
+                    "avg_ms": round(1000 * e["total"] / e["count"], 2),
+                    "max_ms": round(1000 * e["max"], 2),
+                }
+                for name, e in cls._totals.items()
+            }
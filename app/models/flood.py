@@ -48,7 +48,8 @@ class FloodPredictionResponse(BaseModel):
     Changes from old shape:
     - location   : typed LocationInfo (was missing — frontend geocoded separately)
     - weather    : typed WeatherInfo  (was a raw Any blob)
-    - alert_sent : bool               (email dispatch now happens server-side)
+    - alert_sent : bool               (alert queued server-side; delivered in the background)
+    - cached     : bool               (served from the prediction cache or a coalesced identical request)
     - removed    : image, weather_data, weather_prediction, weather_metadata raw fields
     """
     prediction:               Dict[str, Any]
@@ -59,3 +60,10 @@ class FloodPredictionResponse(BaseModel):
     drain_blockage_prob:      Optional[float]             = None
     drain_blockage_shap_value: Optional[Any]              = None
     alert_sent:               bool                        = False
+    cached:                   bool                        = False
+
+
+class FloodBatchPredictionItem(BaseModel):
+    """One NDJSON line of a streamed POST /predict-flood/batch response."""
+    index:  int                      # position of the image in the upload
+    result: FloodPredictionResponse
@@ -0,0 +1,178 @@
+# app/services/alert_service.py
+import asyncio
+import contextvars
+import logging
+import time
+
+from app.core.config import settings
+from app.core.metrics import ALERTS
+from app.models.email import FloodAlertEmailPayload
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+
+class AlertDispatcher:
+    """
+    In-process flood alert queue with a background MSG91 sender.
+
+    Predictions only enqueue an alert, so the response never waits on MSG91.
+    An alert whose (location, risk) key was already accepted within
+    ALERT_COALESCE_WINDOW_SECONDS is coalesced into that one instead of being
+    sent again; if its delivery fails the key is released, so the next
+    prediction for that location queues a fresh alert. The sender drains up
+    to ALERT_BATCH_MAX_SIZE queued alerts at a time and sends them as one
+    MSG91 call with one `recipients` entry per alert.
+    """
+
+    _queue: asyncio.Queue | None = None
+    _worker: asyncio.Task | None = None
+    _recent: dict = {}  # coalescing key -> monotonic time the alert was accepted
+    _STOP = None  # queue sentinel: close() asks the sender to finish and exit
+
+    # Counters
+    enqueued = 0
+    coalesced = 0
+    dropped = 0
+    sent = 0
+    failed = 0
+    api_calls = 0
+    _send_seconds_total = 0.0
+    _send_seconds_last = 0.0
+
+    @staticmethod
+    def coalesce_key(payload: FloodAlertEmailPayload) -> tuple:
+        precision = settings.ALERT_COALESCE_PRECISION
+        return (
+            round(float(payload.latitude), precision),
+            round(float(payload.longitude), precision),
+            payload.risk,
+        )
+
+    @classmethod
+    def _ensure_worker(cls):
+        if cls._worker is None or cls._worker.done():
+            if cls._queue is None:
+                cls._queue = asyncio.Queue(maxsize=settings.ALERT_QUEUE_MAXSIZE)
+            # Fresh context: the sender outlives the request that started it
+            cls._worker = asyncio.get_running_loop().create_task(
+                cls._run(), context=contextvars.Context()
+            )
+
+    @classmethod
+    def start(cls):
+        cls._ensure_worker()
+        logger.info("Alert dispatcher started.")
+
+    @classmethod
+    def enqueue(cls, payload: FloodAlertEmailPayload) -> bool:
+        """
+        Queue an alert for background delivery.
+        Returns True if the alert was queued or coalesced into one already
+        accepted, False if it was dropped because the queue is full.
+        """
+        cls._ensure_worker()
+        now = time.monotonic()
+        key = cls.coalesce_key(payload)
+
+        accepted_at = cls._recent.get(key)
+        if accepted_at is not None and now - accepted_at < settings.ALERT_COALESCE_WINDOW_SECONDS:
+            cls.coalesced += 1
+            ALERTS.labels("coalesced").inc()
+            return True
+
+        try:
+            cls._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            cls.dropped += 1
+            ALERTS.labels("dropped").inc()
+            logger.error(f"Alert queue full — dropped alert for {payload.address}")
+            return False
+
+        cls._recent[key] = now
+        cls.enqueued += 1
+        ALERTS.labels("queued").inc()
+        cls._prune(now)
+        return True
+
+    @classmethod
+    def _prune(cls, now: float):
+        if len(cls._recent) > 4 * settings.ALERT_QUEUE_MAXSIZE:
+            window = settings.ALERT_COALESCE_WINDOW_SECONDS
+            cls._recent = {k: t for k, t in cls._recent.items() if now - t < window}
+
+    @classmethod
+    async def _send(cls, batch: list[FloodAlertEmailPayload]):
+        start = time.perf_counter()
+        try:
+            await EmailService.send_flood_alerts(batch)
+            cls.sent += len(batch)
+            ALERTS.labels("sent").inc(len(batch))
+            logger.info(f"Sent {len(batch)} flood alert(s) in one MSG91 call.")
+        except Exception as e:
+            cls.failed += len(batch)
+            ALERTS.labels("failed").inc(len(batch))
+            # Only delivered alerts hold the coalescing window
+            for payload in batch:
+                cls._recent.pop(cls.coalesce_key(payload), None)
+            logger.error(f"Flood alert email failed (non-critical): {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            cls.api_calls += 1
+            cls._send_seconds_total += elapsed
+            cls._send_seconds_last = elapsed
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            payload = await cls._queue.get()
+            if payload is cls._STOP:
+                return
+            batch = [payload]
+            stopping = False
+            while len(batch) < settings.ALERT_BATCH_MAX_SIZE and not cls._queue.empty():
+                payload = cls._queue.get_nowait()
+                if payload is cls._STOP:
+                    stopping = True
+                    break
+                batch.append(payload)
+            await cls._send(batch)
+            if stopping:
+                return
+
+    @classmethod
+    async def close(cls):
+        """
+        Stop the sender, flushing whatever is still queued. The sentinel is
+        queued behind every pending alert, so a send already in flight
+        finishes instead of being cancelled.
+        """
+        if cls._worker is not None:
+            if not cls._worker.done():
+                await cls._queue.put(cls._STOP)
+                await cls._worker
+            cls._worker = None
+
+        # Alerts left behind by a sender that died
+        pending = []
+        while cls._queue is not None and not cls._queue.empty():
+            pending.append(cls._queue.get_nowait())
+        for i in range(0, len(pending), settings.ALERT_BATCH_MAX_SIZE):
+            await cls._send(pending[i : i + settings.ALERT_BATCH_MAX_SIZE])
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "queue_depth": cls._queue.qsize() if cls._queue else 0,
+            "max_queue": settings.ALERT_QUEUE_MAXSIZE,
+            "enqueued": cls.enqueued,
+            "coalesced": cls.coalesced,
+            "dropped": cls.dropped,
+            "sent": cls.sent,
+            "failed": cls.failed,
+            "api_calls": cls.api_calls,
+            "avg_send_ms": round(1000 * cls._send_seconds_total / cls.api_calls, 2)
+            if cls.api_calls
+            else 0.0,
+            "last_send_ms": round(1000 * cls._send_seconds_last, 2),
+        }
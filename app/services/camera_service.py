@@ -0,0 +1,135 @@
+# app/services/camera_service.py
+import asyncio
+import io
+import logging
+import time
+
+from PIL import Image
+
+from app.core.config import settings
+from app.core.executor import InferenceExecutor
+from app.services.flood_service import FloodModelService
+
+logger = logging.getLogger(__name__)
+
+
+def dhash(image_bytes: bytes, size: int = 8) -> int:
+    """
+    64-bit difference hash of a frame: grayscale, shrink to (size+1)×size and
+    record whether each pixel is brighter than its right-hand neighbour.
+    Robust to JPEG noise and small exposure changes, cheap to compute.
+    """
+    img = Image.open(io.BytesIO(image_bytes))
+    img.draft("L", (size * 8, size * 8))  # let libjpeg downscale while decoding
+    pixels = img.convert("L").resize((size + 1, size), Image.BILINEAR).tobytes()
+
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+class CameraSession:
+    """
+    State for one camera streaming frames over the WebSocket endpoint.
+
+    Frames are submitted as they arrive and only the newest one is kept, so a
+    camera sending faster than CAMERA_MIN_INFERENCE_INTERVAL_SECONDS never
+    builds a backlog. Before running the pipeline, the frame's dHash is
+    compared with the last frame that was run: if fewer than
+    CAMERA_CHANGE_THRESHOLD_BITS differ the scene is unchanged and the CNN is
+    skipped — unless the last run is older than one weather window
+    (WEATHER_CACHE_TTL_SECONDS), since the risk also depends on the weather.
+    A result is returned for the camera only when the flood risk changes.
+    """
+
+    # Counters across all cameras, for /stats
+    active = 0
+    frames = 0
+    replaced = 0  # superseded by a newer frame before they were looked at
+    unchanged = 0  # skipped by change detection
+    inferences = 0
+    pushed = 0
+    errors = 0
+
+    def __init__(self, lat: float, lon: float):
+        self.lat = lat
+        self.lon = lon
+        self._latest: bytes | None = None
+        self._frame_number = 0
+        self._pending = asyncio.Event()
+        self._last_hash: int | None = None
+        self._last_run = float("-inf")
+        self._last_risk = None
+        CameraSession.active += 1
+
+    def close(self):
+        CameraSession.active -= 1
+
+    def submit(self, frame: bytes):
+        """Accept a received frame, replacing any frame not yet processed."""
+        if len(frame) > settings.CAMERA_MAX_FRAME_BYTES:
+            raise ValueError(
+                f"Frame too large: {len(frame)} bytes (max {settings.CAMERA_MAX_FRAME_BYTES})."
+            )
+        CameraSession.frames += 1
+        if self._latest is not None:
+            CameraSession.replaced += 1
+        self._latest = frame
+        self._frame_number += 1
+        self._pending.set()
+
+    async def process_next(self) -> dict | None:
+        """
+        Wait for the next frame (and the per-camera rate limit), then run it.
+        Returns the message to push to the camera, or None when the frame was
+        skipped or the risk did not change.
+        """
+        await self._pending.wait()
+        delay = self._last_run + settings.CAMERA_MIN_INFERENCE_INTERVAL_SECONDS - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)  # newer frames keep replacing _latest meanwhile
+
+        frame, number = self._latest, self._frame_number
+        self._latest = None
+        self._pending.clear()
+
+        try:
+            frame_hash = await InferenceExecutor.run_cpu(dhash, frame)
+        except Exception as e:
+            raise ValueError(f"Could not decode frame {number}: {e}")
+
+        stale = time.monotonic() - self._last_run >= settings.WEATHER_CACHE_TTL_SECONDS
+        if (
+            not stale
+            and self._last_hash is not None
+            and bin(frame_hash ^ self._last_hash).count("1") <= settings.CAMERA_CHANGE_THRESHOLD_BITS
+        ):
+            CameraSession.unchanged += 1
+            return None
+
+        self._last_run = time.monotonic()
+        response = await FloodModelService.predict_image(frame, self.lat, self.lon)
+        self._last_hash = frame_hash
+        CameraSession.inferences += 1
+
+        risk = response.prediction.get("flood_risk")
+        if risk == self._last_risk:
+            return None
+        self._last_risk = risk
+        CameraSession.pushed += 1
+        return {"event": "prediction", "frame": number, "result": response.model_dump(mode="json")}
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "active": cls.active,
+            "frames": cls.frames,
+            "replaced": cls.replaced,
+            "unchanged": cls.unchanged,
+            "inferences": cls.inferences,
+            "pushed": cls.pushed,
+            "errors": cls.errors,
+        }
@@ -2,6 +2,8 @@
 import logging
 import httpx
 from app.core.config import settings
+from app.core.http import HttpClients, MSG91
+from app.core.metrics import upstream_call, upstream_error
 from app.models.email import FloodAlertEmailPayload
 
 logger = logging.getLogger(__name__)
@@ -10,11 +12,42 @@ logger = logging.getLogger(__name__)
 class EmailService:
 
     @staticmethod
-    def _build_msg91_payload(payload: FloodAlertEmailPayload) -> dict:
+    def _build_recipient(payload: FloodAlertEmailPayload) -> dict:
+        """One MSG91 `recipients` entry: destination plus template variables."""
+        return {
+            "to": [
+                {
+                    "email": settings.RECIPIENT_EMAIL,
+                    "name": settings.RECIPIENT_NAME,
+                }
+            ],
+            # Keys must match ##placeholder## names in the MSG91 template
+            "variables": {
+                "Timestamp": payload.Timestamp,
+                "risk": payload.risk,
+                "address": payload.address,
+                "latitude": payload.latitude,
+                "longitude": payload.longitude,
+                "temperature": payload.temperature,
+                "precipitation": payload.precipitation,
+                "wind_speed": payload.wind_speed,
+                "humidity": payload.humidity,
+                "visibility": payload.visibility,
+                "condition": payload.condition,
+                "uv_index": payload.uv_index,
+                "pressure": payload.pressure,
+                "cloud_coverage": payload.cloud_coverage,
+            },
+        }
+
+    @staticmethod
+    def _build_msg91_payload(*payloads: FloodAlertEmailPayload) -> dict:
         """
-        Construct the full MSG91 email API payload from a validated
-        FloodAlertEmailPayload. MSG91 uses template variables that map
-        directly to the ##placeholder## tokens in the HTML template.
+        Construct the full MSG91 email API payload from one or more validated
+        FloodAlertEmailPayloads. MSG91 uses template variables that map
+        directly to the ##placeholder## tokens in the HTML template; each
+        payload becomes its own `recipients` entry, so several alerts go out
+        in a single API call.
         """
         return {
             "template_id": settings.MSG91_TEMPLATE_ID,
@@ -22,33 +55,7 @@ class EmailService:
                 "name": settings.SENDER_NAME,
                 "email": settings.SENDER_EMAIL,
             },
-            "recipients": [
-                {
-                    "to": [
-                        {
-                            "email": settings.RECIPIENT_EMAIL,
-                            "name": settings.RECIPIENT_NAME,
-                        }
-                    ],
-                    # Keys must match ##placeholder## names in the MSG91 template
-                    "variables": {
-                        "Timestamp": payload.Timestamp,
-                        "risk": payload.risk,
-                        "address": payload.address,
-                        "latitude": payload.latitude,
-                        "longitude": payload.longitude,
-                        "temperature": payload.temperature,
-                        "precipitation": payload.precipitation,
-                        "wind_speed": payload.wind_speed,
-                        "humidity": payload.humidity,
-                        "visibility": payload.visibility,
-                        "condition": payload.condition,
-                        "uv_index": payload.uv_index,
-                        "pressure": payload.pressure,
-                        "cloud_coverage": payload.cloud_coverage,
-                    },
-                }
-            ],
+            "recipients": [EmailService._build_recipient(p) for p in payloads],
         }
 
     @staticmethod
@@ -58,11 +65,24 @@ class EmailService:
         Constructs the MSG91 API structure internally — callers only
         need to supply the XAI-FLOWS domain fields.
         """
-        msg91_payload = EmailService._build_msg91_payload(payload)
+        result = await EmailService.send_flood_alerts([payload])
+        logger.info(
+            f"Flood alert email sent — risk={payload.risk}, "
+            f"address={payload.address}"
+        )
+        return result
+
+    @staticmethod
+    async def send_flood_alerts(payloads: list[FloodAlertEmailPayload]) -> dict:
+        """
+        Send several flood alert emails in one MSG91 call, one `recipients`
+        entry per payload.
+        """
+        msg91_payload = EmailService._build_msg91_payload(*payloads)
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.post(
+            with upstream_call(MSG91):
+                response = await HttpClients.get(MSG91).post(
                     settings.MSG91_API_URL,
                     headers={
                         "authkey": settings.MSG91_AUTH_KEY,
@@ -70,12 +90,10 @@ class EmailService:
                     },
                     json=msg91_payload,
                 )
-                response.raise_for_status()
-                logger.info(
-                    f"Flood alert email sent — risk={payload.risk}, "
-                    f"address={payload.address}"
-                )
-                return response.json()
+            if response.is_error:
+                upstream_error(MSG91)
+            response.raise_for_status()
+            return response.json()
 
         except httpx.HTTPStatusError as e:
             raise RuntimeError(
@@ -1,13 +1,16 @@
 # app/services/flood_service.py
-import os
+import asyncio
+import hashlib
+import io
 import json
-import tempfile
 import pickle
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 
-import httpx
-from tensorflow.keras.models import load_model
+import numpy as np
 
 from app.models.flood import (
     FloodPredictionRequest,
@@ -18,15 +21,22 @@ from app.models.flood import (
 )
 from app.models.email import FloodAlertEmailPayload
 from app.core.config import settings
+from app.core.executor import InferenceExecutor, ExecutorSaturatedError
+from app.core.batching import MicroBatcher
+from app.core.cache import LRUCache, SingleFlight
+from app.core.metrics import PREDICTIONS
+from app.core.pipeline import StageGraph
+from app.services.alert_service import AlertDispatcher
+from app.services.weather_service import WeatherService
+from app.utils.backends import TFLiteBackend, get_backend_class, load_quantized_backend
+from app.utils.mlpipeline import native_contributions
+from app.utils.model import FloodPredictor
 
 logger = logging.getLogger(__name__)
 
 # Risk levels that trigger an alert email
 _ALERT_RISK_LEVELS = {"High", "Moderate"}
 
-# Nominatim base URL
-_NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
-
 
 def _cloud_coverage_label(clouds: float) -> str:
     """Convert numeric cloud % to a readable label (mirrors frontend getCloudCoverage)."""
@@ -65,25 +75,28 @@ def _build_weather_info(input_data: dict, output_data: dict) -> WeatherInfo:
 
 async def _reverse_geocode(lat: float, lon: float) -> LocationInfo:
     """
-    Call Nominatim to resolve (lat, lon) → address.
-    Falls back to a coordinate-based placeholder on any failure.
+    Resolve (lat, lon) → address through the shared reverse-geocode cache.
+    Falls back to a coordinate-based placeholder on any failure, or when the
+    lookup takes longer than GEOCODE_PREDICT_TIMEOUT_SECONDS (the lookup
+    itself carries on and fills the cache for the next request).
     Never raises — a missing address must not abort the prediction.
     """
     try:
-        headers = {"User-Agent": "xai-flows-api/1.0"}
-        url = f"{_NOMINATIM_URL}?lat={lat}&lon={lon}&format=json"
-        async with httpx.AsyncClient(timeout=8) as client:
-            resp = await client.get(url, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-            address = data.get("display_name", "")
-            city = data.get("address", {}).get("city", "")
-            if address:
-                return LocationInfo(
-                    latitude=lat, longitude=lon,
-                    address=address,
-                    city=city or address.split(",")[0].strip(),
-                )
+        data = await asyncio.wait_for(
+            WeatherService.lookup(lat, lon), settings.GEOCODE_PREDICT_TIMEOUT_SECONDS
+        )
+        address = data["address"]
+        city = data["city"]
+        if address:
+            return LocationInfo(
+                latitude=lat, longitude=lon,
+                address=address,
+                city=city or address.split(",")[0].strip(),
+            )
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Reverse geocode exceeded {settings.GEOCODE_PREDICT_TIMEOUT_SECONDS}s — using placeholder"
+        )
     except Exception as e:
         logger.warning(f"Reverse geocode failed (non-critical): {e}")
 
@@ -95,18 +108,17 @@ async def _reverse_geocode(lat: float, lon: float) -> LocationInfo:
     )
 
 
-async def _send_alert_email(
+def _send_alert_email(
     prediction_result: dict,
     weather: WeatherInfo,
     location: LocationInfo,
 ) -> bool:
     """
-    Build FloodAlertEmailPayload and dispatch via EmailService.
-    Returns True if the email was sent successfully, False otherwise.
-    Never raises — a failed email must not abort the prediction response.
+    Build FloodAlertEmailPayload and hand it to the background AlertDispatcher.
+    Returns True if the alert was queued (or coalesced into an identical
+    recent one), False otherwise. Never raises and never waits on MSG91 —
+    a failed email must not abort or delay the prediction response.
     """
-    from app.services.email_service import EmailService   # local import avoids circular risk
-
     try:
         payload = FloodAlertEmailPayload(
             Timestamp=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
@@ -124,11 +136,7 @@ async def _send_alert_email(
             pressure=f"{weather.pressure:.1f} hPa",
             cloud_coverage=_cloud_coverage_label(weather.clouds),
         )
-        await EmailService.send_flood_alert(payload)
-        logger.info(
-            f"Flood alert email sent — risk={payload.risk}, address={payload.address}"
-        )
-        return True
+        return AlertDispatcher.enqueue(payload)
     except Exception as e:
         logger.error(f"Flood alert email failed (non-critical): {e}")
         return False
@@ -139,125 +147,546 @@ class FloodModelService:
     vgg_model = None
     xgb_model = None
     scaler    = None
+    shap_explainer = None
+    _vgg_batcher: MicroBatcher | None = None
+
+    # Per-component import / load seconds, filled in by load_models()
+    startup_report: dict = {}
+    _load_lock = threading.Lock()
+    _loading = None
+    warmed_up = False
+
+    # Finished /predict-flood/ responses keyed by image content, location and
+    # weather window — fixed cameras and modem retries resend identical frames
+    prediction_cache = LRUCache(settings.PREDICTION_CACHE_SIZE, ttl=settings.WEATHER_CACHE_TTL_SECONDS)
+    _prediction_flight = SingleFlight()
+
+    @classmethod
+    def record_startup(cls, component: str, **seconds):
+        cls.startup_report.setdefault(component, {}).update(
+            {k: round(v, 3) for k, v in seconds.items()}
+        )
+
+    # Heavy ML libraries are imported inside the loaders, not at module import,
+    # so the API can start answering before TensorFlow / XGBoost / SHAP are in.
+
+    @classmethod
+    def _load_vgg(cls):
+        start = time.perf_counter()
+        quantized = settings.VGG16_PRECISION != "fp32"
+        backend_cls = TFLiteBackend if quantized else get_backend_class()
+        backend_cls.import_runtime()
+        imported = time.perf_counter()
+        if quantized:
+            cls.vgg_model = load_quantized_backend(settings.VGG16_PRECISION)
+        else:
+            cls.vgg_model = backend_cls.load(backend_cls.default_path())
+        cls.record_startup("vgg16", import_s=imported - start, load_s=time.perf_counter() - imported)
+        logger.info(f"VGG16 model loaded ({backend_cls.name} backend).")
+
+    @classmethod
+    def _load_xgb(cls):
+        start = time.perf_counter()
+        import xgboost  # noqa: F401  (needed to unpickle the model)
+        imported = time.perf_counter()
+        with open(settings.XGB_MODEL_PATH, "rb") as f:
+            cls.xgb_model = pickle.load(f)
+        cls.record_startup("xgboost", import_s=imported - start, load_s=time.perf_counter() - imported)
+        logger.info("XGBoost model loaded.")
+
+    @classmethod
+    def _load_scaler(cls):
+        start = time.perf_counter()
+        import sklearn  # noqa: F401  (needed to unpickle the scaler)
+        imported = time.perf_counter()
+        with open(settings.SCALER_PATH, "rb") as f:
+            cls.scaler = pickle.load(f)
+        cls.record_startup("scaler", import_s=imported - start, load_s=time.perf_counter() - imported)
+        logger.info("Scaler loaded.")
+
+    @classmethod
+    def _build_explainer(cls):
+        start = time.perf_counter()
+        import shap
+        imported = time.perf_counter()
+        cls.shap_explainer = shap.Explainer(
+            cls.xgb_model, feature_names=list(settings.INPUT_COLUMNS)
+        )
+        cls.record_startup("shap_explainer", import_s=imported - start, load_s=time.perf_counter() - imported)
+        logger.info("SHAP explainer built.")
 
     @classmethod
     def load_models(cls):
-        """Load all ML models once at startup. Idempotent."""
-        if cls.vgg_model is None:
-            try:
-                cls.vgg_model = load_model(settings.VGG16_MODEL_PATH)
-                logger.info("VGG16 model loaded.")
-            except Exception as e:
-                logger.error(f"Error loading VGG16: {e}")
+        """
+        Load all ML models once at startup. Idempotent and thread-safe.
 
-        if cls.xgb_model is None:
-            try:
-                with open(settings.XGB_MODEL_PATH, "rb") as f:
-                    cls.xgb_model = pickle.load(f)
-                logger.info("XGBoost model loaded.")
-            except Exception as e:
-                logger.error(f"Error loading XGBoost: {e}")
+        VGG16, XGBoost and the scaler load concurrently; each becomes
+        available as soon as it finishes. With SHAP_MODE=shap the SHAP
+        explainer is built once the XGBoost model is in, since parsing the
+        ensemble per request dominated the SHAP stage; native mode needs no
+        explainer. Timings per component end up in startup_report.
+        """
+        with cls._load_lock:
+            start = time.perf_counter()
+            loaders = {
+                "VGG16": (cls._load_vgg, cls.vgg_model),
+                "XGBoost": (cls._load_xgb, cls.xgb_model),
+                "Scaler": (cls._load_scaler, cls.scaler),
+            }
+            pending = {name: fn for name, (fn, loaded) in loaders.items() if loaded is None}
+
+            if pending:
+                with ThreadPoolExecutor(
+                    max_workers=len(pending), thread_name_prefix="model-load"
+                ) as pool:
+                    futures = {pool.submit(fn): name for name, fn in pending.items()}
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            logger.error(f"Error loading {futures[future]}: {e}")
+
+            if settings.SHAP_MODE == "shap" and cls.shap_explainer is None and cls.xgb_model is not None:
+                try:
+                    cls._build_explainer()
+                except Exception as e:
+                    logger.error(f"Error building SHAP explainer: {e}")
+
+            cls.record_startup("models_total", wall_s=time.perf_counter() - start)
+            logger.info(f"Startup timing (seconds): {cls.startup_report}")
+
+    @classmethod
+    def models_loaded(cls) -> bool:
+        return bool(cls.vgg_model and cls.xgb_model and cls.scaler)
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        """True once every model is loaded and (unless disabled) warmed up."""
+        return cls.models_loaded() and (cls.warmed_up or not settings.WARMUP_ENABLED)
 
-        if cls.scaler is None:
+    @classmethod
+    def warm_up(cls):
+        """
+        Push synthetic inputs through every stage at production batch sizes so
+        the first real request does not pay for Keras graph tracing, lazy
+        XGBoost / SHAP initialisation or the first JPEG decode. Results (and
+        the SHAP cache) are left untouched.
+        """
+        from PIL import Image
+
+        start = time.perf_counter()
+
+        # Image decode + VGG16 at single-image and micro-batch sizes
+        buffer = io.BytesIO()
+        Image.new("RGB", (640, 480), color=(90, 90, 90)).save(buffer, format="JPEG")
+        predictor = FloodPredictor(model=cls.vgg_model)
+        image_array = predictor.preprocess_image(buffer.getvalue())
+        for batch_size in sorted({1, settings.VGG_BATCH_MAX_SIZE}):
+            predictor.predict_batch([image_array] * batch_size)
+
+        # Scaler → XGBoost → SHAP at single-row and batch sizes
+        for rows in sorted({1, settings.VGG_BATCH_MAX_SIZE}):
+            features = np.zeros((rows, len(settings.INPUT_COLUMNS)), dtype=np.float32)
+            scaled = cls.scaler.transform(features)
+            cls.xgb_model.predict(scaled)
+            if settings.SHAP_MODE == "shap":
+                if cls.shap_explainer is not None:
+                    cls.shap_explainer(scaled)
+            else:
+                native_contributions(cls.xgb_model, scaled)
+
+        cls.warmed_up = True
+        cls.record_startup("warm_up", wall_s=time.perf_counter() - start)
+        logger.info("Models warmed up.")
+
+    @classmethod
+    def _load_and_warm(cls):
+        cls.load_models()
+        if settings.WARMUP_ENABLED and cls.models_loaded() and not cls.warmed_up:
             try:
-                with open(settings.SCALER_PATH, "rb") as f:
-                    cls.scaler = pickle.load(f)
-                logger.info("Scaler loaded.")
+                cls.warm_up()
             except Exception as e:
-                logger.error(f"Error loading Scaler: {e}")
+                logger.error(f"Model warm-up failed — service stays not ready: {e}")
+
+    @classmethod
+    def start_loading(cls):
+        """
+        Load and warm up the models on a background thread and return its
+        future, so the server starts accepting requests (S3, email, geocode,
+        /healthz) immediately. /readyz and the prediction endpoints answer
+        503 until the models are loaded and warm.
+        """
+        if cls._loading is None or cls._loading.done():
+            cls._loading = asyncio.get_running_loop().run_in_executor(None, cls._load_and_warm)
+        return cls._loading
+
+    @classmethod
+    def status(cls) -> dict:
+        return {
+            "ready": cls.is_ready(),
+            "models": {
+                "vgg16": cls.vgg_model is not None,
+                "xgboost": cls.xgb_model is not None,
+                "scaler": cls.scaler is not None,
+                "shap_explainer": cls.shap_explainer is not None,
+            },
+            "warmed_up": cls.warmed_up,
+            "vgg16_backend": cls.vgg_model.name if cls.vgg_model is not None else None,
+            "vgg16_precision": settings.VGG16_PRECISION,
+            "shap_mode": settings.SHAP_MODE,
+        }
+
+    @classmethod
+    def vgg_batcher(cls) -> MicroBatcher:
+        """Micro-batching queue in front of vgg_model, created on first use."""
+        if cls._vgg_batcher is None:
+            cls._vgg_batcher = MicroBatcher(
+                lambda arrays: FloodPredictor(model=cls.vgg_model).predict_batch(arrays),
+                max_batch_size=settings.VGG_BATCH_MAX_SIZE,
+                max_wait_ms=settings.VGG_BATCH_MAX_WAIT_MS,
+            )
+        return cls._vgg_batcher
+
+    @classmethod
+    async def close(cls):
+        """Stop background workers owned by the service."""
+        if cls._vgg_batcher is not None:
+            await cls._vgg_batcher.close()
+            cls._vgg_batcher = None
 
     @staticmethod
-    async def predict_flood(image_file, request_json: str) -> FloodPredictionResponse:
+    def _require_models():
+        if not FloodModelService.models_loaded():
+            raise RuntimeError(
+                "Models not loaded. Ensure FloodModelService.load_models() ran at startup."
+            )
+
+    @staticmethod
+    async def _finalize(
+        heuristic_model,
+        prediction_result: dict,
+        weather_shap_value,
+        row: int,
+        location: LocationInfo,
+    ) -> FloodPredictionResponse:
         """
-        Unified flood prediction pipeline.
+        Turn one finished HeuristicModel row into a FloodPredictionResponse:
+        build the typed weather / SHAP objects and queue an alert email on
+        High/Moderate risk.
+        """
+        # ── Build clean weather object ───────────────────────────────────
+        weather = _build_weather_info(
+            heuristic_model.input_data,
+            heuristic_model.output_data,
+        )
 
-        Runs synchronous ML work (VGG16 + XGBoost + SHAP), then in parallel
-        dispatches reverse geocoding and — on High/Moderate risk — an alert
-        email. All network calls are non-blocking async; failures are logged
-        but never surface as prediction errors.
+        # ── Build SHAP data ──────────────────────────────────────────────
+        weather_shap: list[ShapPoint] | None = None
+        if hasattr(weather_shap_value, "values"):
+            weather_shap = [
+                ShapPoint(feature=f, value=v)
+                for f, v in zip(
+                    weather_shap_value.feature_names,
+                    weather_shap_value.values.tolist()[row],
+                )
+            ]
+
+        drain_shap = (
+            heuristic_model.blockage_shap_value.values.tolist()
+            if hasattr(heuristic_model, "blockage_shap_value")
+            and hasattr(heuristic_model.blockage_shap_value, "values")
+            else None
+        )
+
+        PREDICTIONS.labels(str(prediction_result.get("flood_risk")), "false").inc()
+
+        # ── Send alert email if risk warrants it ─────────────────────────
+        alert_sent = False
+        if prediction_result.get("flood_risk") in _ALERT_RISK_LEVELS:
+            alert_sent = _send_alert_email(prediction_result, weather, location)
+
+        return FloodPredictionResponse(
+            prediction=prediction_result,
+            location=location,
+            weather=weather,
+            weather_shap_value=weather_shap,
+            drain_blockage=int(heuristic_model.blockage),
+            drain_blockage_prob=float(heuristic_model.blockage_prob),
+            drain_blockage_shap_value=drain_shap,
+            alert_sent=alert_sent,
+        )
+
+    @staticmethod
+    def prediction_key(image_bytes: bytes, lat: float, lon: float) -> tuple:
         """
-        # Deferred import — breaks the heuristic_rule → flood_service circular chain
-        from app.utils.heuristic_rule import HeuristicModel
+        Cache key for one prediction: SHA-256 of the image bytes, the location
+        rounded to PREDICTION_CACHE_PRECISION decimals and the current weather
+        window (WEATHER_CACHE_TTL_SECONDS wide), so a cached answer never
+        outlives the weather it was computed from.
+        """
+        precision = settings.PREDICTION_CACHE_PRECISION
+        return (
+            hashlib.sha256(image_bytes).hexdigest(),
+            round(float(lat), precision),
+            round(float(lon), precision),
+            int(time.time() // settings.WEATHER_CACHE_TTL_SECONDS),
+        )
+
+    @classmethod
+    def prediction_stats(cls) -> dict:
+        return {**cls.prediction_cache.stats(), **cls._prediction_flight.stats()}
 
+    @staticmethod
+    async def predict_flood(image_file, request_json: str) -> FloodPredictionResponse:
+        """
+        Unified flood prediction pipeline for one uploaded image; see
+        predict_image.
+        """
         try:
             request_data  = json.loads(request_json)
             request_model = FloodPredictionRequest(**request_data)
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(f"Invalid request payload: {e}")
 
-        if not (FloodModelService.vgg_model and FloodModelService.xgb_model and FloodModelService.scaler):
-            raise RuntimeError(
-                "Models not loaded. Ensure FloodModelService.load_models() ran at startup."
+        FloodModelService._require_models()
+
+        try:
+            image_bytes = await image_file.read()
+            return await FloodModelService.predict_image(
+                image_bytes, request_model.lat, request_model.lon
+            )
+        except ExecutorSaturatedError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Flood prediction failed: {e}")
+
+    @staticmethod
+    async def predict_image(image_bytes: bytes, lat: float, lon: float) -> FloodPredictionResponse:
+        """
+        Flood prediction for raw image bytes at (lat, lon).
+
+        Identical requests (same image bytes, location and weather window) are
+        answered from prediction_cache, and concurrent ones share a single
+        computation; either way the response has cached=True and no second
+        alert is queued. Everything else runs through _run_prediction.
+        """
+        key = FloodModelService.prediction_key(image_bytes, lat, lon)
+
+        response = FloodModelService.prediction_cache.get(key)
+        if response is None:
+            coalesced = key in FloodModelService._prediction_flight
+            response = await FloodModelService._prediction_flight.do(
+                key, FloodModelService._run_and_cache, key, image_bytes, lat, lon
+            )
+            if not coalesced:
+                return response
+        PREDICTIONS.labels(str(response.prediction.get("flood_risk")), "true").inc()
+        return response.model_copy(update={"cached": True})
+
+    @staticmethod
+    async def _run_and_cache(key: tuple, image_bytes: bytes, lat: float, lon: float) -> FloodPredictionResponse:
+        response = await FloodModelService._run_prediction(image_bytes, lat, lon)
+        FloodModelService.prediction_cache.set(key, response)
+        return response
+
+    @staticmethod
+    async def _run_prediction(image_bytes: bytes, lat: float, lon: float) -> FloodPredictionResponse:
+        """
+        One uncached prediction, run as a stage graph so independent work overlaps:
+
+            weather    — async Weatherbit fetch (bucket cache)
+            decode     — image decode on the cpu pool
+            geocode    — async Nominatim lookup (shared cache)
+            shap       ← weather
+            cnn        ← decode        (VGG16 micro-batcher)
+            heuristic  ← weather, cnn
+            respond    ← heuristic, shap, geocode   (queues alert email)
+
+        Weather and geocoding are async network calls, SHAP and image decoding
+        run on the bounded cpu pool and VGG16 goes through the micro-batcher,
+        so the event loop stays free and latency approaches the slowest path
+        rather than the sum of the stages. Geocode and email failures are
+        logged but never surface as prediction errors.
+        """
+        # Deferred import — breaks the heuristic_rule → flood_service circular chain
+        from app.utils.heuristic_rule import HeuristicModel
+        from app.utils.weather import DataProcessing
+
+        heuristic_model = HeuristicModel(
+            image=image_bytes,
+            lon=lon,
+            lat=lat,
+            vgg_model=FloodModelService.vgg_model,
+            xgb_model=FloodModelService.xgb_model,
+            scaler=FloodModelService.scaler,
+            shap_explainer=FloodModelService.shap_explainer,
+        )
+        predictor = FloodPredictor(model=FloodModelService.vgg_model)
+
+        async def weather():
+            return await DataProcessing(lat, lon).process_data()
+
+        async def shap_values(weather_data):
+            heuristic_model.apply_weather(weather_data)
+            await InferenceExecutor.run_cpu(heuristic_model.explain_weather)
+
+        async def decode():
+            return await InferenceExecutor.run_cpu(predictor.preprocess_image, image_bytes)
+
+        async def cnn(image_array):
+            # Shares a forward pass with concurrent requests
+            return await FloodModelService.vgg_batcher().submit(image_array)
+
+        async def geocode():
+            return await _reverse_geocode(lat, lon)
+
+        async def heuristic(weather_data, flood_json):
+            heuristic_model.apply_weather(weather_data)
+            heuristic_model.apply_blockage(flood_json)
+            return heuristic_model.predict()
+
+        async def respond(prediction_result, _, location):
+            return await FloodModelService._finalize(
+                heuristic_model,
+                prediction_result,
+                heuristic_model.weather_shap_value,
+                0,
+                location,
             )
 
-        suffix = os.path.splitext(image_file.filename or "upload")[1] or ".jpg"
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        graph = (
+            StageGraph()
+            .add("weather", weather)
+            .add("decode", decode)
+            .add("geocode", geocode)
+            .add("shap", shap_values, after=("weather",))
+            .add("cnn", cnn, after=("decode",))
+            .add("heuristic", heuristic, after=("weather", "cnn"))
+            .add("respond", respond, after=("heuristic", "shap", "geocode"))
+        )
+        results = await graph.run()
+        return results["respond"]
+
+    @staticmethod
+    async def predict_flood_batch(image_files, request_json: str):
+        """
+        Batched flood prediction for N images, each with its own lat/lon.
+
+        request_json is a JSON list of {"lat", "lon"} objects, one per image,
+        in upload order. Weather and reverse geocoding are fetched once per
+        distinct location, VGG16 runs as a single batch, XGBoost/SHAP runs
+        over one feature matrix and the heuristic rules are evaluated per row.
+
+        All ML work (and any validation error) happens before this coroutine
+        returns. It returns an async generator yielding (index, response)
+        pairs in completion order while geocoding and alert emails finish;
+        closing it early (e.g. the client disconnected) cancels whatever is
+        still running.
+        """
+        # Deferred import — breaks the heuristic_rule → flood_service circular chain
+        from app.utils.heuristic_rule import HeuristicModel
+        from app.utils.weather import DataProcessing
+
         try:
-            tmp.write(image_file.file.read())
-            tmp.flush()
-            tmp.close()
-
-            # ── 1. Run synchronous ML pipeline ──────────────────────────────
-            heuristic_model = HeuristicModel(
-                image_path=tmp.name,
-                lon=request_model.lon,
-                lat=request_model.lat,
-                vgg_model=FloodModelService.vgg_model,
-                xgb_model=FloodModelService.xgb_model,
-                scaler=FloodModelService.scaler,
+            items = json.loads(request_json)
+        except (json.JSONDecodeError, TypeError) as e:
+            raise ValueError(f"Invalid request payload: {e}")
+        if not isinstance(items, list):
+            raise ValueError(
+                "Invalid request payload: expected a JSON list of {lat, lon} objects, "
+                f"one per image, got {type(items).__name__}."
             )
-            prediction_result = heuristic_model.predict()
+        try:
+            request_models = [FloodPredictionRequest(**item) for item in items]
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid request payload: {e}")
 
-            # ── 2. Build clean weather object ────────────────────────────────
-            weather = _build_weather_info(
-                heuristic_model.input_data,
-                heuristic_model.output_data,
+        if not request_models:
+            raise ValueError("At least one image is required.")
+        if len(request_models) != len(image_files):
+            raise ValueError(
+                f"Got {len(image_files)} image(s) but {len(request_models)} location(s); "
+                "provide one {lat, lon} entry per image."
             )
+        if len(request_models) > settings.PREDICT_BATCH_MAX_IMAGES:
+            raise ValueError(
+                f"Batch too large: {len(request_models)} images "
+                f"(max {settings.PREDICT_BATCH_MAX_IMAGES})."
+            )
+
+        FloodModelService._require_models()
 
-            # ── 3. Build SHAP data ───────────────────────────────────────────
-            weather_shap: list[ShapPoint] | None = None
-            if (
-                hasattr(heuristic_model, "weather_shap_value")
-                and hasattr(heuristic_model.weather_shap_value, "values")
-            ):
-                weather_shap = [
-                    ShapPoint(feature=f, value=v)
-                    for f, v in zip(
-                        heuristic_model.weather_shap_value.feature_names,
-                        heuristic_model.weather_shap_value.values.tolist()[0],
-                    )
-                ]
-
-            drain_shap = (
-                heuristic_model.blockage_shap_value.values.tolist()
-                if hasattr(heuristic_model, "blockage_shap_value")
-                and hasattr(heuristic_model.blockage_shap_value, "values")
-                else None
+        try:
+            # ── 1. Weather: one Weatherbit call per distinct location ───────
+            locations = list(dict.fromkeys((r.lat, r.lon) for r in request_models))
+            weather_data = await asyncio.gather(
+                *(DataProcessing(lat, lon).process_data() for lat, lon in locations)
+            )
+            weather_by_location = dict(zip(locations, weather_data))
+
+            # ── 2. VGG16: decode every image, then one forward pass ─────────
+            predictor = FloodPredictor(model=FloodModelService.vgg_model)
+            images = [await f.read() for f in image_files]
+            image_arrays = await asyncio.gather(
+                *(
+                    InferenceExecutor.run_cpu(predictor.preprocess_image, b)
+                    for b in images
+                )
+            )
+            blockages = await InferenceExecutor.run_cpu(
+                predictor.predict_batch, list(image_arrays)
             )
 
-            # ── 4. Reverse geocode (async, graceful fallback) ────────────────
-            location = await _reverse_geocode(request_model.lat, request_model.lon)
-
-            # ── 5. Send alert email if risk warrants it ───────────────────────
-            alert_sent = False
-            if prediction_result.get("flood_risk") in _ALERT_RISK_LEVELS:
-                alert_sent = await _send_alert_email(prediction_result, weather, location)
-
-            return FloodPredictionResponse(
-                prediction=prediction_result,
-                location=location,
-                weather=weather,
-                weather_shap_value=weather_shap,
-                drain_blockage=int(heuristic_model.blockage),
-                drain_blockage_prob=float(heuristic_model.blockage_prob),
-                drain_blockage_shap_value=drain_shap,
-                alert_sent=alert_sent,
+            models = []
+            for request_model, blockage in zip(request_models, blockages):
+                heuristic_model = HeuristicModel(
+                    image=None,
+                    lon=request_model.lon,
+                    lat=request_model.lat,
+                    vgg_model=FloodModelService.vgg_model,
+                    xgb_model=FloodModelService.xgb_model,
+                    scaler=FloodModelService.scaler,
+                    shap_explainer=FloodModelService.shap_explainer,
+                )
+                heuristic_model.apply_weather(
+                    weather_by_location[(request_model.lat, request_model.lon)]
+                )
+                heuristic_model.apply_blockage(blockage)
+                models.append(heuristic_model)
+
+            # ── 3. XGBoost/SHAP over the whole feature matrix ───────────────
+            weather_shap_value = await InferenceExecutor.run_cpu(
+                HeuristicModel.explain_weather_batch, models
             )
 
+            # ── 4. Heuristic rules per row ──────────────────────────────────
+            predictions = [m.predict() for m in models]
+
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
-            raise RuntimeError(f"Flood prediction failed: {e}")
-        finally:
+            raise RuntimeError(f"Batch flood prediction failed: {e}")
+
+        # ── 5. Geocode once per location, then finalize rows as they finish ──
+        async def finalize(i: int, geocodes: dict):
+            m = models[i]
+            location = await geocodes[(m.lat, m.lon)]
+            return i, await FloodModelService._finalize(
+                m, predictions[i], weather_shap_value, i, location
+            )
+
+        async def results():
+            # Tasks start with the first row requested and are cancelled in
+            # finally, so a disconnect or a failing row leaves nothing running
+            geocodes = {
+                loc: asyncio.ensure_future(_reverse_geocode(*loc)) for loc in locations
+            }
+            rows = [asyncio.ensure_future(finalize(i, geocodes)) for i in range(len(models))]
             try:
-                os.unlink(tmp.name)
-            except OSError:
-                pass
+                for next_done in asyncio.as_completed(rows):
+                    yield await next_done
+            finally:
+                for task in (*rows, *geocodes.values()):
+                    task.cancel()
+
+        return results()
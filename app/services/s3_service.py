@@ -1,76 +1,390 @@
 # app/services/s3_service.py
+import asyncio
 import logging
 import random
 import base64
-import boto3
+import threading
+import time
+from collections import deque
 from app.core.config import settings
+from app.core.executor import InferenceExecutor
 
 logger = logging.getLogger(__name__)
 
 
 class S3Service:
-    def __init__(self):
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=settings.AWS_ACCESS_KEY,
-            aws_secret_access_key=settings.AWS_SECRET_KEY,
-        )
-        self.bucket_name = settings.BUCKET_NAME
-        self.folders = ["PARTIALLY BLOCKAGE/", "NO BLOCKAGE/", "FULL BLOCKAGE/"]
+    """
+    Long-lived S3 access for the sample-image endpoints.
 
-    def get_random_image_base64(self) -> dict:
+    One boto3 client (thread-safe, pooled up to S3_MAX_POOL_CONNECTIONS) is
+    shared through S3Service.instance(). The keys of every image folder are
+    kept in an in-memory index, listed with full pagination and refreshed in
+    the background every S3_INDEX_REFRESH_SECONDS, so picking a random image
+    is an O(1) in-memory choice with no listing on the request path.
+    """
+
+    folders = ["PARTIALLY BLOCKAGE/", "NO BLOCKAGE/", "FULL BLOCKAGE/"]
+
+    _instance: "S3Service | None" = None
+    _instance_lock = threading.Lock()
+    _refresher: asyncio.Task | None = None
+
+    def __init__(self, s3_client=None, endpoint_url: str | None = None, bucket: str | None = None,
+                 max_pool_connections: int | None = None):
         """
-        Fetch a random image from a random S3 folder and return it as base64 string,
-        along with its metadata (lat/lon guaranteed).
+        s3_client replaces the boto3 client (e.g. the benchmark's fake S3).
+        endpoint_url, bucket and max_pool_connections override settings
+        (S3_ENDPOINT_URL, BUCKET_NAME, S3_MAX_POOL_CONNECTIONS) for this
+        instance only, e.g. for the offline evaluation tool.
         """
-        try:
-            # Step 1: Pick a random folder
-            random_folder = random.choice(self.folders)
+        if s3_client is None:
+            import boto3  # deferred — keeps boto3 out of app import time
+            from botocore.config import Config
 
-            # Step 2: List objects in that folder
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=random_folder,
+            s3_client = boto3.client(
+                "s3",
+                aws_access_key_id=settings.AWS_ACCESS_KEY,
+                aws_secret_access_key=settings.AWS_SECRET_KEY,
+                endpoint_url=(settings.S3_ENDPOINT_URL if endpoint_url is None else endpoint_url) or None,
+                config=Config(
+                    max_pool_connections=max_pool_connections or settings.S3_MAX_POOL_CONNECTIONS,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                ),
             )
+        self.s3_client = s3_client
+        self.bucket_name = bucket or settings.BUCKET_NAME
+        self._index: dict[str, list[str]] = {}  # folder -> image keys
+        self._index_lock = threading.Lock()
+        self.index_built_at: float | None = None
+        self.index_seconds = 0.0
+        self.index_errors = 0
 
-            if "Contents" not in response or not response["Contents"]:
-                raise RuntimeError(f"No images found in S3 folder '{random_folder}'")
+    @classmethod
+    def instance(cls) -> "S3Service":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
 
-            # Step 3: Filter out the folder key itself (0-byte prefix entry ends with "/")
-            image_keys = [
+    # ── Key index ─────────────────────────────────────────────────────
+
+    def list_folder(self, folder: str) -> list[str]:
+        """Every image key under `folder`, across all list_objects_v2 pages."""
+        keys = []
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=folder):
+            # Skip the folder key itself (0-byte prefix entry ends with "/")
+            keys.extend(
                 obj["Key"]
-                for obj in response["Contents"]
+                for obj in page.get("Contents", [])
                 if not obj["Key"].endswith("/") and obj.get("Size", 0) > 0
-            ]
-            if not image_keys:
-                raise RuntimeError(
-                    f"No valid image files found in S3 folder '{random_folder}'"
-                )
+            )
+        return keys
 
-            image_key = random.choice(image_keys)
+    def refresh_index(self):
+        """Re-list every folder and swap the new index in atomically."""
+        start = time.perf_counter()
+        index = {folder: self.list_folder(folder) for folder in self.folders}
+        with self._index_lock:
+            self._index = index
+        self.index_built_at = time.time()
+        self.index_seconds = time.perf_counter() - start
+        logger.info(
+            "S3 key index refreshed: "
+            + ", ".join(f"{folder}{len(keys)}" for folder, keys in index.items())
+            + f" in {self.index_seconds:.2f}s"
+        )
 
-            # Step 4: Fetch the image
-            image_obj = self.s3_client.get_object(
-                Bucket=self.bucket_name, Key=image_key
-            )
-            image_data = image_obj["Body"].read()
+    def random_key(self, folder: str | None = None) -> tuple[str, str]:
+        """
+        (folder, key) of a random image — from `folder`, or from a random
+        non-empty folder. Builds the index on first use if the background
+        refresh has not finished yet.
+        """
+        if self.index_built_at is None:
+            self.refresh_index()
+        with self._index_lock:
+            index = self._index
 
-            # Step 5: Fetch metadata for that image
-            head_obj = self.s3_client.head_object(
-                Bucket=self.bucket_name, Key=image_key
-            )
-            metadata = head_obj.get("Metadata", {})
+        if folder is None:
+            candidates = [f for f in self.folders if index.get(f)]
+            if not candidates:
+                raise RuntimeError(f"No images found in S3 folders {self.folders}")
+            folder = random.choice(candidates)
+        keys = index.get(folder)
+        if not keys:
+            raise RuntimeError(f"No valid image files found in S3 folder '{folder}'")
+        return folder, random.choice(keys)
 
-            # Ensure lat/lon keys always exist
-            lat = metadata.get("lat", "None")
-            lon = metadata.get("lon", "None")
+    @classmethod
+    async def _refresh_loop(cls):
+        while True:
+            try:
+                # instance() imports boto3 on first use — keep it off the event loop
+                await InferenceExecutor.run_io(lambda: cls.instance().refresh_index())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if cls._instance is not None:
+                    cls._instance.index_errors += 1
+                logger.error(f"S3 key index refresh failed: {e}")
+            await asyncio.sleep(settings.S3_INDEX_REFRESH_SECONDS)
 
+    @classmethod
+    def start(cls):
+        """Build the key index in the background and keep it fresh."""
+        if cls._refresher is None or cls._refresher.done():
+            cls._refresher = asyncio.get_running_loop().create_task(cls._refresh_loop())
+
+    @classmethod
+    async def close(cls):
+        if cls._refresher is not None:
+            cls._refresher.cancel()
+            try:
+                await cls._refresher
+            except asyncio.CancelledError:
+                pass
+            cls._refresher = None
+
+    @classmethod
+    def stats(cls) -> dict:
+        service = cls._instance
+        if service is None:
+            return {"index": None}
+        with service._index_lock:
+            counts = {folder: len(keys) for folder, keys in service._index.items()}
+        return {
+            "index": counts,
+            "index_age_s": round(time.time() - service.index_built_at, 1)
+            if service.index_built_at
+            else None,
+            "last_refresh_s": round(service.index_seconds, 3),
+            "refresh_errors": service.index_errors,
+        }
+
+    # ── Images ────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _metadata(obj: dict) -> dict:
+        """User metadata of a get/head_object response, lat/lon guaranteed."""
+        metadata = obj.get("Metadata", {})
+        # Ensure lat/lon keys always exist
+        return {**metadata, "lat": metadata.get("lat", "None"), "lon": metadata.get("lon", "None")}
+
+    def open_random_image(self, folder: str | None = None) -> dict:
+        """
+        Start downloading a random image (from `folder`, or any folder)
+        without reading it. Returns the folder, key, metadata, content type /
+        length and the unread botocore StreamingBody, which the caller must
+        read (or close).
+        """
+        try:
+            random_folder, image_key = self.random_key(folder)
+            # get_object already carries the user metadata — no head_object needed
+            image_obj = self.s3_client.get_object(Bucket=self.bucket_name, Key=image_key)
             return {
-                "imageBase64": base64.b64encode(image_data).decode("utf-8"),
                 "folder": random_folder,
                 "imageKey": image_key,
-                "metadata": {**metadata, "lat": lat, "lon": lon},
+                "metadata": self._metadata(image_obj),
+                "contentType": image_obj.get("ContentType") or "application/octet-stream",
+                "contentLength": image_obj.get("ContentLength"),
+                "body": image_obj["Body"],
             }
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch image from S3: {e}")
 
+    def fetch_random_image(self, folder: str | None = None) -> dict:
+        """open_random_image with the body read into `data` (bytes)."""
+        image = self.open_random_image(folder)
+        body = image.pop("body")
+        try:
+            image["data"] = body.read()
         except Exception as e:
             raise RuntimeError(f"Failed to fetch image from S3: {e}")
+        finally:
+            body.close()
+        return image
+
+    @staticmethod
+    def to_base64_response(image: dict) -> dict:
+        """The original JSON shape of /get-latest-s3-image for a fetched image."""
+        return {
+            "imageBase64": base64.b64encode(image["data"]).decode("utf-8"),
+            "folder": image["folder"],
+            "imageKey": image["imageKey"],
+            "metadata": image["metadata"],
+        }
+
+    def get_random_image_base64(self) -> dict:
+        """
+        Fetch a random image from a random S3 folder and return it as base64 string,
+        along with its metadata (lat/lon guaranteed).
+        """
+        return self.to_base64_response(self.fetch_random_image())
+
+    def get_random_image_presigned(self) -> dict:
+        """
+        A presigned GET URL for a random image plus its metadata, so the
+        client downloads the bytes straight from S3. Costs one head_object;
+        signing is local.
+        """
+        try:
+            random_folder, image_key = self.random_key()
+            head_obj = self.s3_client.head_object(Bucket=self.bucket_name, Key=image_key)
+            url = self.s3_client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": self.bucket_name, "Key": image_key},
+                ExpiresIn=settings.S3_PRESIGNED_URL_EXPIRY_SECONDS,
+            )
+            return {
+                "url": url,
+                "expiresIn": settings.S3_PRESIGNED_URL_EXPIRY_SECONDS,
+                "folder": random_folder,
+                "imageKey": image_key,
+                "metadata": self._metadata(head_obj),
+            }
+        except Exception as e:
+            raise RuntimeError(f"Failed to presign image from S3: {e}")
+
+
+class S3ImagePrefetcher:
+    """
+    Bounded in-memory buffer of random sample images, fetched ahead of time.
+
+    One ring per blockage folder, each filled up to an equal share of
+    S3_PREFETCH_SIZE, so served images stay balanced across the folders. A
+    background task tops the rings up with up to S3_PREFETCH_CONCURRENCY
+    parallel downloads whenever an image is taken, while the buffered bytes
+    stay under S3_PREFETCH_MAX_BYTES. An image that does not fit under the
+    cap is discarded and marks the buffer full: refilling pauses until
+    take() frees bytes, or until take() misses (an object larger than the
+    whole cap never fits, so each miss allows one more refill round).
+    Every buffered image is served once; take() returns None when the
+    buffer is empty and the caller falls back to S3.
+    """
+
+    _rings: dict[str, deque] = {}
+    _bytes = 0
+    _full = False
+    _wanted: asyncio.Event | None = None
+    _worker: asyncio.Task | None = None
+
+    # Counters
+    hits = 0
+    misses = 0
+    fetched = 0
+    discarded = 0
+    errors = 0
+
+    @classmethod
+    def _target(cls) -> int:
+        folders = len(S3Service.folders)
+        return -(-settings.S3_PREFETCH_SIZE // folders)  # ceil
+
+    @classmethod
+    def take(cls) -> dict | None:
+        """A buffered image (see S3Service.fetch_random_image), or None."""
+        candidates = [folder for folder, ring in cls._rings.items() if ring]
+        image = None
+        if candidates:
+            image = cls._rings[random.choice(candidates)].popleft()
+            cls._bytes -= len(image["data"])
+            cls.hits += 1
+        else:
+            cls.misses += 1
+        # Either way the buffer has room (or nothing in it can make room)
+        cls._full = False
+        if cls._wanted is not None:
+            cls._wanted.set()
+        return image
+
+    @classmethod
+    def _add(cls, image: dict):
+        size = len(image["data"])
+        if cls._bytes + size > settings.S3_PREFETCH_MAX_BYTES:
+            # Full by size before full by count — wait for take() instead of re-downloading
+            cls.discarded += 1
+            cls._full = True
+            return
+        cls._rings[image["folder"]].append(image)
+        cls._bytes += size
+        cls.fetched += 1
+
+    @classmethod
+    def _deficits(cls) -> list[str]:
+        """Folders to download next (one entry per image), most-depleted first."""
+        target = cls._target()
+        deficits = {folder: target - len(ring) for folder, ring in cls._rings.items()}
+        slots = []
+        while len(slots) < settings.S3_PREFETCH_CONCURRENCY and any(n > 0 for n in deficits.values()):
+            folder = max(deficits, key=deficits.get)
+            slots.append(folder)
+            deficits[folder] -= 1
+        return slots
+
+    @classmethod
+    async def _fetch(cls, folder: str):
+        service = await InferenceExecutor.run_io(S3Service.instance)
+        cls._add(await InferenceExecutor.run_io(service.fetch_random_image, folder))
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            full = cls._full or cls._bytes >= settings.S3_PREFETCH_MAX_BYTES
+            slots = [] if full else cls._deficits()
+            if not slots:
+                cls._wanted.clear()
+                await cls._wanted.wait()
+                continue
+
+            results = await asyncio.gather(
+                *(cls._fetch(folder) for folder in slots), return_exceptions=True
+            )
+            failures = [r for r in results if isinstance(r, Exception)]
+            if failures:
+                cls.errors += len(failures)
+                logger.error(f"S3 prefetch failed ({len(failures)}/{len(slots)}): {failures[0]}")
+                await asyncio.sleep(settings.S3_PREFETCH_RETRY_SECONDS)
+
+    @classmethod
+    def start(cls):
+        if settings.S3_PREFETCH_SIZE <= 0:
+            return
+        if cls._worker is None or cls._worker.done():
+            cls._rings = {folder: deque() for folder in S3Service.folders}
+            cls._bytes = 0
+            cls._full = False
+            cls._wanted = asyncio.Event()
+            cls._worker = asyncio.get_running_loop().create_task(cls._run())
+            logger.info(
+                f"S3 prefetch started: {settings.S3_PREFETCH_SIZE} images, "
+                f"{settings.S3_PREFETCH_MAX_BYTES // (1024 * 1024)} MiB cap."
+            )
+
+    @classmethod
+    async def close(cls):
+        if cls._worker is not None:
+            cls._worker.cancel()
+            try:
+                await cls._worker
+            except asyncio.CancelledError:
+                pass
+            cls._worker = None
+        cls._rings = {}
+        cls._bytes = 0
+        cls._full = False
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "buffered": {folder: len(ring) for folder, ring in cls._rings.items()},
+            "bytes": cls._bytes,
+            "max_bytes": settings.S3_PREFETCH_MAX_BYTES,
+            "full": cls._full,
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "fetched": cls.fetched,
+            "discarded": cls.discarded,
+            "errors": cls.errors,
+        }
@@ -1,35 +1,174 @@
 # app/services/weather_service.py
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
 import httpx
+from app.core.cache import LRUCache, SingleFlight
+from app.core.config import settings
+from app.core.executor import InferenceExecutor
+from app.core.http import HttpClients, NOMINATIM
+from app.core.metrics import upstream_call, upstream_error
+
+logger = logging.getLogger(__name__)
 
 
 class WeatherService:
-    BASE_URL = "https://nominatim.openstreetmap.org/reverse"
+    BASE_URL = settings.NOMINATIM_URL
+
+    # Reverse-geocode results per quantized coordinate. Cameras are fixed, so
+    # entries live long; both /reverse-geocode and /predict-flood/ read it.
+    cache = LRUCache(settings.GEOCODE_CACHE_SIZE, ttl=settings.GEOCODE_CACHE_TTL_SECONDS)
+    _flight = SingleFlight()
+    _next_slot = 0.0  # monotonic time the next Nominatim call may be sent
+    _unsaved = 0  # entries added since the last save
+    _saver: asyncio.Task | None = None
+    _save_lock = threading.Lock()
 
     @staticmethod
-    async def reverse_geocode(lat: float, lon: float) -> dict:
+    def bucket(lat: float, lon: float) -> tuple:
+        """Cache key: coordinates rounded to GEOCODE_CACHE_PRECISION decimals."""
+        precision = settings.GEOCODE_CACHE_PRECISION
+        return (round(float(lat), precision), round(float(lon), precision))
+
+    @staticmethod
+    def _reserve_slot() -> float:
         """
-        Fetch address details from coordinates using Nominatim API.
+        Claim the next send time and return how long to wait for it. Runs
+        without an await, so it is atomic on the event loop; calls are spaced
+        by their start times and a slow response does not hold up the next.
         """
-        headers = {"User-Agent": "xai-flows-api/1.0"}
+        now = time.monotonic()
+        slot = max(now, WeatherService._next_slot)
+        WeatherService._next_slot = slot + settings.GEOCODE_MIN_INTERVAL_SECONDS
+        return slot - now
+
+    @staticmethod
+    async def _fetch(lat: float, lon: float) -> dict:
+        # Nominatim's usage policy allows ~1 request/second — space calls out
+        wait = WeatherService._reserve_slot()
+        if wait > 0:
+            await asyncio.sleep(wait)
         url = f"{WeatherService.BASE_URL}?lat={lat}&lon={lon}&format=json"
+        with upstream_call(NOMINATIM):
+            response = await HttpClients.get(NOMINATIM).get(url)
+
+        if response.is_error:
+            upstream_error(NOMINATIM)
+        response.raise_for_status()
+        data = response.json()
+        result = {
+            "city": data.get("address", {}).get("city", ""),
+            "address": data.get("display_name", ""),
+        }
+        # An empty result (e.g. open sea) is retried sooner than a real address
+        ttl = None if result["address"] else settings.GEOCODE_NEGATIVE_TTL_SECONDS
+        WeatherService.cache.set(WeatherService.bucket(lat, lon), result, ttl=ttl)
+        WeatherService._unsaved += 1
+        return result
 
+    @staticmethod
+    async def lookup(lat: float, lon: float) -> dict:
+        """
+        Cached reverse geocode returning {"city", "address"} (either may be empty).
+        Concurrent misses for the same bucket share one Nominatim call.
+        Raises httpx errors on upstream failure; failures are not cached and
+        empty results only for GEOCODE_NEGATIVE_TTL_SECONDS.
+        """
+        key = WeatherService.bucket(lat, lon)
+        cached = WeatherService.cache.get(key)
+        if cached is not None:
+            return cached
+        return await WeatherService._flight.do(key, WeatherService._fetch, lat, lon)
+
+    @staticmethod
+    async def reverse_geocode(lat: float, lon: float) -> dict:
+        """
+        Fetch address details from coordinates using Nominatim API.
+        """
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                data = response.json()
+            data = await WeatherService.lookup(lat, lon)
 
-                city = data.get("address", {}).get("city", "")
-                address = data.get("display_name", "")
+            city = data["city"]
+            address = data["address"]
 
-                if not city or not address:
-                    raise RuntimeError(
-                        "Reverse geocoding returned empty city or address"
-                    )
+            if not city or not address:
+                raise RuntimeError(
+                    "Reverse geocoding returned empty city or address"
+                )
 
-                return {"city": city, "address": address}
+            return {"city": city, "address": address}
 
         except httpx.HTTPStatusError as e:
             raise RuntimeError(f"Nominatim API returned error {e.response.status_code}")
         except Exception as e:
             raise RuntimeError(f"Reverse geocoding failed: {e}")
+
+    @staticmethod
+    def stats() -> dict:
+        return {**WeatherService.cache.stats(), **WeatherService._flight.stats()}
+
+    @staticmethod
+    def load_cache():
+        """Warm the cache from GEOCODE_CACHE_PATH, if configured."""
+        path = settings.GEOCODE_CACHE_PATH
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            WeatherService.cache.load(
+                (tuple(key), expires_at, value) for key, expires_at, value in entries
+            )
+            logger.info(f"Loaded {len(WeatherService.cache)} reverse-geocode entries from {path}")
+        except Exception as e:
+            logger.warning(f"Could not load reverse-geocode cache from {path}: {e}")
+
+    @staticmethod
+    def save_cache():
+        """Persist the cache to GEOCODE_CACHE_PATH, if configured (atomic replace)."""
+        path = settings.GEOCODE_CACHE_PATH
+        if not path:
+            return
+        # Serialised: a periodic save still running in the io pool at shutdown
+        # must not interleave with the final one on the same tmp file
+        with WeatherService._save_lock:
+            try:
+                WeatherService._unsaved = 0
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(WeatherService.cache.dump(), f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+                logger.info(f"Saved {len(WeatherService.cache)} reverse-geocode entries to {path}")
+            except Exception as e:
+                logger.warning(f"Could not save reverse-geocode cache to {path}: {e}")
+
+    @staticmethod
+    async def _save_loop():
+        while True:
+            await asyncio.sleep(settings.GEOCODE_CACHE_SAVE_SECONDS)
+            if WeatherService._unsaved:
+                await InferenceExecutor.run_io(WeatherService.save_cache)
+
+    @staticmethod
+    def start():
+        """
+        Save new entries every GEOCODE_CACHE_SAVE_SECONDS, so a crash or a
+        kill without a clean shutdown loses at most one interval of lookups.
+        """
+        if not settings.GEOCODE_CACHE_PATH or settings.GEOCODE_CACHE_SAVE_SECONDS <= 0:
+            return
+        if WeatherService._saver is None or WeatherService._saver.done():
+            WeatherService._saver = asyncio.get_running_loop().create_task(WeatherService._save_loop())
+
+    @staticmethod
+    async def close():
+        if WeatherService._saver is not None:
+            WeatherService._saver.cancel()
+            try:
+                await WeatherService._saver
+            except asyncio.CancelledError:
+                pass
+            WeatherService._saver = None
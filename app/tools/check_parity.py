@@ -0,0 +1,64 @@
+# app/tools/check_parity.py
+"""
+Compare a VGG16 inference backend against the Keras reference.
+
+    python -m app.tools.check_parity --backend onnx --samples path/to/images \
+        [--path MODEL] [--tolerance 1e-4] [--batch-size 8] [--limit 0]
+
+Runs every sample image through both backends and fails (exit code 1)
+unless the predicted `blockage` class matches on every image and the
+class probabilities differ by at most --tolerance.
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app.tools.common import configure_cli_logging, list_sample_images, sample_batches
+from app.utils.backends import KerasBackend, compare_backends, load_backend
+from app.utils.model import FloodPredictor
+
+logger = logging.getLogger(__name__)
+
+
+def check_parity(backend: str, samples: str, path: str | None = None,
+                 tolerance: float = 1e-4, batch_size: int = 8, limit: int = 0) -> dict:
+    """Return the comparison report with an added boolean `passed`."""
+    reference = KerasBackend.load(KerasBackend.default_path())
+    candidate = load_backend(backend, path)
+    paths = list_sample_images(samples, limit)
+
+    report = compare_backends(
+        reference, candidate, sample_batches(FloodPredictor(reference), paths, batch_size)
+    )
+    report["tolerance"] = tolerance
+    report["passed"] = (
+        report["class_agreement"] == 1.0 and report["max_probability_drift"] <= tolerance
+    )
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="onnx", help="candidate backend name")
+    parser.add_argument("--path", default=None, help="candidate model path (default: from settings)")
+    parser.add_argument("--samples", required=True, help="directory of sample drain images")
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=0, help="max images (0 = all)")
+    args = parser.parse_args(argv)
+
+    configure_cli_logging()
+    report = check_parity(
+        args.backend, args.samples, args.path, args.tolerance, args.batch_size, args.limit
+    )
+    print(json.dumps(report, indent=2))
+    if not report["passed"]:
+        logger.error("Parity check FAILED.")
+        return 1
+    logger.info("Parity check passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# app/tools/check_shap_parity.py
+"""
+Compare native XGBoost contributions with the shap library's explanation.
+
+    python -m app.tools.check_shap_parity [--rows 256] [--tolerance 1e-3] [--seed 0]
+
+Draws random weather rows around the scaler's fitted distribution, explains
+them with MlPipeline.explain_shap (shap.Explainer) and
+MlPipeline.explain_contribs (Booster.predict(pred_contribs=True)), and
+fails (exit code 1) unless the feature names match and every value and
+base value agrees within --tolerance.
+"""
+import argparse
+import json
+import logging
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.tools.common import configure_cli_logging
+from app.utils.mlpipeline import MlPipeline
+
+logger = logging.getLogger(__name__)
+
+
+def check_shap_parity(rows: int = 256, tolerance: float = 1e-3, seed: int = 0) -> dict:
+    """Return the comparison report with an added boolean `passed`."""
+    import shap
+    import sklearn  # noqa: F401  (needed to unpickle the scaler)
+    import xgboost  # noqa: F401  (needed to unpickle the model)
+
+    with open(settings.XGB_MODEL_PATH, "rb") as f:
+        model = pickle.load(f)
+    with open(settings.SCALER_PATH, "rb") as f:
+        scaler = pickle.load(f)
+
+    rng = np.random.default_rng(seed)
+    data = scaler.inverse_transform(rng.standard_normal((rows, len(settings.INPUT_COLUMNS))))
+    explainer = shap.Explainer(model, feature_names=list(settings.INPUT_COLUMNS))
+    pipeline = MlPipeline(data, model=model, scaler=scaler, explainer=explainer)
+
+    # Time both paths cold; the shared cache would otherwise serve the rows
+    MlPipeline.shap_cache.clear()
+    start = time.perf_counter()
+    reference = pipeline.explain_shap()
+    shap_s = time.perf_counter() - start
+
+    MlPipeline.shap_cache.clear()
+    start = time.perf_counter()
+    candidate = pipeline.explain_contribs()
+    native_s = time.perf_counter() - start
+    MlPipeline.shap_cache.clear()
+
+    if reference is None or candidate is None:
+        raise RuntimeError("An explanation failed — see the log above.")
+
+    values_drift = float(np.abs(np.asarray(reference.values) - candidate.values).max())
+    base_drift = float(
+        np.abs(np.asarray(reference.base_values).reshape(candidate.base_values.shape) - candidate.base_values).max()
+    )
+    names_match = list(reference.feature_names) == list(candidate.feature_names)
+    return {
+        "rows": rows,
+        "values_shape": list(candidate.values.shape),
+        "feature_names_match": names_match,
+        "max_value_drift": values_drift,
+        "max_base_value_drift": base_drift,
+        "shap_ms": round(1000 * shap_s, 2),
+        "native_ms": round(1000 * native_s, 2),
+        "tolerance": tolerance,
+        "passed": names_match and values_drift <= tolerance and base_drift <= tolerance,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=256)
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    configure_cli_logging()
+    report = check_shap_parity(args.rows, args.tolerance, args.seed)
+    print(json.dumps(report, indent=2))
+    if not report["passed"]:
+        logger.error("SHAP parity check FAILED.")
+        return 1
+    logger.info("SHAP parity check passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
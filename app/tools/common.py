@@ -0,0 +1,33 @@
+# app/tools/common.py
+import logging
+import os
+
+from app.utils.model import FloodPredictor
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+def configure_cli_logging():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def list_sample_images(directory: str, limit: int = 0) -> list[str]:
+    """Image files under `directory` (recursive, sorted), optionally capped at `limit`."""
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(directory)
+        for name in files
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )
+    if not paths:
+        raise ValueError(f"No sample images found under '{directory}'")
+    return paths[:limit] if limit else paths
+
+
+def sample_batches(predictor: FloodPredictor, paths: list[str], batch_size: int):
+    """Yield preprocessed (N, 256, 256, 3) batches for the given image paths."""
+    import numpy as np
+
+    for i in range(0, len(paths), batch_size):
+        arrays = [predictor.preprocess_image(path) for path in paths[i : i + batch_size]]
+        yield np.concatenate(arrays, axis=0)
@@ -0,0 +1,186 @@
+# app/tools/evaluate_s3.py
+"""
+Score the VGG16 model on the labelled S3 image corpus.
+
+    python -m app.tools.evaluate_s3 [--backend keras|onnx|tflite] [--path MODEL] \
+        [--endpoint-url http://localhost:9000] [--bucket NAME] \
+        [--workers 16] [--batch-size 32] [--limit 0] [--output report.json]
+
+Every object under the three blockage folders is treated as a sample
+labelled by its folder. Keys are listed with full pagination (folders in
+parallel), downloaded and decoded by --workers threads with a bounded
+number in flight, and run through the model in batches of --batch-size.
+Prints a JSON report with the confusion matrix (rows = true class,
+columns = predicted), per-class and overall accuracy, and throughput
+with time per stage. --endpoint-url points at a local S3 stand-in
+(MinIO, moto server), so the job runs fully offline.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+from app.tools.common import configure_cli_logging
+
+logger = logging.getLogger(__name__)
+
+# Folder → class index as produced by the model (see FloodPredictor.predict)
+FOLDER_LABELS = {"FULL BLOCKAGE/": 0, "NO BLOCKAGE/": 1, "PARTIALLY BLOCKAGE/": 2}
+CLASS_NAMES = ["full_blockage", "no_blockage", "partial_blockage"]
+
+
+def _load_sample(service, predictor, key: str) -> tuple:
+    """Download and decode one object; returns (array, download_s, decode_s)."""
+    start = time.perf_counter()
+    obj = service.s3_client.get_object(Bucket=service.bucket_name, Key=key)
+    data = obj["Body"].read()
+    downloaded = time.perf_counter()
+    array = predictor.preprocess_image(data)
+    return array, downloaded - start, time.perf_counter() - downloaded
+
+
+def evaluate(backend: str | None = None, path: str | None = None, workers: int = 16,
+             batch_size: int = 32, limit: int = 0, endpoint_url: str | None = None,
+             bucket: str | None = None) -> dict:
+    import numpy as np
+    from app.services.s3_service import S3Service
+    from app.utils.backends import load_backend
+    from app.utils.model import FloodPredictor
+
+    wall_start = time.perf_counter()
+    model = load_backend(backend, path)
+    predictor = FloodPredictor(model)
+    # One pooled connection per worker; settings themselves are left untouched
+    service = S3Service(
+        endpoint_url=endpoint_url,
+        bucket=bucket,
+        max_pool_connections=max(settings.S3_MAX_POOL_CONNECTIONS, workers),
+    )
+    timings = {"load_model": time.perf_counter() - wall_start}
+
+    # ── 1. List every folder (paginated) in parallel ────────────────────
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(FOLDER_LABELS)) as pool:
+        listed = dict(zip(FOLDER_LABELS, pool.map(service.list_folder, FOLDER_LABELS)))
+    samples = [
+        (key, FOLDER_LABELS[folder])
+        for folder, keys in listed.items()
+        for key in (keys[:limit] if limit else keys)
+    ]
+    timings["list"] = time.perf_counter() - start
+    logger.info(f"Listed {len(samples)} objects: " + ", ".join(f"{f}{len(k)}" for f, k in listed.items()))
+
+    # ── 2. Download + decode in parallel, predict in batches ────────────
+    confusion = np.zeros((len(CLASS_NAMES), len(CLASS_NAMES)), dtype=np.int64)
+    download_s = decode_s = inference_s = 0.0
+    failed = 0
+    arrays, labels = [], []
+
+    def flush():
+        nonlocal inference_s
+        start = time.perf_counter()
+        predicted = np.argmax(model.predict(np.concatenate(arrays, axis=0)), axis=1)
+        inference_s += time.perf_counter() - start
+        for true, pred in zip(labels, predicted):
+            confusion[true, pred] += 1
+        arrays.clear()
+        labels.clear()
+
+    stream_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-eval") as pool:
+        pending = deque()
+        remaining = iter(samples)
+        # Keep a bounded window in flight so the corpus is never held in memory
+        for key, label in remaining:
+            pending.append((key, label, pool.submit(_load_sample, service, predictor, key)))
+            if len(pending) >= 4 * workers:
+                break
+
+        while pending:
+            key, label, future = pending.popleft()
+            next_sample = next(remaining, None)
+            if next_sample is not None:
+                pending.append((*next_sample, pool.submit(_load_sample, service, predictor, next_sample[0])))
+            try:
+                array, dl, dec = future.result()
+            except Exception as e:
+                failed += 1
+                logger.warning(f"Skipping '{key}': {e}")
+                continue
+            download_s += dl
+            decode_s += dec
+            arrays.append(array)
+            labels.append(label)
+            if len(arrays) >= batch_size:
+                flush()
+        if arrays:
+            flush()
+    stream_s = time.perf_counter() - stream_start
+
+    evaluated = int(confusion.sum())
+    per_class = {
+        name: {
+            "samples": int(confusion[i].sum()),
+            "accuracy": round(float(confusion[i, i] / confusion[i].sum()), 4) if confusion[i].sum() else None,
+        }
+        for i, name in enumerate(CLASS_NAMES)
+    }
+    timings.update(
+        {
+            # download / decode are summed over worker threads (CPU-seconds of work)
+            "download_total": download_s,
+            "decode_total": decode_s,
+            "inference": inference_s,
+            "stream_wall": stream_s,
+            "total_wall": time.perf_counter() - wall_start,
+        }
+    )
+    return {
+        "backend": model.name,
+        "samples": len(samples),
+        "evaluated": evaluated,
+        "failed": failed,
+        "classes": CLASS_NAMES,
+        "confusion_matrix": confusion.tolist(),
+        "accuracy": round(float(np.trace(confusion) / evaluated), 4) if evaluated else None,
+        "per_class": per_class,
+        "throughput": {
+            "images_per_s": round(evaluated / stream_s, 2) if stream_s else None,
+            "inference_images_per_s": round(evaluated / inference_s, 2) if inference_s else None,
+            "workers": workers,
+            "batch_size": batch_size,
+        },
+        "timings_s": {name: round(seconds, 3) for name, seconds in timings.items()},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default=None, help="VGG16 backend (default: settings.VGG16_BACKEND)")
+    parser.add_argument("--path", default=None, help="model path (default: from settings)")
+    parser.add_argument("--endpoint-url", default=None, help="S3 endpoint (default: settings.S3_ENDPOINT_URL)")
+    parser.add_argument("--bucket", default=None, help="bucket (default: settings.BUCKET_NAME)")
+    parser.add_argument("--workers", type=int, default=16, help="parallel downloads / decodes")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--limit", type=int, default=0, help="max objects per folder (0 = all)")
+    parser.add_argument("--output", default=None, help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    configure_cli_logging()
+    report = evaluate(
+        args.backend, args.path, args.workers, args.batch_size, args.limit,
+        endpoint_url=args.endpoint_url, bucket=args.bucket,
+    )
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["evaluated"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
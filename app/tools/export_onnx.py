@@ -0,0 +1,61 @@
+# app/tools/export_onnx.py
+"""
+Export the VGG16 Keras model to ONNX for VGG16_BACKEND=onnx.
+
+    python -m app.tools.export_onnx [--input ml_models/vgg16_model.keras] \
+        [--output ml_models/vgg16_model.onnx] [--opset 17] \
+        [--samples path/to/images] [--tolerance 1e-4]
+
+The exported graph takes a float32 (N, 256, 256, 3) batch with a dynamic
+batch dimension, so it works with the micro-batcher. With --samples, the
+parity check from app.tools.check_parity runs on the fresh artifact and
+the command exits non-zero if it fails.
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app.core.config import settings
+from app.tools.common import configure_cli_logging
+
+logger = logging.getLogger(__name__)
+
+
+def export_onnx(input_path: str, output_path: str, opset: int = 17):
+    import tensorflow as tf
+    import tf2onnx
+
+    model = tf.keras.models.load_model(input_path)
+    signature = [tf.TensorSpec((None, 256, 256, 3), tf.float32, name="image")]
+    tf2onnx.convert.from_keras(
+        model, input_signature=signature, opset=opset, output_path=output_path
+    )
+    logger.info(f"Exported {input_path} → {output_path} (opset {opset})")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=settings.VGG16_MODEL_PATH)
+    parser.add_argument("--output", default=settings.VGG16_ONNX_PATH)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--samples", default=None, help="directory of images for the parity check")
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args(argv)
+
+    configure_cli_logging()
+    export_onnx(args.input, args.output, args.opset)
+
+    if args.samples:
+        from app.tools.check_parity import check_parity
+
+        report = check_parity("onnx", args.samples, args.output, args.tolerance)
+        print(json.dumps(report, indent=2))
+        if not report["passed"]:
+            logger.error("Exported model failed the parity check.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
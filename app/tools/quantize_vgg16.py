@@ -0,0 +1,98 @@
+# app/tools/quantize_vgg16.py
+"""
+Produce a reduced-precision VGG16 artifact and its validation report.
+
+    python -m app.tools.quantize_vgg16 --precision int8 --samples path/to/images \
+        [--input ml_models/vgg16_model.keras] [--batch-size 8] [--limit 0]
+
+  int8 : post-training dynamic-range quantization (int8 weights, float activations)
+  fp16 : float16 weights
+
+Writes ml_models/vgg16_model.<precision>.tflite and a
+<artifact>.report.json comparing class agreement and probability drift
+against the full-precision Keras model on the sample images. The service
+(VGG16_PRECISION=<precision>) reads that report at startup and refuses the
+quantized mode if agreement is below VGG16_MIN_AGREEMENT. Exit code 1 if
+the artifact fails that threshold.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.tools.common import configure_cli_logging, list_sample_images, sample_batches
+from app.utils.backends import (
+    QUANTIZED_PRECISIONS,
+    KerasBackend,
+    TFLiteBackend,
+    compare_backends,
+    quantized_artifact_path,
+    validation_report_path,
+)
+from app.utils.model import FloodPredictor
+
+logger = logging.getLogger(__name__)
+
+
+def quantize(model, precision: str, output_path: str):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if precision == "fp16":
+        converter.target_spec.supported_types = [tf.float16]
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+    logger.info(f"Wrote {precision} artifact to {output_path}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--precision", choices=QUANTIZED_PRECISIONS, required=True)
+    parser.add_argument("--samples", required=True, help="directory of sample drain images")
+    parser.add_argument("--input", default=settings.VGG16_MODEL_PATH)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=0, help="max images (0 = all)")
+    args = parser.parse_args(argv)
+
+    configure_cli_logging()
+    reference = KerasBackend.load(args.input)
+    artifact = quantized_artifact_path(args.precision)
+    quantize(reference.model, args.precision, artifact)
+
+    candidate = TFLiteBackend.load(artifact)
+    paths = list_sample_images(args.samples, args.limit)
+    report = compare_backends(
+        reference, candidate, sample_batches(FloodPredictor(reference), paths, args.batch_size)
+    )
+    report.update(
+        {
+            "precision": args.precision,
+            "artifact": artifact,
+            "reference_model": args.input,
+            "reference_bytes": os.path.getsize(args.input),
+            "artifact_bytes": os.path.getsize(artifact),
+            "min_agreement": settings.VGG16_MIN_AGREEMENT,
+            "passed": report["class_agreement"] >= settings.VGG16_MIN_AGREEMENT,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+
+    with open(validation_report_path(artifact), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+    if not report["passed"]:
+        logger.error(
+            f"{args.precision} model agreement {report['class_agreement']:.4f} is below "
+            f"{settings.VGG16_MIN_AGREEMENT} — the service will refuse this mode."
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBackend(ABC):
+    """
+    Runtime that executes the VGG16 drain-blockage classifier.
+
+    Subclasses take a float32 batch of shape (N, 256, 256, 3) scaled to
+    [0, 1] and return class probabilities of shape (N, 3). FloodPredictor
+    only talks to this interface, so the runtime is selectable through
+    settings.VGG16_BACKEND.
+    """
+
+    name = "base"
+
+    @classmethod
+    def import_runtime(cls):
+        """Import the (heavy) runtime library; timed separately at startup."""
+
+    @classmethod
+    @abstractmethod
+    def default_path(cls) -> str:
+        """Where the model file lives when no path is given."""
+
+    @classmethod
+    @abstractmethod
+    def load(cls, path: str) -> "InferenceBackend":
+        """Load the model at `path` into a ready-to-predict backend."""
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Class probabilities (N, 3) for a preprocessed batch (N, 256, 256, 3)."""
+
+
+class KerasBackend(InferenceBackend):
+    """TensorFlow / Keras runtime — the default, loads VGG16_MODEL_PATH."""
+
+    name = "keras"
+
+    def __init__(self, model):
+        self.model = model
+
+    @classmethod
+    def import_runtime(cls):
+        import tensorflow.keras.models  # noqa: F401
+
+    @classmethod
+    def default_path(cls) -> str:
+        return settings.VGG16_MODEL_PATH
+
+    @classmethod
+    def load(cls, path: str) -> "KerasBackend":
+        from tensorflow.keras.models import load_model
+
+        return cls(load_model(path))
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict(batch, verbose=0, batch_size=len(batch))
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX Runtime CPU runtime — loads VGG16_ONNX_PATH, produced by
+    `python -m app.tools.export_onnx`. Much smaller import and memory
+    footprint than TensorFlow and lower per-call overhead.
+    """
+
+    name = "onnx"
+
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    @classmethod
+    def import_runtime(cls):
+        import onnxruntime  # noqa: F401
+
+    @classmethod
+    def default_path(cls) -> str:
+        return settings.VGG16_ONNX_PATH
+
+    @classmethod
+    def load(cls, path: str) -> "OnnxBackend":
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if settings.ONNX_INTRA_OP_THREADS:
+            options.intra_op_num_threads = settings.ONNX_INTRA_OP_THREADS
+        session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        return cls(session)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class TFLiteBackend(InferenceBackend):
+    """
+    TensorFlow Lite runtime for the reduced-precision (int8 dynamic-range or
+    float16-weight) VGG16 artifacts produced by `python -m app.tools.quantize_vgg16`.
+    """
+
+    name = "tflite"
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self._input = interpreter.get_input_details()[0]["index"]
+        self._output = interpreter.get_output_details()[0]["index"]
+        # An interpreter holds mutable tensors — one invocation at a time
+        self._lock = threading.Lock()
+
+    @classmethod
+    def import_runtime(cls):
+        import tensorflow.lite  # noqa: F401
+
+    @classmethod
+    def default_path(cls) -> str:
+        return quantized_artifact_path(settings.VGG16_PRECISION)
+
+    @classmethod
+    def load(cls, path: str) -> "TFLiteBackend":
+        import tensorflow as tf
+
+        interpreter = tf.lite.Interpreter(
+            model_path=path, num_threads=settings.TFLITE_NUM_THREADS or None
+        )
+        interpreter.allocate_tensors()
+        return cls(interpreter)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        with self._lock:
+            current = self.interpreter.get_input_details()[0]["shape"]
+            if tuple(current) != batch.shape:
+                self.interpreter.resize_tensor_input(self._input, batch.shape)
+                self.interpreter.allocate_tensors()
+            self.interpreter.set_tensor(self._input, batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output).copy()
+
+
+BACKENDS = {backend.name: backend for backend in (KerasBackend, OnnxBackend, TFLiteBackend)}
+
+QUANTIZED_PRECISIONS = ("int8", "fp16")
+
+
+def quantized_artifact_path(precision: str) -> str:
+    """Where the quantized artifact for `precision` lives, next to VGG16_MODEL_PATH."""
+    stem = os.path.splitext(settings.VGG16_MODEL_PATH)[0]
+    return f"{stem}.{precision}.tflite"
+
+
+def validation_report_path(artifact_path: str) -> str:
+    return f"{artifact_path}.report.json"
+
+
+def load_quantized_backend(precision: str) -> TFLiteBackend:
+    """
+    Load the quantized VGG16 artifact, but only if its validation report shows
+    class agreement with the full-precision model of at least
+    VGG16_MIN_AGREEMENT. Raises RuntimeError otherwise, so the service
+    refuses to serve an unvalidated or degraded model.
+    """
+    if precision not in QUANTIZED_PRECISIONS:
+        raise ValueError(
+            f"Unknown VGG16 precision '{precision}'. Choose fp32 or one of: {', '.join(QUANTIZED_PRECISIONS)}"
+        )
+    artifact = quantized_artifact_path(precision)
+    report_path = validation_report_path(artifact)
+    try:
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    except FileNotFoundError:
+        raise RuntimeError(
+            f"No validation report at {report_path} — run `python -m app.tools.quantize_vgg16 "
+            f"--precision {precision} --samples <dir>` before enabling {precision} mode."
+        )
+
+    agreement = report.get("class_agreement", 0.0)
+    if agreement < settings.VGG16_MIN_AGREEMENT:
+        raise RuntimeError(
+            f"Refusing {precision} VGG16: class agreement {agreement:.4f} is below "
+            f"VGG16_MIN_AGREEMENT={settings.VGG16_MIN_AGREEMENT}"
+        )
+
+    logger.info(
+        f"{precision} VGG16 validated: agreement={agreement:.4f}, "
+        f"max drift={report.get('max_probability_drift', float('nan')):.4f}"
+    )
+    return TFLiteBackend.load(artifact)
+
+
+def get_backend_class(name: str | None = None) -> type[InferenceBackend]:
+    name = (name or settings.VGG16_BACKEND).lower()
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown VGG16 backend '{name}'. Choose one of: {', '.join(BACKENDS)}"
+        )
+
+
+def load_backend(name: str | None = None, path: str | None = None) -> InferenceBackend:
+    """Load the configured (or named) backend from its default (or given) path."""
+    backend_cls = get_backend_class(name)
+    return backend_cls.load(path or backend_cls.default_path())
+
+
+def compare_backends(reference: InferenceBackend, candidate: InferenceBackend, batches) -> dict:
+    """
+    Run the same preprocessed batches through two backends and report how
+    closely the candidate follows the reference: class agreement and the
+    drift of the predicted-class probability.
+    """
+    total = agree = 0
+    max_drift = 0.0
+    drift_sum = 0.0
+    for batch in batches:
+        ref = reference.predict(batch)
+        cand = candidate.predict(batch)
+        ref_cls = np.argmax(ref, axis=1)
+        cand_cls = np.argmax(cand, axis=1)
+        drift = np.abs(ref - cand).max(axis=1)
+
+        total += len(batch)
+        agree += int((ref_cls == cand_cls).sum())
+        max_drift = max(max_drift, float(drift.max()))
+        drift_sum += float(drift.sum())
+
+    return {
+        "reference": reference.name,
+        "candidate": candidate.name,
+        "samples": total,
+        "class_agreement": agree / total if total else 0.0,
+        "max_probability_drift": max_drift,
+        "mean_probability_drift": drift_sum / total if total else 0.0,
+    }
@@ -1,48 +1,94 @@
-import pandas as pd
+import numpy as np
+from app.core.metrics import timed
 from app.utils.model import FloodPredictor
 from app.utils.mlpipeline import MlPipeline
 from app.utils.weather import DataProcessing
 
 
 class HeuristicModel:
-    def __init__(self, image_path, lon, lat, vgg_model, xgb_model, scaler):
+    def __init__(self, image, lon, lat, vgg_model, xgb_model, scaler, shap_explainer=None):
         """
-        Run the full heuristic prediction pipeline.
+        Heuristic prediction pipeline for one drain image and location.
 
-        vgg_model, xgb_model, scaler are passed in from FloodModelService
+        vgg_model, xgb_model, scaler, shap_explainer are passed in from FloodModelService
         (the startup cache) so this module never imports from flood_service,
         avoiding the circular-import chain.
+
+        image may be a file path, raw bytes or a binary file-like object —
+        uploads are decoded straight from memory without a temp file.
+
+        The stages are invoked by the caller (load_weather → explain_weather,
+        classify_drain, then predict) so each one can be awaited or dispatched
+        onto the appropriate executor pool.
         """
-        self.image_path = image_path
+        self.image = image
         self.lon = lon
         self.lat = lat
+        self.vgg_model = vgg_model
+        self.xgb_model = xgb_model
+        self.scaler = scaler
+        self.shap_explainer = shap_explainer
 
-        # Fetch and process weather data
-        data = DataProcessing(lat, lon).process_data()
+    async def load_weather(self):
+        """Fetch and process weather data (async, network-bound)."""
+        self.apply_weather(await DataProcessing(self.lat, self.lon).process_data())
+
+    def apply_weather(self, data):
+        """Record processed weather data fetched elsewhere (e.g. shared by a batch)."""
+        self.features = data.get("features")[0:1]
         self.input_data = data.get("inputs")[0]
         self.output_data = data.get("outputs")[0]
         self.metadata = data.get("metadata")[0]
 
-        # SHAP values for weather (XGBoost)
+    def explain_weather(self):
+        """SHAP values for weather (XGBoost, per settings.SHAP_MODE). Requires load_weather()."""
         self.weather_shap_value = MlPipeline(
-            pd.DataFrame([self.input_data]),
-            model=xgb_model,
-            scaler=scaler,
-        ).explain_shap()
+            self.features,
+            model=self.xgb_model,
+            scaler=self.scaler,
+            explainer=self.shap_explainer,
+        ).explain()
+
+    @staticmethod
+    def explain_weather_batch(models):
+        """
+        SHAP values for several HeuristicModels in one XGBoost/SHAP pass.
+        Row i of the returned explanation belongs to models[i].
+        """
+        if not models:
+            return None
+        return MlPipeline(
+            np.vstack([m.features for m in models]),
+            model=models[0].xgb_model,
+            scaler=models[0].scaler,
+            explainer=models[0].shap_explainer,
+        ).explain()
 
-        # Drain blockage prediction (VGG16 CNN)
-        flood_json = FloodPredictor(model=vgg_model).predict(image_path=image_path)
+    @timed("classify_drain")
+    def classify_drain(self):
+        """Drain blockage prediction (VGG16 CNN)."""
+        flood_json = FloodPredictor(model=self.vgg_model).predict(self.image)
+        self.apply_blockage(flood_json)
+
+    def apply_blockage(self, flood_json):
+        """Record a FloodPredictor result computed elsewhere (e.g. a batched pass)."""
         self.blockage = flood_json.get("blockage")
         self.blockage_prob = flood_json.get("probability")
         self.blockage_shap_value = flood_json.get("shap_values")
 
+    @timed("rules")
     def predict(self):
-        precip = self.output_data["precip"]
-        weather = self.output_data["weather"]
-        rh = self.input_data.get("rh", 0)
-        blockage = self.blockage
-        blockage_prob = self.blockage_prob
+        return HeuristicModel.evaluate(
+            precip=self.output_data["precip"],
+            weather=self.output_data["weather"],
+            rh=self.input_data.get("rh", 0),
+            blockage=self.blockage,
+            blockage_prob=self.blockage_prob,
+        )
 
+    @staticmethod
+    def evaluate(precip, weather, rh, blockage, blockage_prob):
+        """Heuristic flood-risk rules over one row of weather + blockage results."""
         high_precip = precip > 10
         moderate_precip = 5 < precip <= 10
         light_precip = 0 < precip <= 5
@@ -1,36 +1,90 @@
 import logging
-import shap
 import numpy as np
-import pandas as pd
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import span, timed
 
 logger = logging.getLogger(__name__)
 
 
+class Contributions:
+    """
+    Per-feature contributions in the same shape shap.Explanation exposes to
+    callers: values is (rows, features[, outputs]) and base_values is
+    (rows[, outputs]).
+    """
+
+    def __init__(self, values: np.ndarray, base_values: np.ndarray, data: np.ndarray, feature_names: list):
+        self.values = values
+        self.base_values = base_values
+        self.data = data
+        self.feature_names = feature_names
+
+
+def native_contributions(model, scaled: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exact TreeSHAP contributions computed by XGBoost itself
+    (Booster.predict(pred_contribs=True)). Returns (values, base_values)
+    laid out like shap's output for the same model. An early-stopped model
+    is explained up to its best iteration, as model.predict() and shap do.
+    """
+    import xgboost
+
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    matrix = xgboost.DMatrix(scaled, feature_names=booster.feature_names)
+    best_iteration = getattr(booster, "best_iteration", None)
+    iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+    contribs = booster.predict(matrix, pred_contribs=True, iteration_range=iteration_range)
+    # Last column is the bias term; multi-output models add an output axis
+    # before the feature axis, which shap puts last.
+    if contribs.ndim == 3:
+        return contribs[:, :, :-1].transpose(0, 2, 1), contribs[:, :, -1]
+    return contribs[:, :-1], contribs[:, -1]
+
+
 class MlPipeline:
-    def __init__(self, data: pd.DataFrame, model, scaler):
+    # SHAP rows keyed by the scaled feature row — weather for one location
+    # barely changes within the hour, so repeat calls skip the explainer
+    shap_cache = LRUCache(settings.SHAP_CACHE_SIZE)
+
+    def __init__(self, data: np.ndarray, model, scaler, explainer=None):
         """
         Initialize ML Pipeline with pre-loaded model and scaler instances.
         Models are passed in by the caller (FloodModelService) to avoid
         circular imports and repeated disk reads.
+
+        data is a (rows, features) array ordered by settings.INPUT_COLUMNS,
+        as produced by DataProcessing; a DataFrame is still accepted.
+
+        explainer is the shap.Explainer built once in load_models(); when
+        omitted one is constructed on demand (slow — parses the whole ensemble).
         """
         self.data = data
         self.model = model
         self.scaler = scaler
+        self.explainer = explainer
 
         if self.scaler is None or self.model is None:
             raise ValueError(
                 "Model or scaler is None — ensure FloodModelService.load_models() ran at startup."
             )
 
+    @property
+    def feature_names(self):
+        if hasattr(self.data, "columns"):
+            return self.data.columns.tolist()
+        return list(settings.INPUT_COLUMNS)
+
     def validate_data(self):
-        """Ensure input data is a DataFrame or NumPy array before scaling."""
+        """Ensure input data is a NumPy array (or DataFrame) before scaling."""
         if isinstance(self.data, np.ndarray):
             return self.data
-        elif isinstance(self.data, pd.DataFrame):
-            return self.data.values
+        elif hasattr(self.data, "to_numpy"):
+            return self.data.to_numpy()
         else:
             raise TypeError("Input data must be a NumPy array or Pandas DataFrame.")
 
+    @timed("scale")
     def scale(self):
         """Scale the input data using the provided scaler."""
         validated_data = self.validate_data()
@@ -40,17 +94,79 @@ class MlPipeline:
             raise RuntimeError(f"Error scaling data: {e}")
 
     def explain_shap(self):
-        """Compute SHAP values for the XGBoost model's predictions."""
+        """
+        Compute SHAP values for the XGBoost model's predictions.
+
+        Rows already in shap_cache are reused; only the misses go through the
+        explainer. Returns a shap.Explanation with one row per input row.
+        """
+        import shap  # heavy; deferred until the first explanation
+
         try:
-            explainer = shap.Explainer(
-                self.model, feature_names=self.data.columns.tolist()
+            scaled = np.asarray(self.scale())
+            keys = [row.tobytes() for row in scaled]
+            rows = [MlPipeline.shap_cache.get(key) for key in keys]
+
+            missing = [i for i, row in enumerate(rows) if row is None]
+            if missing:
+                explainer = self.explainer or shap.Explainer(
+                    self.model, feature_names=self.feature_names
+                )
+                explanation = explainer(scaled[missing])
+                base_values = np.broadcast_to(
+                    explanation.base_values, (len(missing),) + np.shape(explanation.base_values)[1:]
+                )
+                for j, i in enumerate(missing):
+                    rows[i] = (explanation.values[j], base_values[j])
+                    MlPipeline.shap_cache.set(keys[i], rows[i])
+
+            return shap.Explanation(
+                values=np.stack([values for values, _ in rows]),
+                base_values=np.array([base for _, base in rows]),
+                data=scaled,
+                feature_names=self.feature_names,
             )
-            shap_values = explainer(self.scale())
-            return shap_values
         except Exception as e:
             logger.error(f"Error computing SHAP values: {e}")
             return None
 
+    def explain_contribs(self):
+        """
+        Native XGBoost contributions for every input row — same numbers as the
+        shap TreeExplainer path without the shap library on the request path.
+        Uses shap_cache like explain_shap. Returns a Contributions object, or
+        None on error.
+        """
+        try:
+            scaled = np.asarray(self.scale())
+            keys = [("contribs", row.tobytes()) for row in scaled]
+            rows = [MlPipeline.shap_cache.get(key) for key in keys]
+
+            missing = [i for i, row in enumerate(rows) if row is None]
+            if missing:
+                values, base_values = native_contributions(self.model, scaled[missing])
+                for j, i in enumerate(missing):
+                    rows[i] = (values[j], base_values[j])
+                    MlPipeline.shap_cache.set(keys[i], rows[i])
+
+            return Contributions(
+                values=np.stack([values for values, _ in rows]),
+                base_values=np.array([base for _, base in rows]),
+                data=scaled,
+                feature_names=self.feature_names,
+            )
+        except Exception as e:
+            logger.error(f"Error computing XGBoost contributions: {e}")
+            return None
+
+    def explain(self):
+        """Weather explanation using the configured settings.SHAP_MODE."""
+        if settings.SHAP_MODE == "shap":
+            with span("shap_explainer"):
+                return self.explain_shap()
+        with span("shap_native"):
+            return self.explain_contribs()
+
     def predict(self):
         """Generate predictions using the pre-trained XGBoost model."""
         try:
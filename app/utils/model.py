@@ -1,6 +1,10 @@
+import io
 import logging
 import numpy as np
 from PIL import Image
+from app.core.config import settings
+from app.core.metrics import timed
+from app.utils.backends import InferenceBackend, KerasBackend
 
 logger = logging.getLogger(__name__)
 
@@ -8,46 +12,79 @@ logger = logging.getLogger(__name__)
 class FloodPredictor:
     def __init__(self, model):
         """
-        Initialize with a pre-loaded Keras model instance.
+        Initialize with a pre-loaded InferenceBackend (see app.utils.backends);
+        a bare Keras model is wrapped in KerasBackend.
         Model is passed in by the caller (FloodModelService) to avoid
         circular imports and repeated disk reads.
         """
         self.img_size = (256, 256)
+        if model is not None and not isinstance(model, InferenceBackend):
+            model = KerasBackend(model)
         self.model = model
         if self.model is None:
             raise RuntimeError(
                 "VGG16 model is None — ensure FloodModelService.load_models() ran at startup."
             )
 
-    def preprocess_image(self, image_path):
-        """Load and preprocess a single image for prediction."""
+    def open_image(self, image):
+        """
+        Open an image from a path, raw bytes or a binary file-like object.
+
+        JPEGs are decoded with PIL's draft mode, which lets libjpeg scale by
+        1/2, 1/4 or 1/8 during decoding — a 4K camera frame is decoded at
+        close to img_size instead of full resolution before the final resize.
+        """
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            image = io.BytesIO(image)
+        img = Image.open(image)
+        if settings.VGG_JPEG_DRAFT_DECODE:
+            img.draft("RGB", self.img_size)
+        return img
+
+    @timed("image_decode")
+    def preprocess_image(self, image):
+        """Load and preprocess a single image (path, bytes or buffer) for prediction."""
         try:
-            image = Image.open(image_path).convert("RGB")
+            image = self.open_image(image).convert("RGB")
             image = image.resize(self.img_size)
-            image_array = np.array(image) / 255.0
+            image_array = np.asarray(image, dtype=np.float32) / 255.0
             image_array = np.expand_dims(image_array, axis=0)
             return image_array
         except Exception as e:
-            raise RuntimeError(f"Error processing image '{image_path}': {e}")
+            source = image if isinstance(image, str) else type(image).__name__
+            raise RuntimeError(f"Error processing image '{source}': {e}")
 
-    def predict(self, image_path):
+    def predict(self, image):
         """
-        Predict drain blockage class from image.
+        Predict drain blockage class from image (path, bytes or buffer).
 
         Returns dict with keys:
           - blockage (int): 0=Full blockage, 1=No blockage, 2=Partial blockage
           - probability (float): Confidence score for the predicted class
           - shap_values: Always None (CNN SHAP disabled — too slow for VGG16 at inference)
         """
-        image_array = self.preprocess_image(image_path)
+        image_array = self.preprocess_image(image)
+        return self.predict_batch([image_array])[0]
+
+    @timed("vgg16_forward")
+    def predict_batch(self, image_arrays):
+        """
+        Predict drain blockage for several preprocessed images in one forward pass.
+
+        Accepts a list of (1, 256, 256, 3) arrays as returned by preprocess_image
+        and returns one result dict (same shape as predict()) per image, in order.
+        """
         try:
-            prediction = self.model.predict(image_array, verbose=0)
-            predicted_class = int(np.argmax(prediction, axis=1)[0])
-            probability = float(prediction[0, predicted_class])
-            return {
-                "blockage": predicted_class,
-                "probability": probability,
-                "shap_values": None,
-            }
+            batch = np.concatenate(image_arrays, axis=0)
+            prediction = self.model.predict(batch)
+            predicted_classes = np.argmax(prediction, axis=1)
+            return [
+                {
+                    "blockage": int(cls),
+                    "probability": float(prediction[i, cls]),
+                    "shap_values": None,
+                }
+                for i, cls in enumerate(predicted_classes)
+            ]
         except Exception as e:
             raise RuntimeError(f"Error during CNN prediction: {e}")
@@ -1,51 +1,144 @@
+import asyncio
 import logging
-import pandas as pd
-import requests
+import random
+from typing import TypedDict
+import httpx
+import numpy as np
+from app.core.cache import LRUCache, SingleFlight
 from app.core.config import settings
+from app.core.http import HttpClients, WEATHERBIT
+from app.core.metrics import upstream_call, upstream_error
 
 logger = logging.getLogger(__name__)
 
 
+class WeatherOutputs(TypedDict):
+    """Observed values the heuristic rules read (settings.OUTPUT_COLUMNS)."""
+    weather: str    # description, e.g. "Heavy rain"
+    precip: float   # mm/hr
+
+
+class WeatherMetadata(TypedDict, total=False):
+    """Descriptive fields from settings.META_DATA; absent keys are skipped."""
+    timezone: str
+    temp: float
+    sources: list
+    country_code: str
+    city_name: str
+
+
+def _number(value):
+    """A Weatherbit numeric field, with null mapped to NaN."""
+    return np.nan if value is None else value
+
+
 class DataProcessing:
+    # Processed weather per spatial bucket. Cameras in the same ward share one
+    # Weatherbit observation until it refreshes.
+    cache = LRUCache(settings.WEATHER_CACHE_SIZE, ttl=settings.WEATHER_CACHE_TTL_SECONDS)
+    _flight = SingleFlight()
+
     def __init__(self, lat, lon):
         self.lat = lat
         self.lon = lon
 
-    def fetch_data(self):
-        """Fetch weather data from Weatherbit API."""
-        try:
-            uri = f"https://api.weatherbit.io/v2.0/current?lat={self.lat}&lon={self.lon}&key={settings.API_KEY}"
-            response = requests.get(uri, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"Fetching Data Error: {e}")
-
-    def process_data(self):
+    @staticmethod
+    def bucket(lat, lon) -> tuple:
+        """Spatial cache key: coordinates rounded to WEATHER_CACHE_PRECISION decimals."""
+        precision = settings.WEATHER_CACHE_PRECISION
+        return (round(float(lat), precision), round(float(lon), precision))
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {**cls.cache.stats(), **cls._flight.stats()}
+
+    async def fetch_data(self):
+        """
+        Fetch weather data from Weatherbit API.
+
+        Transport errors and 5xx responses are retried up to
+        WEATHER_MAX_RETRIES times with full-jitter exponential backoff.
+        """
+        params = {"lat": self.lat, "lon": self.lon, "key": settings.API_KEY}
+        retries = settings.WEATHER_MAX_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                with upstream_call(WEATHERBIT):
+                    response = await HttpClients.get(WEATHERBIT).get(
+                        settings.WEATHERBIT_URL, params=params
+                    )
+                if response.is_error:
+                    upstream_error(WEATHERBIT)
+                if response.status_code >= 500 and attempt < retries:
+                    logger.warning(
+                        f"Weatherbit returned {response.status_code}, "
+                        f"retrying ({attempt + 1}/{retries})"
+                    )
+                else:
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError as e:
+                if attempt >= retries:
+                    raise RuntimeError(f"Fetching Data Error: {e}")
+                logger.warning(f"Weatherbit request failed: {e}, retrying ({attempt + 1}/{retries})")
+            except httpx.HTTPStatusError as e:
+                raise RuntimeError(f"Fetching Data Error: {e}")
+
+            await asyncio.sleep(random.uniform(0, settings.WEATHER_RETRY_BACKOFF * 2**attempt))
+
+    async def process_data(self):
+        """
+        Processed weather for this location, served from the bucket cache when
+        fresh. Concurrent misses for one bucket share a single upstream call.
+        """
+        key = DataProcessing.bucket(self.lat, self.lon)
+        cached = DataProcessing.cache.get(key)
+        if cached is not None:
+            return cached
+        return await DataProcessing._flight.do(key, self._refresh, key)
+
+    async def _refresh(self, key):
+        processed = self._process(await self.fetch_data())
+        DataProcessing.cache.set(key, processed)
+        return processed
+
+    def _process(self, data):
         """Process fetched weather data into a structured format."""
-        data = self.fetch_data()
         if "data" not in data:
             raise ValueError("Invalid response format: Missing 'data' key")
+        return DataProcessing.process_rows(data["data"])
 
-        df = pd.DataFrame(data["data"])
+    @staticmethod
+    def process_rows(rows: list) -> dict:
+        """
+        Turn Weatherbit observation / forecast rows into model-ready records
+        without pandas.
 
-        # Convert 'ts' column to datetime
-        if "ts" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["ts"], unit="s")
-            df["hour"] = df["timestamp"].dt.hour
-            df["month"] = df["timestamp"].dt.month
-            df.drop(["ts", "timestamp"], axis=1, inplace=True)
+        Returns:
+          - features : float32 array, shape (len(rows), len(INPUT_COLUMNS)),
+                       columns ordered by settings.INPUT_COLUMNS
+          - inputs   : per-row dicts of the same input values (original types)
+          - outputs  : per-row WeatherOutputs
+          - metadata : per-row WeatherMetadata (missing keys skipped)
+        """
+        n = len(rows)
 
-        # Extract weather description from nested dict
-        if "weather" in df.columns:
-            df["weather"] = df["weather"].apply(
-                lambda x: x["description"] if isinstance(x, dict) else x
-            )
+        # Derive hour / month (UTC) from the epoch 'ts' field, vectorised
+        derived = {}
+        if n and any("ts" in row for row in rows):
+            ts = np.array([row.get("ts", 0) for row in rows], dtype="int64")
+            derived["hour"] = ((ts // 3600) % 24).tolist()
+            months_since_epoch = ts.astype("datetime64[s]").astype("datetime64[M]").astype("int64")
+            derived["month"] = (months_since_epoch % 12 + 1).tolist()
+
+        present = set(derived)
+        for row in rows:
+            present.update(row)
 
         # Validate required columns exist
-        missing_input = [c for c in settings.INPUT_COLUMNS if c not in df.columns]
-        missing_output = [c for c in settings.OUTPUT_COLUMNS if c not in df.columns]
-        missing_meta = [c for c in settings.META_DATA if c not in df.columns]
+        missing_input = [c for c in settings.INPUT_COLUMNS if c not in present]
+        missing_output = [c for c in settings.OUTPUT_COLUMNS if c not in present]
+        missing_meta = [c for c in settings.META_DATA if c not in present]
 
         if missing_input:
             raise ValueError(
@@ -59,16 +152,34 @@ class DataProcessing:
             logger.warning(
                 f"Missing metadata columns (will be skipped): {missing_meta}"
             )
-            available_meta = [c for c in settings.META_DATA if c in df.columns]
+            available_meta = [c for c in settings.META_DATA if c in present]
         else:
             available_meta = settings.META_DATA
 
-        inputs = df[settings.INPUT_COLUMNS]
-        outputs = df[settings.OUTPUT_COLUMNS]
-        metadata = df[available_meta]
+        features = np.empty((n, len(settings.INPUT_COLUMNS)), dtype=np.float32)
+        inputs, outputs, metadata = [], [], []
+        for i, row in enumerate(rows):
+            # null / absent numbers become NaN, as they did in the DataFrame path —
+            # the heuristic rules compare them and must not see None
+            record = {
+                c: derived[c][i] if c in derived else _number(row.get(c))
+                for c in settings.INPUT_COLUMNS
+            }
+            features[i] = list(record.values())
+            inputs.append(record)
+
+            weather = row.get("weather")
+            outputs.append(
+                WeatherOutputs(
+                    weather=weather.get("description") if isinstance(weather, dict) else weather,
+                    precip=_number(row.get("precip")),
+                )
+            )
+            metadata.append(WeatherMetadata(**{c: row.get(c) for c in available_meta}))
 
         return {
-            "inputs": inputs.to_dict(orient="records"),
-            "outputs": outputs.to_dict(orient="records"),
-            "metadata": metadata.to_dict(orient="records"),
+            "features": features,
+            "inputs": inputs,
+            "outputs": outputs,
+            "metadata": metadata,
         }
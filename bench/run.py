@@ -0,0 +1,309 @@
+# bench/run.py
+"""
+End-to-end load benchmark for the real FastAPI app against stubbed upstreams.
+
+    python -m bench.run [--scenarios predict,geocode,s3] [--concurrency 16] \
+        [--requests 400] [--warmup-requests 20] \
+        [--weather-latency-ms 80] [--weather-failure-rate 0.0] \
+        [--geocode-latency-ms 150] [--geocode-failure-rate 0.0] \
+        [--msg91-latency-ms 120] [--msg91-failure-rate 0.0] [--jitter-ms 10] \
+        [--vgg-ms 0] [--s3-latency-ms 20] [--s3-mode base64] \
+        [--locations 20] [--images 64] [--disable-caches] \
+        [--save bench/baselines/NAME.json] [--compare bench/baselines/NAME.json] \
+        [--max-regression 0.15]
+
+Starts local Weatherbit / Nominatim / MSG91 stubs (bench.stubs), points
+the app's settings at them, swaps in the deterministic stand-in models and
+fake S3 bucket (bench.standins) and serves main:app under uvicorn. Each
+scenario is then driven over HTTP with --concurrency clients for
+--requests requests and reported as latency percentiles, RPS, status
+counts, the per-stage breakdown of /predict-flood/ (from /api/v1/stats)
+and upstream call counts.
+
+--save writes the report as a JSON baseline. --compare prints the change in
+p50 / p99 / RPS per scenario against a saved baseline and exits 1 when any
+of them regresses by more than --max-regression.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+from bench.stubs import Fault, ServerThread, msg91_app, nominatim_app, weatherbit_app
+
+logger = logging.getLogger("bench")
+
+SCENARIOS = ("predict", "geocode", "s3")
+
+
+def configure_environment(args, weatherbit: str, nominatim: str, msg91: str):
+    """Settings for the app under test — must run before anything imports `app`."""
+    env = {
+        "API_KEY": "bench",
+        "AWS_ACCESS_KEY": "bench",
+        "AWS_SECRET_KEY": "bench",
+        "BUCKET_NAME": "bench",
+        "MSG91_AUTH_KEY": "bench",
+        "MSG91_TEMPLATE_ID": "bench",
+        "SENDER_EMAIL": "bench@example.com",
+        "RECIPIENT_EMAIL": "bench@example.com",
+        "WEATHERBIT_URL": f"{weatherbit}/v2.0/current",
+        "NOMINATIM_URL": f"{nominatim}/reverse",
+        "MSG91_API_URL": f"{msg91}/api/v5/email/send",
+        "GEOCODE_MIN_INTERVAL_SECONDS": str(args.geocode_min_interval),
+        "GEOCODE_CACHE_PATH": "",
+        "HTTP2_ENABLED": "false",
+        "S3_INDEX_REFRESH_SECONDS": "3600",
+    }
+    if args.disable_caches:
+        for name in ("PREDICTION_CACHE_SIZE", "WEATHER_CACHE_SIZE", "GEOCODE_CACHE_SIZE", "SHAP_CACHE_SIZE", "S3_PREFETCH_SIZE"):
+            env[name] = "0"
+    os.environ.update(env)
+
+
+def _locations(count: int, seed: int = 0) -> list[tuple[float, float]]:
+    rng = np.random.default_rng(seed)
+    return [
+        (round(float(lat), 5), round(float(lon), 5))
+        for lat, lon in zip(rng.uniform(18.90, 19.25, count), rng.uniform(72.80, 72.98, count))
+    ]
+
+
+def _summarize(latencies: list[float], statuses: Counter, wall: float) -> dict:
+    ms = np.array(latencies) * 1000
+    ok = sum(count for status, count in statuses.items() if status == 200)
+    return {
+        "requests": len(latencies),
+        "ok": ok,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "wall_s": round(wall, 3),
+        "rps": round(len(latencies) / wall, 2) if wall else None,
+        "latency_ms": {
+            "mean": round(float(ms.mean()), 2),
+            "p50": round(float(np.percentile(ms, 50)), 2),
+            "p90": round(float(np.percentile(ms, 90)), 2),
+            "p95": round(float(np.percentile(ms, 95)), 2),
+            "p99": round(float(np.percentile(ms, 99)), 2),
+            "max": round(float(ms.max()), 2),
+        }
+        if len(ms)
+        else {},
+    }
+
+
+async def drive(client: httpx.AsyncClient, make_request, concurrency: int, total: int) -> dict:
+    """Issue `total` requests from `concurrency` concurrent clients."""
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    counter = itertools.count()
+
+    async def worker():
+        while (n := next(counter)) < total:
+            start = time.perf_counter()
+            try:
+                response = await make_request(client, n)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summarize(latencies, statuses, time.perf_counter() - start)
+
+
+def _stage_delta(before: dict, after: dict) -> dict:
+    """
+    Per-stage count and average over the requests between two /stats
+    snapshots. The stats' max_ms is cumulative since startup (warm-up and
+    earlier scenarios included), so it has no per-run counterpart here.
+    """
+    delta = {}
+    for name, stage in after.items():
+        prev = before.get(name, {"count": 0, "avg_ms": 0.0})
+        count = stage["count"] - prev["count"]
+        if count > 0:
+            total = stage["avg_ms"] * stage["count"] - prev["avg_ms"] * prev["count"]
+            delta[name] = {"count": count, "avg_ms": round(total / count, 2)}
+    return delta
+
+
+def _requests(args, images: list[bytes], locations: list):
+    async def predict(client, n):
+        lat, lon = locations[n % len(locations)]
+        files = {"image": (f"frame_{n}.jpg", images[n % len(images)], "image/jpeg")}
+        data = {"request": json.dumps({"lat": lat, "lon": lon})}
+        return await client.post("/api/v1/predict-flood/", files=files, data=data)
+
+    async def geocode(client, n):
+        lat, lon = locations[n % len(locations)]
+        return await client.get("/api/v1/reverse-geocode", params={"lat": lat, "lon": lon})
+
+    async def s3(client, n):
+        return await client.get("/api/v1/get-latest-s3-image", params={"mode": args.s3_mode})
+
+    return {"predict": predict, "geocode": geocode, "s3": s3}
+
+
+async def run_scenarios(args, base_url: str, faults: dict) -> dict:
+    from bench.standins import make_image
+
+    images = [make_image(i) for i in range(args.images)]
+    locations = _locations(args.locations)
+    requests = _requests(args, images, locations)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        deadline = time.monotonic() + 300
+        while (await client.get("/readyz")).status_code != 200:
+            if time.monotonic() > deadline:
+                raise RuntimeError("App did not become ready")
+            await asyncio.sleep(0.2)
+
+        results = {}
+        for name in args.scenarios:
+            if args.warmup_requests:
+                await drive(client, requests[name], args.concurrency, args.warmup_requests)
+            upstream_before = {k: f.stats() for k, f in faults.items()}
+            stats_before = (await client.get("/api/v1/stats")).json()
+
+            logger.info(f"Running {name}: {args.requests} requests at concurrency {args.concurrency}")
+            summary = await drive(client, requests[name], args.concurrency, args.requests)
+
+            stats_after = (await client.get("/api/v1/stats")).json()
+            summary["stages"] = _stage_delta(stats_before["stages"], stats_after["stages"])
+            summary["upstreams"] = {
+                k: {m: f.stats()[m] - upstream_before[k][m] for m in f.stats()}
+                for k, f in faults.items()
+            }
+            results[name] = summary
+            logger.info(
+                f"{name}: p50={summary['latency_ms'].get('p50')}ms "
+                f"p99={summary['latency_ms'].get('p99')}ms rps={summary['rps']}"
+            )
+        return results
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Print per-scenario changes against `baseline`; return the regressions."""
+    regressions = []
+    print(f"\n{'scenario':<10} {'metric':<6} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for metric, worse_if_higher in (("p50", True), ("p99", True), ("rps", False)):
+            if metric == "rps":
+                old, new = previous["rps"], current["rps"]
+            else:
+                old, new = previous["latency_ms"][metric], current["latency_ms"][metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            regressed = change > max_regression if worse_if_higher else change < -max_regression
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<10} {metric:<6} {old:>10.2f} {new:>10.2f} {change:>+7.1%}{flag}")
+            if regressed:
+                regressions.append(f"{name} {metric} {change:+.1%}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated subset of {SCENARIOS}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400, help="measured requests per scenario")
+    parser.add_argument("--warmup-requests", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--weather-latency-ms", type=float, default=80)
+    parser.add_argument("--weather-failure-rate", type=float, default=0.0)
+    parser.add_argument("--geocode-latency-ms", type=float, default=150)
+    parser.add_argument("--geocode-failure-rate", type=float, default=0.0)
+    parser.add_argument("--geocode-min-interval", type=float, default=0.0, help="GEOCODE_MIN_INTERVAL_SECONDS for the app")
+    parser.add_argument("--msg91-latency-ms", type=float, default=120)
+    parser.add_argument("--msg91-failure-rate", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=10, help="± latency jitter for every stub")
+    parser.add_argument("--vgg-ms", type=float, default=0.0, help="simulated VGG16 cost per image")
+    parser.add_argument("--s3-latency-ms", type=float, default=20)
+    parser.add_argument("--s3-images", type=int, default=50, help="images per fake S3 folder")
+    parser.add_argument("--s3-mode", choices=("base64", "stream", "presigned"), default="base64")
+    parser.add_argument("--locations", type=int, default=20, help="distinct coordinates cycled through")
+    parser.add_argument("--images", type=int, default=64, help="distinct images cycled through")
+    parser.add_argument("--disable-caches", action="store_true", help="turn off prediction / weather / geocode / SHAP / S3 caches")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", default=None, help="write the report to this JSON baseline")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    args = parser.parse_args(argv)
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+
+    faults = {
+        "weatherbit": Fault(args.weather_latency_ms, args.jitter_ms, args.weather_failure_rate, args.seed),
+        "nominatim": Fault(args.geocode_latency_ms, args.jitter_ms, args.geocode_failure_rate, args.seed + 1),
+        "msg91": Fault(args.msg91_latency_ms, args.jitter_ms, args.msg91_failure_rate, args.seed + 2),
+    }
+    stubs = {
+        "weatherbit": ServerThread(weatherbit_app(faults["weatherbit"])).start(),
+        "nominatim": ServerThread(nominatim_app(faults["nominatim"])).start(),
+        "msg91": ServerThread(msg91_app(faults["msg91"])).start(),
+    }
+    configure_environment(args, stubs["weatherbit"].url, stubs["nominatim"].url, stubs["msg91"].url)
+
+    # Only now is it safe to import the app (settings read the environment)
+    from bench.standins import install_models, install_s3
+    from main import app
+
+    install_models(args.vgg_ms, args.seed)
+    install_s3(args.s3_images, args.s3_latency_ms)
+    server = ServerThread(app).start()
+
+    try:
+        scenarios = asyncio.run(run_scenarios(args, server.url, faults))
+    finally:
+        server.stop()
+        for stub in stubs.values():
+            stub.stop()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+        },
+        "scenarios": scenarios,
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            logger.error(f"Regressions beyond {args.max_regression:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# bench/standins.py
+"""
+Tiny deterministic replacements for the production model files and the S3
+bucket, so the benchmark measures the service rather than the models.
+
+- StandInVgg     : InferenceBackend whose class follows the image's dominant
+                   colour channel, with an optional simulated forward-pass cost
+- weather models : a small real XGBRegressor + StandardScaler fitted on seeded
+                   synthetic data, so scaling and SHAP run the real code paths
+- FakeS3Client   : the subset of the boto3 S3 client S3Service uses, backed by
+                   generated JPEGs with lat/lon metadata
+
+Import only after the benchmark has configured the environment — importing
+app modules instantiates settings.
+"""
+import io
+import random
+import time
+from urllib.parse import quote
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import settings
+from app.services.s3_service import S3Service
+from app.utils.backends import InferenceBackend
+
+# Dominant channel → class: red = full (0), green = none (1), blue = partial (2)
+_CLASS_COLOURS = [(170, 60, 60), (60, 170, 60), (60, 60, 170)]
+
+
+def make_image(index: int, size: tuple = (640, 480)) -> bytes:
+    """A distinct, deterministic JPEG per index, cycling through the three classes."""
+    rng = np.random.default_rng(index)
+    base = np.array(_CLASS_COLOURS[index % 3], dtype=np.int16)
+    noise = rng.integers(-40, 40, size=(size[1], size[0], 3), dtype=np.int16)
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class StandInVgg(InferenceBackend):
+    """Softmax over mean channel intensities; sleeps compute_ms per image to mimic VGG16."""
+
+    name = "bench"
+
+    def __init__(self, compute_ms: float = 0.0):
+        self.compute_ms = compute_ms
+
+    @classmethod
+    def default_path(cls) -> str:
+        return ""  # nothing on disk
+
+    @classmethod
+    def load(cls, path: str) -> "StandInVgg":
+        return cls()
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        if self.compute_ms:
+            time.sleep(self.compute_ms * len(batch) / 1000)
+        logits = batch.reshape(len(batch), -1, 3).mean(axis=1) * 12.0
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def build_weather_models(seed: int = 0, rows: int = 512):
+    """(xgb_model, scaler) fitted on seeded synthetic weather features."""
+    from sklearn.preprocessing import StandardScaler
+    from xgboost import XGBRegressor
+
+    rng = np.random.default_rng(seed)
+    columns = len(settings.INPUT_COLUMNS)
+    features = rng.normal(20, 10, size=(rows, columns)).astype(np.float32)
+    target = features @ rng.normal(size=columns) / columns + rng.normal(scale=0.1, size=rows)
+
+    scaler = StandardScaler().fit(features)
+    model = XGBRegressor(n_estimators=50, max_depth=4, random_state=seed, n_jobs=1)
+    model.fit(scaler.transform(features), target)
+    return model, scaler
+
+
+def install_models(vgg_compute_ms: float = 0.0, seed: int = 0):
+    """
+    Put the stand-ins in place before the app starts; load_models() then
+    skips every file it would otherwise read.
+    """
+    from app.services.flood_service import FloodModelService
+
+    FloodModelService.vgg_model = StandInVgg(vgg_compute_ms)
+    FloodModelService.xgb_model, FloodModelService.scaler = build_weather_models(seed)
+
+
+class _Body(io.BytesIO):
+    """botocore StreamingBody look-alike."""
+
+    def iter_chunks(self, chunk_size: int = 1024):
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class _Paginator:
+    def __init__(self, client: "FakeS3Client"):
+        self.client = client
+
+    def paginate(self, Bucket: str, Prefix: str = ""):
+        keys = sorted(key for key in self.client.objects if key.startswith(Prefix))
+        size = self.client.page_size
+        for i in range(0, max(len(keys), 1), size):
+            yield {
+                "Contents": [
+                    {"Key": key, "Size": len(self.client.objects[key][0])}
+                    for key in keys[i : i + size]
+                ]
+            }
+
+
+class FakeS3Client:
+    """In-memory bucket with images_per_folder JPEGs in each blockage folder."""
+
+    def __init__(self, images_per_folder: int = 50, latency_ms: float = 0.0, page_size: int = 1000, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.page_size = page_size
+        self.objects: dict[str, tuple[bytes, dict]] = {}
+        rng = random.Random(seed)
+        # Folder order matches the colour → class mapping of make_image
+        folders = ["FULL BLOCKAGE/", "NO BLOCKAGE/", "PARTIALLY BLOCKAGE/"]
+        for class_index, folder in enumerate(folders):
+            self.objects[folder] = (b"", {})  # the 0-byte folder marker S3 consoles create
+            for n in range(images_per_folder):
+                metadata = {
+                    "lat": f"{rng.uniform(18.90, 19.25):.5f}",
+                    "lon": f"{rng.uniform(72.80, 72.98):.5f}",
+                }
+                image = make_image(3 * n + class_index)
+                self.objects[f"{folder}img_{n:05d}.jpg"] = (image, metadata)
+
+    def _wait(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def get_paginator(self, operation: str) -> _Paginator:
+        return _Paginator(self)
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        self._wait()
+        data, metadata = self.objects[Key]
+        return {
+            "Body": _Body(data),
+            "Metadata": dict(metadata),
+            "ContentType": "image/jpeg",
+            "ContentLength": len(data),
+        }
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        self._wait()
+        data, metadata = self.objects[Key]
+        return {"Metadata": dict(metadata), "ContentType": "image/jpeg", "ContentLength": len(data)}
+
+    def generate_presigned_url(self, operation: str, Params: dict, ExpiresIn: int = 3600) -> str:
+        return f"http://bench-s3.invalid/{Params['Bucket']}/{quote(Params['Key'])}?X-Amz-Expires={ExpiresIn}"
+
+
+def install_s3(images_per_folder: int = 50, latency_ms: float = 0.0):
+    S3Service._instance = S3Service(
+        s3_client=FakeS3Client(images_per_folder=images_per_folder, latency_ms=latency_ms)
+    )
@@ -0,0 +1,175 @@
+# bench/stubs.py
+"""
+Local stand-ins for the Weatherbit, Nominatim and MSG91 upstreams, each
+served by its own uvicorn server on a free localhost port. Every stub
+sleeps for an injected latency (± jitter) and fails a configurable share
+of requests with HTTP 503. Responses are deterministic per coordinate.
+
+Nothing here imports `app` — the harness starts the stubs first and only
+then points the app's settings at them.
+"""
+import asyncio
+import random
+import socket
+import threading
+import time
+import zlib
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Rotated per coordinate so the heuristic rules see dry, rainy and stormy locations
+_CONDITIONS = [
+    ("Clear", 0.0),
+    ("Few clouds", 0.0),
+    ("Light rain", 2.5),
+    ("Moderate rain", 7.5),
+    ("Heavy rain", 18.0),
+    ("Overcast clouds", 0.0),
+]
+
+
+class Fault:
+    """Injected latency and failure rate for one stub, plus call counters."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+        self.recipients = 0  # MSG91 only: alert recipients received
+
+    async def inject(self) -> JSONResponse | None:
+        """Sleep for the injected latency; return a 503 response for an injected failure."""
+        self.calls += 1
+        delay_ms = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        if self._rng.random() < self.failure_rate:
+            self.failures += 1
+            return JSONResponse({"error": "injected failure"}, status_code=503)
+        return None
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "failures": self.failures, "recipients": self.recipients}
+
+
+def _location_rng(lat: float, lon: float) -> random.Random:
+    return random.Random(zlib.crc32(f"{float(lat):.4f},{float(lon):.4f}".encode()))
+
+
+def weatherbit_app(fault: Fault) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/v2.0/current")
+    async def current(lat: float, lon: float, key: str = ""):
+        failed = await fault.inject()
+        if failed is not None:
+            return failed
+        rng = _location_rng(lat, lon)
+        condition, precip = _CONDITIONS[rng.randrange(len(_CONDITIONS))]
+        temp = round(rng.uniform(22, 34), 1)
+        return {
+            "count": 1,
+            "data": [
+                {
+                    "app_temp": round(temp + rng.uniform(0, 4), 1),
+                    "clouds": rng.randrange(0, 101),
+                    "dewpt": round(temp - rng.uniform(2, 8), 1),
+                    "dhi": round(rng.uniform(0, 120), 1),
+                    "dni": round(rng.uniform(0, 900), 1),
+                    "elev_angle": round(rng.uniform(-10, 80), 1),
+                    "ghi": round(rng.uniform(0, 1000), 1),
+                    "pres": round(rng.uniform(995, 1015), 1),
+                    "rh": rng.randrange(40, 100),
+                    "slp": round(rng.uniform(1000, 1020), 1),
+                    "solar_rad": round(rng.uniform(0, 900), 1),
+                    "temp": temp,
+                    "uv": round(rng.uniform(0, 11), 1),
+                    "vis": round(rng.uniform(1, 16), 1),
+                    "wind_dir": rng.randrange(0, 360),
+                    "wind_spd": round(rng.uniform(0, 12), 1),
+                    "ts": int(time.time()),
+                    "precip": precip,
+                    "weather": {"description": condition, "code": 500, "icon": "r01d"},
+                    "timezone": "Asia/Kolkata",
+                    "sources": ["bench"],
+                    "country_code": "IN",
+                    "city_name": "Mumbai",
+                }
+            ],
+        }
+
+    return app
+
+
+def nominatim_app(fault: Fault) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/reverse")
+    async def reverse(lat: float, lon: float, format: str = "json"):
+        failed = await fault.inject()
+        if failed is not None:
+            return failed
+        ward = _location_rng(lat, lon).randrange(1, 25)
+        return {
+            "lat": str(lat),
+            "lon": str(lon),
+            "display_name": f"Ward {ward}, Mumbai, Maharashtra, India",
+            "address": {"city": "Mumbai", "state": "Maharashtra", "country_code": "in"},
+        }
+
+    return app
+
+
+def msg91_app(fault: Fault) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/v5/email/send")
+    async def send(request: Request):
+        failed = await fault.inject()
+        if failed is not None:
+            return failed
+        payload = await request.json()
+        fault.recipients += len(payload.get("recipients", []))
+        return {"status": "success", "hasError": False, "data": {"unique_id": f"bench-{fault.calls}"}}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServerThread:
+    """Run an ASGI app under uvicorn in a daemon thread with its own event loop."""
+
+    def __init__(self, app, port: int | None = None, lifespan: str = "on"):
+        self.port = port or free_port()
+        config = uvicorn.Config(
+            app, host="127.0.0.1", port=self.port, log_level="warning", lifespan=lifespan
+        )
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 60.0) -> "ServerThread":
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Server on port {self.port} did not start")
+            time.sleep(0.02)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
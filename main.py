@@ -1,10 +1,49 @@
 # main.py
+import time
+
+_IMPORT_START = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.logging import configure_logging
 from app.api.v1.router import api_router
+from app.api.v1.endpoints import health, metrics
+from app.api.v1.endpoints.s3 import IMAGE_HEADERS
+from app.core.executor import InferenceExecutor
+from app.core.http import HttpClients
+from app.core.metrics import ServerTimingMiddleware
+from app.services.alert_service import AlertDispatcher
 from app.services.flood_service import FloodModelService
+from app.services.s3_service import S3ImagePrefetcher, S3Service
+from app.services.weather_service import WeatherService
+
+FloodModelService.record_startup("app", import_s=time.perf_counter() - _IMPORT_START)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup / shutdown of shared resources."""
+    # Load models in the background and open the outbound HTTP pools
+    FloodModelService.start_loading()
+    await HttpClients.startup()
+    WeatherService.load_cache()
+    WeatherService.start()
+    AlertDispatcher.start()
+    S3Service.start()
+    S3ImagePrefetcher.start()
+
+    yield
+
+    await FloodModelService.close()
+    await AlertDispatcher.close()
+    await S3ImagePrefetcher.close()
+    await S3Service.close()
+    await HttpClients.shutdown()
+    await WeatherService.close()
+    WeatherService.save_cache()
+    InferenceExecutor.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -17,6 +56,7 @@ def create_app() -> FastAPI:
         description="Public ML & Weather Prediction API",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # CORS
@@ -26,16 +66,15 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=IMAGE_HEADERS + ["Server-Timing"],
     )
+    app.add_middleware(ServerTimingMiddleware)
 
-    # Routers
+    # Routers — probes and the Prometheus scrape endpoint live at the root
+    app.include_router(health.router, tags=["Health"])
+    app.include_router(metrics.router, tags=["System"])
     app.include_router(api_router, prefix="/api/v1")
 
-    # Preload models at startup
-    @app.on_event("startup")
-    async def preload_models():
-        FloodModelService.load_models()
-
     return app
 
 
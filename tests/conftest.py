@@ -0,0 +1,66 @@
+# tests/conftest.py
+import os
+
+import httpx
+import pytest
+
+# Settings() is instantiated on import of app.core.config — give the required
+# fields dummy values so tests never need a .env or real credentials.
+for _name in (
+    "API_KEY",
+    "AWS_ACCESS_KEY",
+    "AWS_SECRET_KEY",
+    "BUCKET_NAME",
+    "MSG91_AUTH_KEY",
+    "MSG91_TEMPLATE_ID",
+    "SENDER_EMAIL",
+    "RECIPIENT_EMAIL",
+):
+    os.environ.setdefault(_name, "test")
+
+
+@pytest.fixture
+def stub_upstreams(monkeypatch):
+    """
+    Stand-in models plus the benchmark's Weatherbit and Nominatim stubs served
+    in-process through httpx.ASGITransport, with every cache the prediction
+    path touches emptied. Returns the Fault of each stub (latency, failures,
+    call counts). Alert emails are counted in faults["alerts"], not sent.
+    """
+    from bench.standins import install_models
+    from bench.stubs import Fault, nominatim_app, weatherbit_app
+    from app.core.cache import LRUCache, SingleFlight
+    from app.core.config import settings
+    from app.core.http import HttpClients, NOMINATIM, WEATHERBIT
+    from app.services.alert_service import AlertDispatcher
+    from app.services.flood_service import FloodModelService
+    from app.services.weather_service import WeatherService
+    from app.utils.weather import DataProcessing
+
+    for name in ("vgg_model", "xgb_model", "scaler", "shap_explainer", "_vgg_batcher"):
+        monkeypatch.setattr(FloodModelService, name, None)  # restored after the test
+    install_models()
+    monkeypatch.setattr(settings, "SHAP_MODE", "native")
+    monkeypatch.setattr(settings, "WEATHER_MAX_RETRIES", 0)
+    monkeypatch.setattr(settings, "GEOCODE_MIN_INTERVAL_SECONDS", 0.0)
+
+    faults = {WEATHERBIT: Fault(), NOMINATIM: Fault(), "alerts": []}
+    clients = {
+        WEATHERBIT: httpx.AsyncClient(transport=httpx.ASGITransport(weatherbit_app(faults[WEATHERBIT]))),
+        NOMINATIM: httpx.AsyncClient(transport=httpx.ASGITransport(nominatim_app(faults[NOMINATIM]))),
+    }
+    monkeypatch.setattr(HttpClients, "get", classmethod(lambda cls, name: clients[name]))
+    monkeypatch.setattr(settings, "WEATHERBIT_URL", "http://weatherbit/v2.0/current")
+    monkeypatch.setattr(WeatherService, "BASE_URL", "http://nominatim/reverse")
+
+    monkeypatch.setattr(DataProcessing, "cache", LRUCache(100, ttl=settings.WEATHER_CACHE_TTL_SECONDS))
+    monkeypatch.setattr(DataProcessing, "_flight", SingleFlight())
+    monkeypatch.setattr(WeatherService, "cache", LRUCache(100, ttl=3600))
+    monkeypatch.setattr(WeatherService, "_flight", SingleFlight())
+    monkeypatch.setattr(WeatherService, "_next_slot", 0.0)
+    monkeypatch.setattr(FloodModelService, "prediction_cache", LRUCache(100, ttl=settings.WEATHER_CACHE_TTL_SECONDS))
+    monkeypatch.setattr(FloodModelService, "_prediction_flight", SingleFlight())
+    monkeypatch.setattr(
+        AlertDispatcher, "enqueue", classmethod(lambda cls, payload: faults["alerts"].append(payload) or True)
+    )
+    return faults
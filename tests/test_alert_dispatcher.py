@@ -0,0 +1,87 @@
+# tests/test_alert_dispatcher.py
+import asyncio
+
+import pytest
+
+from app.models.email import FloodAlertEmailPayload
+from app.services.alert_service import AlertDispatcher
+from app.services.email_service import EmailService
+
+
+def make_payload(lat: str = "19.076000", risk: str = "High") -> FloodAlertEmailPayload:
+    return FloodAlertEmailPayload(
+        Timestamp="2025-06-25 14:32:00",
+        risk=risk,
+        address="Test address",
+        latitude=lat,
+        longitude="72.877700",
+        temperature="30.0°C",
+        precipitation="12.5 mm/hr",
+        wind_speed="5.2 m/s",
+        humidity="87%",
+        visibility="8.0 km",
+        condition="Heavy rain",
+        uv_index="3",
+        pressure="1008.2 hPa",
+        cloud_coverage="Overcast",
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_dispatcher(monkeypatch):
+    # Each test runs its own event loop — never reuse a queue or task across them
+    monkeypatch.setattr(AlertDispatcher, "_queue", None)
+    monkeypatch.setattr(AlertDispatcher, "_worker", None)
+    monkeypatch.setattr(AlertDispatcher, "_recent", {})
+
+
+def test_failed_delivery_releases_coalescing_window(monkeypatch):
+    calls = []
+
+    async def send(payloads):
+        calls.append(len(payloads))
+        if len(calls) == 1:
+            raise RuntimeError("MSG91 API error 503")
+        return {}
+
+    monkeypatch.setattr(EmailService, "send_flood_alerts", staticmethod(send))
+
+    async def scenario():
+        assert AlertDispatcher.enqueue(make_payload())
+        await asyncio.sleep(0.05)  # first send fails
+
+        assert AlertDispatcher.enqueue(make_payload())  # queued again, not coalesced
+        await asyncio.sleep(0.05)  # second send succeeds
+
+        coalesced_before = AlertDispatcher.coalesced
+        assert AlertDispatcher.enqueue(make_payload())
+        await AlertDispatcher.close()
+        return AlertDispatcher.coalesced - coalesced_before
+
+    assert asyncio.run(scenario()) == 1
+    assert calls == [1, 1]
+
+
+def test_close_lets_in_flight_send_finish(monkeypatch):
+    delivered = []
+    started = None
+
+    async def send(payloads):
+        started.set()
+        await asyncio.sleep(0.1)
+        delivered.extend(payloads)
+        return {}
+
+    monkeypatch.setattr(EmailService, "send_flood_alerts", staticmethod(send))
+
+    async def scenario():
+        nonlocal started
+        started = asyncio.Event()
+        AlertDispatcher.enqueue(make_payload("19.000000"))
+        await started.wait()  # first batch is off the queue and mid-send
+        AlertDispatcher.enqueue(make_payload("19.100000"))
+        AlertDispatcher.enqueue(make_payload("19.200000"))
+        await AlertDispatcher.close()
+
+    asyncio.run(scenario())
+    assert sorted(p.latitude for p in delivered) == ["19.000000", "19.100000", "19.200000"]
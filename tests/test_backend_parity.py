@@ -0,0 +1,83 @@
+# tests/test_backend_parity.py
+import numpy as np
+import pytest
+
+from bench.standins import make_image
+from app.tools import check_parity
+from app.utils.backends import InferenceBackend, compare_backends
+
+
+class FixedBackend(InferenceBackend):
+    """Softmax over mean channel intensities, optionally nudged by `offset`."""
+
+    def __init__(self, name: str, offset: float = 0.0):
+        self.name = name
+        self.offset = offset
+
+    @classmethod
+    def default_path(cls) -> str:
+        return ""
+
+    @classmethod
+    def load(cls, path: str) -> "FixedBackend":
+        return cls("fixed")
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        logits = batch.reshape(len(batch), -1, 3).mean(axis=1) * 12.0
+        probabilities = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+        nudge = np.array([self.offset, -self.offset, 0.0])
+        return probabilities + nudge
+
+
+def batches(count: int = 3, size: int = 4):
+    rng = np.random.default_rng(0)
+    for _ in range(count):
+        yield rng.random((size, 8, 8, 3), dtype=np.float32)
+
+
+def test_compare_backends_inside_tolerance():
+    report = compare_backends(FixedBackend("keras"), FixedBackend("onnx", offset=1e-6), batches())
+
+    assert report["reference"] == "keras"
+    assert report["candidate"] == "onnx"
+    assert report["samples"] == 12
+    assert report["class_agreement"] == 1.0
+    assert report["max_probability_drift"] <= 1e-4
+    assert report["mean_probability_drift"] <= report["max_probability_drift"]
+
+
+def test_compare_backends_outside_tolerance():
+    report = compare_backends(FixedBackend("keras"), FixedBackend("onnx", offset=0.05), batches())
+
+    assert report["max_probability_drift"] == pytest.approx(0.05, abs=1e-6)
+    assert report["mean_probability_drift"] == pytest.approx(0.05, abs=1e-6)
+
+
+@pytest.mark.parametrize("offset, passed", [(1e-6, True), (1e-2, False)])
+def test_check_parity_applies_tolerance(monkeypatch, tmp_path, offset, passed):
+    for i in range(5):
+        (tmp_path / f"sample_{i}.jpg").write_bytes(make_image(i, (64, 48)))
+    monkeypatch.setattr(check_parity.KerasBackend, "load", classmethod(lambda cls, path: FixedBackend("keras")))
+    monkeypatch.setattr(check_parity, "load_backend", lambda name, path=None: FixedBackend(name, offset))
+
+    report = check_parity.check_parity("onnx", str(tmp_path), tolerance=1e-4, batch_size=2)
+
+    assert report["samples"] == 5
+    assert report["class_agreement"] == 1.0
+    assert report["passed"] is passed
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class NoPredict(InferenceBackend):
+        name = "incomplete"
+
+        @classmethod
+        def default_path(cls) -> str:
+            return ""
+
+        @classmethod
+        def load(cls, path: str) -> "NoPredict":
+            return cls()
+
+    with pytest.raises(TypeError, match="predict"):
+        NoPredict()
@@ -0,0 +1,145 @@
+# tests/test_batching.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.batching import MicroBatcher
+
+
+class Recorder:
+    """predict_batch stand-in: records every batch and maps x -> 10 * x."""
+
+    def __init__(self, fail: Exception | None = None, gate: threading.Event | None = None):
+        self.batches = []
+        self.fail = fail
+        self.gate = gate
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail is not None:
+            raise self.fail
+        return [10 * item for item in items]
+
+
+def run(scenario):
+    return asyncio.run(scenario())
+
+
+def test_batch_closes_at_max_size():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_batch_size=4, max_wait_ms=2000)
+
+    async def scenario():
+        start = time.monotonic()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(8)))
+        await batcher.close()
+        return results, time.monotonic() - start
+
+    results, elapsed = run(scenario)
+    assert [len(batch) for batch in recorder.batches] == [4, 4]
+    assert elapsed < 1.0  # full batches never wait for the deadline
+    assert results == [10 * i for i in range(8)]
+
+
+def test_batch_closes_at_max_wait():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_batch_size=100, max_wait_ms=50)
+
+    async def scenario():
+        start = time.monotonic()
+        await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        elapsed = time.monotonic() - start
+        await batcher.submit(3)
+        await batcher.close()
+        return elapsed
+
+    elapsed = run(scenario)
+    assert recorder.batches == [[0, 1, 2], [3]]
+    assert 0.04 <= elapsed < 1.0
+
+
+def test_each_caller_gets_its_own_result():
+    batcher = MicroBatcher(Recorder(), max_batch_size=5, max_wait_ms=20)
+
+    async def scenario():
+        async def call(i):
+            await asyncio.sleep(0.001 * (i % 4))  # interleave arrivals across batches
+            return i, await batcher.submit(i)
+
+        results = await asyncio.gather(*(call(i) for i in range(23)))
+        await batcher.close()
+        return results
+
+    for i, result in run(scenario):
+        assert result == 10 * i
+
+
+def test_exception_fans_out_to_every_caller():
+    batcher = MicroBatcher(Recorder(fail=ValueError("bad batch")), max_batch_size=4, max_wait_ms=20)
+
+    async def scenario():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(4)), return_exceptions=True)
+        await batcher.close()
+        return results
+
+    results = run(scenario)
+    assert len(results) == 4
+    assert all(isinstance(r, ValueError) and str(r) == "bad batch" for r in results)
+
+
+def test_cancelled_caller_does_not_poison_batch():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_batch_size=10, max_wait_ms=100)
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(batcher.submit(i)) for i in range(4)]
+        await asyncio.sleep(0.02)  # queued, batch still open
+        tasks[1].cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        await batcher.close()
+        return results
+
+    results = run(scenario)
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert [results[0], results[2], results[3]] == [0, 20, 30]
+    assert recorder.batches == [[0, 2, 3]]
+
+
+def test_close_fails_queued_and_in_flight_callers():
+    gate = threading.Event()
+    recorder = Recorder(gate=gate)
+    batcher = MicroBatcher(recorder, max_batch_size=2, max_wait_ms=0)
+
+    async def scenario():
+        in_flight = asyncio.ensure_future(batcher.submit(0))
+        await asyncio.sleep(0.05)  # first batch is running in the cpu pool
+        queued = [asyncio.ensure_future(batcher.submit(i)) for i in (1, 2, 3)]
+        await asyncio.sleep(0.01)
+        try:
+            await batcher.close()
+        finally:
+            gate.set()
+        return await asyncio.wait_for(
+            asyncio.gather(in_flight, *queued, return_exceptions=True), timeout=1
+        )
+
+    results = run(scenario)
+    assert recorder.batches == [[0]]
+    assert all(isinstance(r, RuntimeError) and str(r) == "Batcher closed" for r in results)
+    assert batcher.stats()["queue_depth"] == 0
+
+
+@pytest.mark.parametrize("size, wait", [(0, -5), (1, 0)])
+def test_degenerate_limits_still_serve(size, wait):
+    batcher = MicroBatcher(Recorder(), max_batch_size=size, max_wait_ms=wait)
+
+    async def scenario():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        await batcher.close()
+        return results
+
+    assert run(scenario) == [0, 10, 20]
@@ -0,0 +1,149 @@
+# tests/test_camera_stream.py
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bench.standins import make_image
+from app.api.v1.endpoints import flood
+from app.core.config import settings
+from app.models.flood import FloodPredictionResponse, LocationInfo, WeatherInfo
+from app.services.camera_service import CameraSession, dhash
+from app.services.flood_service import FloodModelService
+
+LAT, LON = 19.0760, 72.8777
+# Noise-textured frames: different indices hash far apart
+FRAMES = [make_image(i, (160, 120)) for i in range(6)]
+
+
+def response(risk: str) -> FloodPredictionResponse:
+    return FloodPredictionResponse(
+        prediction={"flood_risk": risk, "reason": "test"},
+        location=LocationInfo(latitude=LAT, longitude=LON, address="Test", city="Mumbai"),
+        weather=WeatherInfo(
+            temp=30, app_temp=32, humidity=80, wind_speed=3, wind_dir=180, uv=2,
+            pressure=1008, visibility=8, precipitation=0, condition="Clear", clouds=20, dewpt=24,
+        ),
+    )
+
+
+def wait_until(condition, timeout: float = 3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def camera(monkeypatch):
+    """
+    A WebSocket connection to /predict-flood/stream with predict_image stubbed:
+    state["risks"] maps frame bytes to the risk returned (default "Low") and
+    state["calls"] records (frame bytes, monotonic time) per inference.
+    """
+    state = {"risks": {}, "calls": []}
+
+    async def predict_image(image_bytes, lat, lon):
+        state["calls"].append((image_bytes, time.monotonic()))
+        return response(state["risks"].get(image_bytes, "Low"))
+
+    monkeypatch.setattr(FloodModelService, "predict_image", staticmethod(predict_image))
+    monkeypatch.setattr(FloodModelService, "is_ready", classmethod(lambda cls: True))
+    monkeypatch.setattr(settings, "CAMERA_MIN_INFERENCE_INTERVAL_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "WEATHER_CACHE_TTL_SECONDS", 900)
+
+    app = FastAPI()
+    app.include_router(flood.router)
+    active = CameraSession.active
+    with TestClient(app) as client, client.websocket_connect("/predict-flood/stream") as ws:
+        ws.send_json({"lat": LAT, "lon": LON})
+        assert ws.receive_json() == {"event": "registered", "lat": LAT, "lon": LON}
+        state["ws"] = ws
+        yield state
+        # Let the handler see the disconnect and return before TestClient cancels it
+        ws.close()
+        wait_until(lambda: CameraSession.active == active)
+
+
+def test_frames_hash_apart():
+    hashes = [dhash(frame) for frame in FRAMES]
+    for i, a in enumerate(hashes):
+        for b in hashes[i + 1 :]:
+            assert bin(a ^ b).count("1") > settings.CAMERA_CHANGE_THRESHOLD_BITS
+
+
+def test_unchanged_scene_skips_inference(camera):
+    ws, calls = camera["ws"], camera["calls"]
+    unchanged = CameraSession.unchanged
+
+    ws.send_bytes(FRAMES[0])
+    wait_until(lambda: len(calls) == 1)
+    assert ws.receive_json()["frame"] == 1  # first result is always pushed
+
+    ws.send_bytes(FRAMES[0])
+    wait_until(lambda: CameraSession.unchanged == unchanged + 1)
+    assert len(calls) == 1
+
+    ws.send_bytes(FRAMES[1])
+    wait_until(lambda: len(calls) == 2)
+    assert calls[1][0] == FRAMES[1]
+
+
+def test_inference_interval_keeps_only_latest_frame(camera, monkeypatch):
+    monkeypatch.setattr(settings, "CAMERA_MIN_INFERENCE_INTERVAL_SECONDS", 0.3)
+    ws, calls = camera["ws"], camera["calls"]
+
+    ws.send_bytes(FRAMES[0])
+    wait_until(lambda: len(calls) == 1)
+    for frame in FRAMES[1:4]:
+        ws.send_bytes(frame)
+    wait_until(lambda: len(calls) == 2)
+    time.sleep(0.4)
+
+    assert [frame for frame, _ in calls] == [FRAMES[0], FRAMES[3]]
+    assert calls[1][1] - calls[0][1] >= 0.3 * 0.9
+
+
+def test_unchanged_scene_reruns_once_per_weather_window(camera, monkeypatch):
+    monkeypatch.setattr(settings, "WEATHER_CACHE_TTL_SECONDS", 0.3)
+    ws, calls = camera["ws"], camera["calls"]
+    unchanged = CameraSession.unchanged
+
+    ws.send_bytes(FRAMES[0])
+    wait_until(lambda: len(calls) == 1)
+    ws.send_bytes(FRAMES[0])
+    wait_until(lambda: CameraSession.unchanged == unchanged + 1)
+
+    time.sleep(0.35)
+    ws.send_bytes(FRAMES[0])
+    wait_until(lambda: len(calls) == 2)
+
+
+def test_pushes_only_when_risk_changes(camera):
+    ws, calls, risks = camera["ws"], camera["calls"], camera["risks"]
+    sequence = ["High", "High", "Low", "Low", "High"]
+    for frame, risk in zip(FRAMES, sequence):
+        risks[frame] = risk
+
+    for n, frame in enumerate(FRAMES[: len(sequence)], start=1):
+        ws.send_bytes(frame)
+        wait_until(lambda: len(calls) == n)
+
+    pushed = [ws.receive_json() for _ in range(3)]
+    assert [(m["event"], m["frame"], m["result"]["prediction"]["flood_risk"]) for m in pushed] == [
+        ("prediction", 1, "High"),
+        ("prediction", 3, "Low"),
+        ("prediction", 5, "High"),
+    ]
+
+
+def test_bad_frame_reports_error_and_keeps_stream(camera):
+    ws, calls = camera["ws"], camera["calls"]
+
+    ws.send_bytes(b"not an image")
+    message = ws.receive_json()
+    assert message["event"] == "error" and "decode frame 1" in message["detail"]
+
+    ws.send_bytes(FRAMES[0])
+    wait_until(lambda: len(calls) == 1)
@@ -0,0 +1,26 @@
+# tests/test_config.py
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("VGG16_BACKEND", "onxx"),
+        ("VGG16_PRECISION", "int4"),
+        ("SHAP_MODE", "tree"),
+        ("S3_IMAGE_DEFAULT_MODE", "url"),
+    ],
+)
+def test_unknown_mode_fails_validation(monkeypatch, field, value):
+    monkeypatch.setenv(field, value)
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+def test_defaults_validate():
+    settings = Settings(_env_file=None)
+    assert (settings.VGG16_BACKEND, settings.VGG16_PRECISION) == ("keras", "fp32")
+    assert (settings.SHAP_MODE, settings.S3_IMAGE_DEFAULT_MODE) == ("shap", "base64")
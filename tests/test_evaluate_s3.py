@@ -0,0 +1,76 @@
+# tests/test_evaluate_s3.py
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from bench.standins import StandInVgg, make_image
+from app.core.config import settings
+from app.services.s3_service import S3Service
+from app.tools import evaluate_s3
+
+BUCKET = "labelled-corpus"  # not settings.BUCKET_NAME: the tool is pointed at it explicitly
+
+
+@pytest.fixture
+def labelled_bucket(monkeypatch):
+    """
+    A moto bucket with a few labelled images. StandInVgg classifies by colour
+    (make_image(i) is class i % 3), so the expected confusion matrix is known.
+    """
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setattr(settings, "S3_ENDPOINT_URL", "")
+    monkeypatch.setattr("app.utils.backends.load_backend", lambda name=None, path=None: StandInVgg())
+
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        objects = {
+            "FULL BLOCKAGE/": [make_image(i, (64, 48)) for i in (0, 3, 6)],
+            "NO BLOCKAGE/": [make_image(i, (64, 48)) for i in (1, 4)] + [b"not an image"],
+            # One full-blockage image filed as partial: a known misclassification
+            "PARTIALLY BLOCKAGE/": [make_image(i, (64, 48)) for i in (2, 5, 9)],
+        }
+        for folder, images in objects.items():
+            client.put_object(Bucket=BUCKET, Key=folder, Body=b"")  # folder marker
+            for n, data in enumerate(images):
+                client.put_object(Bucket=BUCKET, Key=f"{folder}img_{n}.jpg", Body=data)
+        yield
+
+
+def test_evaluate_confusion_matrix(labelled_bucket):
+    report = evaluate_s3.evaluate(workers=2, batch_size=2, bucket=BUCKET)
+
+    assert report["backend"] == StandInVgg.name
+    assert report["samples"] == 9
+    assert report["evaluated"] == 8
+    assert report["failed"] == 1
+    assert report["confusion_matrix"] == [[3, 0, 0], [0, 2, 0], [1, 0, 2]]
+    assert report["accuracy"] == round(7 / 8, 4)
+    assert report["per_class"]["partial_blockage"] == {"samples": 3, "accuracy": round(2 / 3, 4)}
+
+
+def test_main_writes_json_report(labelled_bucket, tmp_path, capsys):
+    output = tmp_path / "report.json"
+    before = settings.model_dump()
+
+    assert evaluate_s3.main(["--bucket", BUCKET, "--workers", "32", "--limit", "2", "--output", str(output)]) == 0
+
+    assert settings.model_dump() == before  # CLI options never leak into the app settings
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report == json.loads(capsys.readouterr().out)
+    assert report["samples"] == 6
+    assert report["classes"] == evaluate_s3.CLASS_NAMES
+    assert sum(map(sum, report["confusion_matrix"])) == report["evaluated"]
+    assert set(report["timings_s"]) >= {"list", "download_total", "decode_total", "inference", "total_wall"}
+
+
+def test_s3_service_overrides_apply_to_the_instance_only():
+    service = S3Service(endpoint_url="http://localhost:9000", bucket="other", max_pool_connections=48)
+
+    assert service.s3_client.meta.endpoint_url == "http://localhost:9000"
+    assert service.s3_client.meta.config.max_pool_connections == 48
+    assert service.bucket_name == "other"
+    assert S3Service().bucket_name == settings.BUCKET_NAME
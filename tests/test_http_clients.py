@@ -0,0 +1,20 @@
+# tests/test_http_clients.py
+import httpx
+
+from app.core.http import HttpClients, NOMINATIM, WEATHERBIT
+
+
+def test_pool_stats_read_from_httpcore_pool():
+    client = httpx.AsyncClient()
+    assert HttpClients._pool_stats(client) == {"open": 0, "idle": 0, "active": 0, "waiting": 0}
+
+
+def test_pool_stats_omitted_when_pool_is_not_exposed(monkeypatch):
+    # e.g. a mock transport, or an httpx release that renames its internals
+    mocked = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+    monkeypatch.setattr(HttpClients, "_clients", {WEATHERBIT: httpx.AsyncClient(), NOMINATIM: mocked})
+
+    stats = HttpClients.stats()
+
+    assert "open" in stats[WEATHERBIT]
+    assert set(stats[NOMINATIM]) == {"http2", "max_connections"}
@@ -0,0 +1,111 @@
+# tests/test_pipeline.py
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.pipeline import StageGraph
+
+
+@pytest.fixture(autouse=True)
+def fresh_totals(monkeypatch):
+    monkeypatch.setattr(StageGraph, "_totals", {})
+
+
+def sleeper(seconds: float, value=None):
+    async def stage(*_):
+        await asyncio.sleep(seconds)
+        return value
+    return stage
+
+
+def test_independent_stages_overlap():
+    graph = StageGraph().add("a", sleeper(0.2, "a")).add("b", sleeper(0.2, "b")).add("c", sleeper(0.2, "c"))
+
+    start = time.monotonic()
+    results = asyncio.run(graph.run())
+    elapsed = time.monotonic() - start
+
+    assert results == {"a": "a", "b": "b", "c": "c"}
+    assert elapsed < 0.45  # concurrent, not 0.6 s in sequence
+
+
+def test_dependent_stage_gets_results_in_after_order():
+    seen = {}
+
+    async def combine(weather, image):
+        seen["args"] = (weather, image)
+        return f"{weather}+{image}"
+
+    graph = (
+        StageGraph()
+        .add("image", sleeper(0.05, "img"))
+        .add("weather", sleeper(0.01, "wx"))
+        .add("combine", combine, after=("weather", "image"))
+    )
+    results = asyncio.run(graph.run())
+
+    assert seen["args"] == ("wx", "img")
+    assert results["combine"] == "wx+img"
+
+
+def test_failing_stage_cancels_pending_and_reraises():
+    state = {"cancelled": False, "dependent_ran": False}
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("weather down")
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def dependent(_):
+        state["dependent_ran"] = True
+
+    graph = StageGraph().add("weather", fail).add("cnn", slow).add("respond", dependent, after=("weather",))
+
+    start = time.monotonic()
+    with pytest.raises(ValueError, match="weather down"):
+        asyncio.run(graph.run())
+
+    assert time.monotonic() - start < 1.0
+    assert state == {"cancelled": True, "dependent_ran": False}
+
+
+def test_add_validates_names():
+    graph = StageGraph().add("a", sleeper(0))
+    with pytest.raises(ValueError, match="already defined"):
+        graph.add("a", sleeper(0))
+    with pytest.raises(ValueError, match="undefined"):
+        graph.add("b", sleeper(0), after=("missing",))
+
+
+def test_stats_record_every_run():
+    before = REGISTRY.get_sample_value("flood_stage_seconds_count", {"stage": "test_stage"}) or 0
+
+    for seconds in (0.01, 0.05):
+        graph = StageGraph().add("test_stage", sleeper(seconds))
+        asyncio.run(graph.run())
+        assert graph.timings["test_stage"] >= seconds * 0.9
+
+    stats = StageGraph.stats()["test_stage"]
+    assert stats["count"] == 2
+    assert 40 <= stats["max_ms"] < 500
+    assert stats["max_ms"] >= stats["avg_ms"] >= 20
+    assert REGISTRY.get_sample_value("flood_stage_seconds_count", {"stage": "test_stage"}) == before + 2
+
+
+def test_failed_run_still_records_finished_stages():
+    async def fail():
+        raise RuntimeError("boom")
+
+    graph = StageGraph().add("ok", sleeper(0)).add("bad", fail)
+    with pytest.raises(RuntimeError):
+        asyncio.run(graph.run())
+
+    assert set(StageGraph.stats()) >= {"ok", "bad"}
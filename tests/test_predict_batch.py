@@ -0,0 +1,87 @@
+# tests/test_predict_batch.py
+import asyncio
+import io
+import json
+from contextlib import aclosing
+
+import httpx
+import pytest
+from starlette.datastructures import UploadFile
+
+from bench.standins import install_models, make_image
+from bench.stubs import Fault, weatherbit_app
+from app.core.config import settings
+from app.core.http import HttpClients
+from app.services import flood_service
+from app.services.flood_service import FloodModelService
+
+LOCATIONS = [{"lat": 19.01, "lon": 72.81}, {"lat": 19.02, "lon": 72.82}]
+
+
+def uploads(count: int) -> list[UploadFile]:
+    return [UploadFile(io.BytesIO(make_image(i, (64, 48))), filename=f"{i}.jpg") for i in range(count)]
+
+
+@pytest.fixture
+def hanging_geocode(monkeypatch):
+    """Weather from the Weatherbit stub; reverse geocoding never finishes."""
+    for name in ("vgg_model", "xgb_model", "scaler"):
+        monkeypatch.setattr(FloodModelService, name, None)  # restored after the test
+    install_models()
+    weatherbit = httpx.AsyncClient(transport=httpx.ASGITransport(weatherbit_app(Fault())))
+    monkeypatch.setattr(HttpClients, "get", classmethod(lambda cls, name: weatherbit))
+    monkeypatch.setattr(settings, "WEATHERBIT_URL", "http://weatherbit/v2.0/current")
+
+    state = {"started": 0, "cancelled": 0}
+
+    async def reverse_geocode(lat, lon):
+        state["started"] += 1
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            state["cancelled"] += 1
+            raise
+
+    monkeypatch.setattr(flood_service, "_reverse_geocode", reverse_geocode)
+    return state
+
+
+def test_disconnect_cancels_geocode_tasks(hanging_geocode):
+    async def scenario():
+        results = await FloodModelService.predict_flood_batch(uploads(2), json.dumps(LOCATIONS))
+
+        async def consume():  # the NDJSON response body
+            async with aclosing(results):
+                async for _ in results:
+                    pass
+
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.1)
+        consumer.cancel()  # client disconnected
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+        await asyncio.sleep(0)
+        # Checked before asyncio.run() cancels leftover tasks on its own
+        return dict(hanging_geocode)
+
+    assert asyncio.run(scenario()) == {"started": 2, "cancelled": 2}
+
+
+def test_unconsumed_results_start_nothing(hanging_geocode):
+    async def scenario():
+        results = await FloodModelService.predict_flood_batch(uploads(2), json.dumps(LOCATIONS))
+        await results.aclose()
+
+    asyncio.run(scenario())
+    assert hanging_geocode["started"] == 0
+
+
+@pytest.mark.parametrize("payload", ["{}", '{"lat": 19.0, "lon": 72.8}', '"x"'])
+def test_request_must_be_a_list(payload):
+    with pytest.raises(ValueError, match="expected a JSON list"):
+        asyncio.run(FloodModelService.predict_flood_batch(uploads(1), payload))
+
+
+def test_empty_list_is_rejected():
+    with pytest.raises(ValueError, match="At least one image"):
+        asyncio.run(FloodModelService.predict_flood_batch([], "[]"))
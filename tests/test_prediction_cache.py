@@ -0,0 +1,105 @@
+# tests/test_prediction_cache.py
+import asyncio
+
+import pytest
+
+from bench.standins import make_image
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.http import WEATHERBIT
+from app.services.flood_service import FloodModelService
+
+# make_image(0) is a full-blockage frame: a confident High risk, which queues an alert
+IMAGE = make_image(0, (64, 48))
+LAT, LON = 19.0760, 72.8777
+
+
+@pytest.fixture
+def counted_runs(stub_upstreams, monkeypatch):
+    runs = []
+    original = FloodModelService._run_prediction
+
+    async def run_prediction(image_bytes, lat, lon):
+        runs.append((lat, lon))
+        return await original(image_bytes, lat, lon)
+
+    monkeypatch.setattr(FloodModelService, "_run_prediction", staticmethod(run_prediction))
+    return runs
+
+
+def test_repeat_request_is_served_from_cache(stub_upstreams, counted_runs):
+    async def scenario():
+        first = await FloodModelService.predict_image(IMAGE, LAT, LON)
+        second = await FloodModelService.predict_image(IMAGE, LAT, LON)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert (first.cached, second.cached) == (False, True)
+    assert first.prediction["flood_risk"] == "High" and first.alert_sent
+    assert second.model_dump(exclude={"cached"}) == first.model_dump(exclude={"cached"})
+    assert len(counted_runs) == 1
+    assert len(stub_upstreams["alerts"]) == 1  # no second alert for the cached answer
+
+
+def test_different_image_or_location_misses(stub_upstreams, counted_runs):
+    async def scenario():
+        await FloodModelService.predict_image(IMAGE, LAT, LON)
+        await FloodModelService.predict_image(make_image(3, (64, 48)), LAT, LON)
+        await FloodModelService.predict_image(IMAGE, LAT + 0.001, LON)
+        # Below PREDICTION_CACHE_PRECISION: same camera, same key
+        return await FloodModelService.predict_image(IMAGE, LAT + 0.00001, LON)
+
+    assert asyncio.run(scenario()).cached
+    assert len(counted_runs) == 3
+
+
+def test_concurrent_identical_requests_share_one_run(stub_upstreams, counted_runs):
+    stub_upstreams[WEATHERBIT].latency_ms = 100  # keep the first run in flight
+
+    async def scenario():
+        return await asyncio.gather(*(FloodModelService.predict_image(IMAGE, LAT, LON) for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+
+    assert len(counted_runs) == 1
+    assert sorted(r.cached for r in responses) == [False, True, True, True, True]
+    assert len(stub_upstreams["alerts"]) == 1
+    assert FloodModelService.prediction_stats()["coalesced"] == 4
+
+
+def test_failed_prediction_is_not_cached(stub_upstreams, counted_runs):
+    stub_upstreams[WEATHERBIT].failure_rate = 1.0
+
+    async def scenario():
+        with pytest.raises(Exception):
+            await FloodModelService.predict_image(IMAGE, LAT, LON)
+        assert len(FloodModelService.prediction_cache) == 0
+
+        stub_upstreams[WEATHERBIT].failure_rate = 0.0
+        return await FloodModelService.predict_image(IMAGE, LAT, LON)
+
+    response = asyncio.run(scenario())
+    assert response.cached is False
+    assert len(counted_runs) == 2
+
+
+def test_cache_size_zero_disables_cache(stub_upstreams, counted_runs, monkeypatch):
+    monkeypatch.setattr(settings, "PREDICTION_CACHE_SIZE", 0)
+    monkeypatch.setattr(FloodModelService, "prediction_cache", LRUCache(settings.PREDICTION_CACHE_SIZE))
+
+    async def scenario():
+        return [await FloodModelService.predict_image(IMAGE, LAT, LON) for _ in range(2)]
+
+    responses = asyncio.run(scenario())
+    assert [r.cached for r in responses] == [False, False]
+    assert len(counted_runs) == 2
+    assert len(stub_upstreams["alerts"]) == 2
+
+
+def test_key_changes_with_weather_window(monkeypatch):
+    key = FloodModelService.prediction_key(IMAGE, LAT, LON)
+    window = settings.WEATHER_CACHE_TTL_SECONDS
+    monkeypatch.setattr("time.time", lambda: (key[3] + 1) * window + 1)
+    assert FloodModelService.prediction_key(IMAGE, LAT, LON)[:3] == key[:3]
+    assert FloodModelService.prediction_key(IMAGE, LAT, LON)[3] == key[3] + 1
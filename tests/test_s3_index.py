@@ -0,0 +1,42 @@
+# tests/test_s3_index.py
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.core.config import settings
+from app.services.s3_service import S3Service
+
+FULL_KEYS = 1203  # past the 1000-key list_objects_v2 page limit
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=settings.BUCKET_NAME)
+        client.put_object(Bucket=settings.BUCKET_NAME, Key="FULL BLOCKAGE/", Body=b"")  # folder marker
+        for n in range(FULL_KEYS):
+            client.put_object(Bucket=settings.BUCKET_NAME, Key=f"FULL BLOCKAGE/img_{n:04d}.jpg", Body=b"x")
+        client.put_object(Bucket=settings.BUCKET_NAME, Key="NO BLOCKAGE/img_0.jpg", Body=b"x")
+        client.put_object(Bucket=settings.BUCKET_NAME, Key="NO BLOCKAGE/empty.jpg", Body=b"")
+        yield client
+
+
+def test_index_holds_every_key_past_one_page(s3_client, monkeypatch):
+    list_calls = []
+    s3_client.meta.events.register("before-call.s3.ListObjectsV2", lambda **kwargs: list_calls.append(1))
+    service = S3Service(s3_client=s3_client)
+    monkeypatch.setattr(S3Service, "_instance", service)
+
+    service.refresh_index()
+
+    keys = service._index["FULL BLOCKAGE/"]
+    assert len(keys) == FULL_KEYS
+    assert set(keys) == {f"FULL BLOCKAGE/img_{n:04d}.jpg" for n in range(FULL_KEYS)}
+    assert service._index["NO BLOCKAGE/"] == ["NO BLOCKAGE/img_0.jpg"]  # 0-byte objects skipped
+    assert service._index["PARTIALLY BLOCKAGE/"] == []
+    # Two pages for the large folder, one each for the others
+    assert len(list_calls) == 4
+    assert S3Service.stats()["index"] == {"PARTIALLY BLOCKAGE/": 0, "NO BLOCKAGE/": 1, "FULL BLOCKAGE/": FULL_KEYS}
+    assert service.random_key("FULL BLOCKAGE/")[1] in keys
@@ -0,0 +1,84 @@
+# tests/test_s3_prefetch.py
+import asyncio
+
+from bench.standins import FakeS3Client
+from app.core.config import settings
+from app.services.s3_service import S3ImagePrefetcher, S3Service
+
+
+class CountingS3Client(FakeS3Client):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.gets = 0
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        self.gets += 1
+        return super().get_object(Bucket=Bucket, Key=Key)
+
+
+def test_byte_cap_pauses_refill_until_take(monkeypatch):
+    client = CountingS3Client(images_per_folder=4)
+    image_size = max(len(data) for data, _ in client.objects.values())
+    monkeypatch.setattr(S3Service, "_instance", S3Service(s3_client=client))
+    monkeypatch.setattr(settings, "S3_PREFETCH_SIZE", 12)
+    monkeypatch.setattr(settings, "S3_PREFETCH_CONCURRENCY", 4)
+    # Room for two images, far below the 12 the count target asks for
+    monkeypatch.setattr(settings, "S3_PREFETCH_MAX_BYTES", 2 * image_size + image_size // 2)
+
+    async def scenario():
+        S3ImagePrefetcher.start()
+        try:
+            await asyncio.sleep(0.5)
+            gets_when_full = client.gets
+            buffered = sum(S3ImagePrefetcher.stats()["buffered"].values())
+
+            await asyncio.sleep(0.5)
+            idle_gets = client.gets - gets_when_full
+
+            assert S3ImagePrefetcher.take() is not None
+            await asyncio.sleep(0.5)
+            return gets_when_full, buffered, idle_gets, client.gets - gets_when_full
+        finally:
+            await S3ImagePrefetcher.close()
+
+    gets_when_full, buffered, idle_gets, gets_after_take = asyncio.run(scenario())
+
+    assert buffered == 2
+    # One refill round at most overshoots the cap; nothing is re-downloaded while full
+    assert gets_when_full <= 2 * settings.S3_PREFETCH_CONCURRENCY
+    assert idle_gets == 0
+    # take() frees bytes and refilling resumes for one more round only
+    assert 1 <= gets_after_take <= settings.S3_PREFETCH_CONCURRENCY
+
+
+def test_cap_smaller_than_one_image_does_not_wedge_refill(monkeypatch):
+    client = CountingS3Client(images_per_folder=4)
+    image_size = min(len(data) for data, _ in client.objects.values() if data)
+    monkeypatch.setattr(S3Service, "_instance", S3Service(s3_client=client))
+    monkeypatch.setattr(settings, "S3_PREFETCH_SIZE", 6)
+    monkeypatch.setattr(settings, "S3_PREFETCH_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "S3_PREFETCH_MAX_BYTES", image_size - 1)
+
+    async def scenario():
+        S3ImagePrefetcher.start()
+        try:
+            await asyncio.sleep(0.3)
+            first_round = client.gets
+            assert S3ImagePrefetcher.take() is None  # miss: allows one more round
+
+            await asyncio.sleep(0.3)
+            second_round = client.gets - first_round
+
+            # Once images fit again, a miss restarts the refill
+            monkeypatch.setattr(settings, "S3_PREFETCH_MAX_BYTES", 64 * image_size)
+            assert S3ImagePrefetcher.take() is None
+            await asyncio.sleep(0.3)
+            return first_round, second_round, S3ImagePrefetcher.take()
+        finally:
+            await S3ImagePrefetcher.close()
+
+    first_round, second_round, image = asyncio.run(scenario())
+
+    assert 1 <= first_round <= settings.S3_PREFETCH_CONCURRENCY
+    assert 1 <= second_round <= settings.S3_PREFETCH_CONCURRENCY
+    assert image is not None
@@ -0,0 +1,56 @@
+# tests/test_shap_parity.py
+import numpy as np
+import pytest
+import shap
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBRegressor
+
+from bench.standins import build_weather_models
+from app.core.config import settings
+from app.utils.mlpipeline import MlPipeline
+
+TOLERANCE = 1e-4
+
+
+def early_stopped_models(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    features = rng.normal(20, 10, size=(400, len(settings.INPUT_COLUMNS)))
+    target = features[:, 0] / 10 + rng.normal(scale=2.0, size=len(features))
+    scaler = StandardScaler().fit(features)
+    scaled = scaler.transform(features)
+    model = XGBRegressor(n_estimators=200, max_depth=3, learning_rate=0.3, early_stopping_rounds=5)
+    model.fit(scaled[:300], target[:300], eval_set=[(scaled[300:], target[300:])], verbose=False)
+    assert model.best_iteration + 1 < model.get_booster().num_boosted_rounds()
+    return model, scaler
+
+
+@pytest.fixture(autouse=True)
+def empty_shap_cache():
+    MlPipeline.shap_cache.clear()
+    yield
+    MlPipeline.shap_cache.clear()
+
+
+@pytest.mark.parametrize("models", [build_weather_models, early_stopped_models], ids=["full", "early_stopped"])
+@pytest.mark.parametrize("rows", [1, 16])
+def test_native_contributions_match_shap(models, rows):
+    model, scaler = models()
+    data = scaler.inverse_transform(
+        np.random.default_rng(rows).standard_normal((rows, len(settings.INPUT_COLUMNS)))
+    )
+    explainer = shap.Explainer(model, feature_names=list(settings.INPUT_COLUMNS))
+    pipeline = MlPipeline(data, model=model, scaler=scaler, explainer=explainer)
+
+    reference = pipeline.explain_shap()
+    candidate = pipeline.explain_contribs()
+
+    assert list(candidate.feature_names) == list(reference.feature_names)
+    assert candidate.values.shape == np.shape(reference.values)
+    np.testing.assert_allclose(candidate.values, reference.values, atol=TOLERANCE)
+    np.testing.assert_allclose(
+        candidate.base_values, np.asarray(reference.base_values).reshape(candidate.base_values.shape), atol=TOLERANCE
+    )
+    # Contributions plus bias reproduce the model's own prediction
+    np.testing.assert_allclose(
+        candidate.values.sum(axis=1) + candidate.base_values, model.predict(pipeline.scale()), atol=TOLERANCE
+    )
@@ -0,0 +1,107 @@
+# tests/test_weather_cache.py
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core.cache import LRUCache, SingleFlight
+from app.core.config import settings
+from app.core.http import HttpClients
+from app.utils.weather import DataProcessing
+
+
+def observation(lat: float, lon: float) -> dict:
+    row = {column: 1.0 for column in settings.INPUT_COLUMNS if column not in ("hour", "month")}
+    row.update(
+        {
+            "temp": lat,  # identifies which request produced the row
+            "ts": int(time.time()),
+            "precip": 0.0,
+            "weather": {"description": "Clear"},
+            "timezone": "Asia/Kolkata",
+            "sources": ["test"],
+            "country_code": "IN",
+            "city_name": "Mumbai",
+        }
+    )
+    return {"count": 1, "data": [row]}
+
+
+@pytest.fixture
+def weatherbit(monkeypatch):
+    """MockTransport Weatherbit answering after `state["delay"]` seconds; counts calls."""
+    state = {"calls": 0, "delay": 0.0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["calls"] += 1
+        await asyncio.sleep(state["delay"])
+        params = request.url.params
+        return httpx.Response(200, json=observation(float(params["lat"]), float(params["lon"])))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(HttpClients, "get", classmethod(lambda cls, name: client))
+    monkeypatch.setattr(DataProcessing, "cache", LRUCache(100, ttl=settings.WEATHER_CACHE_TTL_SECONDS))
+    monkeypatch.setattr(DataProcessing, "_flight", SingleFlight())
+    monkeypatch.setattr(settings, "WEATHER_CACHE_PRECISION", 2)
+    return state
+
+
+def test_bucket_rounds_to_precision():
+    assert DataProcessing.bucket(19.0761, 72.8777) == DataProcessing.bucket(19.0789, 72.8812)
+    assert DataProcessing.bucket(19.076, 72.877) != DataProcessing.bucket(19.086, 72.877)
+
+
+def test_same_bucket_shares_one_observation(weatherbit):
+    async def scenario():
+        first = await DataProcessing(19.0761, 72.8777).process_data()
+        nearby = await DataProcessing(19.0789, 72.8812).process_data()  # same 0.01° bucket
+        elsewhere = await DataProcessing(19.1200, 72.8777).process_data()
+        return first, nearby, elsewhere
+
+    first, nearby, elsewhere = asyncio.run(scenario())
+
+    assert nearby is first
+    assert elsewhere["inputs"][0]["temp"] == pytest.approx(19.12)
+    assert weatherbit["calls"] == 2
+    assert DataProcessing.stats()["hits"] == 1
+
+
+def test_entries_expire_after_ttl(weatherbit, monkeypatch):
+    monkeypatch.setattr(DataProcessing, "cache", LRUCache(100, ttl=0.1))
+
+    async def scenario():
+        await DataProcessing(19.07, 72.87).process_data()
+        await DataProcessing(19.07, 72.87).process_data()
+        await asyncio.sleep(0.15)
+        await DataProcessing(19.07, 72.87).process_data()
+
+    asyncio.run(scenario())
+    assert weatherbit["calls"] == 2
+
+
+def test_concurrent_misses_share_one_upstream_call(weatherbit):
+    weatherbit["delay"] = 0.05
+
+    async def scenario():
+        return await asyncio.gather(*(DataProcessing(19.07, 72.87).process_data() for _ in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert weatherbit["calls"] == 1
+    assert all(result is results[0] for result in results)
+    assert DataProcessing.stats()["coalesced"] == 9
+
+
+def test_failed_refresh_is_not_cached(weatherbit, monkeypatch):
+    monkeypatch.setattr(settings, "WEATHER_MAX_RETRIES", 0)
+    responses = iter([httpx.Response(503), httpx.Response(200, json=observation(19.07, 72.87))])
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: next(responses)))
+    monkeypatch.setattr(HttpClients, "get", classmethod(lambda cls, name: client))
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await DataProcessing(19.07, 72.87).process_data()
+        return await DataProcessing(19.07, 72.87).process_data()
+
+    assert asyncio.run(scenario())["outputs"][0]["weather"] == "Clear"
@@ -0,0 +1,88 @@
+# tests/test_weather_client.py
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.http import HttpClients
+from app.utils import weather
+from app.utils.weather import DataProcessing
+
+OK = {"count": 1, "data": []}
+
+
+@pytest.fixture
+def weatherbit(monkeypatch):
+    """
+    MockTransport Weatherbit replaying `script`: an int is a status code, an
+    exception class is raised as a transport error. Backoff sleeps are
+    recorded as (low, high) bounds and take no time.
+    """
+    state = {"script": [], "calls": 0, "backoff": []}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        step = state["script"][state["calls"]]
+        state["calls"] += 1
+        if isinstance(step, type):
+            raise step("injected", request=request)
+        return httpx.Response(step, json=OK if step == 200 else {"error": "injected"})
+
+    def uniform(low, high):
+        state["backoff"].append((low, high))
+        return 0.0
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(HttpClients, "get", classmethod(lambda cls, name: client))
+    monkeypatch.setattr(weather, "random", SimpleNamespace(uniform=uniform))
+    monkeypatch.setattr(settings, "WEATHER_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "WEATHER_RETRY_BACKOFF", 0.25)
+    return state
+
+
+def fetch():
+    return asyncio.run(DataProcessing(19.07, 72.87).fetch_data())
+
+
+def test_5xx_is_retried_with_exponential_backoff(weatherbit):
+    weatherbit["script"] = [503, 502, 200]
+
+    assert fetch() == OK
+    assert weatherbit["calls"] == 3
+    assert weatherbit["backoff"] == [(0, 0.25), (0, 0.5)]
+
+
+def test_transport_error_is_retried(weatherbit):
+    weatherbit["script"] = [httpx.ConnectError, httpx.ReadTimeout, 200]
+
+    assert fetch() == OK
+    assert weatherbit["calls"] == 3
+
+
+@pytest.mark.parametrize("status", [400, 401, 404, 429])
+def test_4xx_is_not_retried(weatherbit, status):
+    weatherbit["script"] = [status, 200]
+
+    with pytest.raises(RuntimeError, match=str(status)):
+        fetch()
+    assert weatherbit["calls"] == 1
+    assert weatherbit["backoff"] == []
+
+
+@pytest.mark.parametrize("failure", [503, httpx.ConnectError])
+def test_gives_up_after_max_retries(weatherbit, failure):
+    weatherbit["script"] = [failure] * 3 + [200]
+
+    with pytest.raises(RuntimeError, match="Fetching Data Error"):
+        fetch()
+    assert weatherbit["calls"] == settings.WEATHER_MAX_RETRIES + 1
+
+
+def test_no_retries_when_disabled(weatherbit, monkeypatch):
+    monkeypatch.setattr(settings, "WEATHER_MAX_RETRIES", 0)
+    weatherbit["script"] = [503, 200]
+
+    with pytest.raises(RuntimeError):
+        fetch()
+    assert weatherbit["calls"] == 1
@@ -0,0 +1,116 @@
+# tests/test_weather_processing.py
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.utils.heuristic_rule import HeuristicModel
+from app.utils.weather import DataProcessing
+
+
+def dataframe_process(rows: list) -> dict:
+    """The pandas implementation process_rows replaced, kept as the reference."""
+    df = pd.DataFrame(rows)
+    if "ts" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["ts"], unit="s")
+        df["hour"] = df["timestamp"].dt.hour
+        df["month"] = df["timestamp"].dt.month
+        df.drop(["ts", "timestamp"], axis=1, inplace=True)
+    if "weather" in df.columns:
+        df["weather"] = df["weather"].apply(lambda x: x["description"] if isinstance(x, dict) else x)
+
+    missing_input = [c for c in settings.INPUT_COLUMNS if c not in df.columns]
+    missing_output = [c for c in settings.OUTPUT_COLUMNS if c not in df.columns]
+    if missing_input:
+        raise ValueError(f"Missing input columns from API response: {missing_input}")
+    if missing_output:
+        raise ValueError(f"Missing output columns from API response: {missing_output}")
+    available_meta = [c for c in settings.META_DATA if c in df.columns]
+    return {
+        "inputs": df[settings.INPUT_COLUMNS].to_dict(orient="records"),
+        "outputs": df[settings.OUTPUT_COLUMNS].to_dict(orient="records"),
+        "metadata": df[available_meta].to_dict(orient="records"),
+    }
+
+
+def weather_row(i: int, **overrides) -> dict:
+    row = {
+        column: float(10 + i + n)
+        for n, column in enumerate(settings.INPUT_COLUMNS)
+        if column not in ("hour", "month")
+    }
+    row.update(
+        {
+            # Spread over hours, days and a year boundary
+            "ts": 1703980800 + i * 40_000,
+            "precip": 2.5 * i,
+            "weather": {"description": ["Light rain", "Clear", "Heavy rain"][i % 3], "code": 500, "icon": "r01d"},
+            "timezone": "Asia/Kolkata",
+            "sources": ["test"],
+            "country_code": "IN",
+            "city_name": "Mumbai",
+        }
+    )
+    row.update(overrides)
+    return row
+
+
+def assert_records_equal(actual: list, expected: list):
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert list(got) == list(want)
+        for key in want:
+            a, b = got[key], want[key]
+            if isinstance(b, float) and math.isnan(b):
+                assert isinstance(a, float) and math.isnan(a), key
+            else:
+                assert a == b, key
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        [weather_row(0)],
+        [weather_row(i) for i in range(6)],
+        # nulls next to numbers: pandas turns them into NaN
+        [weather_row(0, precip=None, rh=None), weather_row(1), weather_row(2, clouds=None)],
+        # plain-string weather is passed through
+        [weather_row(0, weather="Fog"), weather_row(1)],
+        # missing metadata columns are skipped
+        [{k: v for k, v in weather_row(i).items() if k not in ("sources", "city_name")} for i in range(2)],
+    ],
+    ids=["single", "multi", "nulls", "string_weather", "missing_meta"],
+)
+def test_process_rows_matches_dataframe_path(rows):
+    expected = dataframe_process(rows)
+    actual = DataProcessing.process_rows(rows)
+
+    assert_records_equal(actual["inputs"], expected["inputs"])
+    assert_records_equal(actual["outputs"], expected["outputs"])
+    assert_records_equal(actual["metadata"], expected["metadata"])
+
+    reference = pd.DataFrame(expected["inputs"]).astype("float32").to_numpy()
+    np.testing.assert_array_equal(actual["features"], reference)
+
+
+@pytest.mark.parametrize("dropped", ["wind_spd", "precip", "weather"])
+def test_missing_required_column_is_rejected_like_dataframe_path(dropped):
+    rows = [{k: v for k, v in weather_row(0).items() if k != dropped}]
+    with pytest.raises(ValueError) as expected:
+        dataframe_process(rows)
+    with pytest.raises(ValueError) as actual:
+        DataProcessing.process_rows(rows)
+    assert str(actual.value) == str(expected.value)
+
+
+def test_null_precip_reaches_rules_as_nan():
+    processed = DataProcessing.process_rows([weather_row(0, precip=None, rh=None)])
+    output, inputs = processed["outputs"][0], processed["inputs"][0]
+
+    assert math.isnan(output["precip"]) and math.isnan(inputs["rh"])
+    result = HeuristicModel.evaluate(
+        precip=output["precip"], weather=output["weather"], rh=inputs["rh"], blockage=0, blockage_prob=0.9
+    )
+    assert result["flood_risk"] == "High"
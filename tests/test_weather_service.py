@@ -0,0 +1,112 @@
+# tests/test_weather_service.py
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.core.cache import LRUCache, SingleFlight
+from app.core.config import settings
+from app.core.http import HttpClients
+from app.services import flood_service
+from app.services.weather_service import WeatherService
+
+
+@pytest.fixture
+def nominatim(monkeypatch):
+    """
+    Stub Nominatim: `delays` maps a latitude to seconds of latency and
+    `addresses` to a display_name (default: an address). Records send times.
+    """
+    state = {"delays": {}, "addresses": {}, "sent": []}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        lat = float(request.url.params["lat"])
+        state["sent"].append((lat, time.monotonic()))
+        await asyncio.sleep(state["delays"].get(lat, 0.0))
+        address = state["addresses"].get(lat, f"Ward {lat}, Mumbai")
+        return httpx.Response(200, json={"display_name": address, "address": {"city": "Mumbai" if address else ""}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(HttpClients, "get", classmethod(lambda cls, name: client))
+    monkeypatch.setattr(WeatherService, "cache", LRUCache(100, ttl=3600))
+    monkeypatch.setattr(WeatherService, "_flight", SingleFlight())
+    monkeypatch.setattr(WeatherService, "_next_slot", 0.0)
+    monkeypatch.setattr(settings, "GEOCODE_MIN_INTERVAL_SECONDS", 0.05)
+    return state
+
+
+def test_slow_call_does_not_hold_up_the_next(nominatim):
+    nominatim["delays"][19.0] = 1.0
+
+    async def scenario():
+        slow = asyncio.ensure_future(WeatherService.lookup(19.0, 72.8))
+        await asyncio.sleep(0)
+        start = time.monotonic()
+        await WeatherService.lookup(19.1, 72.8)
+        fast_s = time.monotonic() - start
+        await slow
+        return fast_s
+
+    assert asyncio.run(scenario()) < 0.5
+    (_, first), (_, second) = nominatim["sent"]
+    # Still paced by send time
+    assert second - first >= settings.GEOCODE_MIN_INTERVAL_SECONDS * 0.9
+
+
+def test_empty_result_uses_negative_ttl(nominatim, monkeypatch):
+    monkeypatch.setattr(settings, "GEOCODE_NEGATIVE_TTL_SECONDS", 0.1)
+    nominatim["addresses"][19.0] = ""
+
+    async def scenario():
+        await WeatherService.lookup(19.0, 72.8)
+        await WeatherService.lookup(19.1, 72.8)
+        await asyncio.sleep(0.2)
+
+    asyncio.run(scenario())
+    assert WeatherService.cache.get(WeatherService.bucket(19.0, 72.8)) is None
+    assert WeatherService.cache.get(WeatherService.bucket(19.1, 72.8))["address"] == "Ward 19.1, Mumbai"
+
+
+def test_prediction_path_falls_back_on_slow_lookup(nominatim, monkeypatch):
+    monkeypatch.setattr(settings, "GEOCODE_PREDICT_TIMEOUT_SECONDS", 0.1)
+    nominatim["delays"][19.0] = 0.3
+
+    async def scenario():
+        start = time.monotonic()
+        location = await flood_service._reverse_geocode(19.0, 72.8)
+        waited = time.monotonic() - start
+        await asyncio.sleep(0.4)  # the lookup carries on in the background
+        return location, waited
+
+    location, waited = asyncio.run(scenario())
+    assert waited < 0.25
+    assert location.city == "Unknown"
+    assert WeatherService.cache.get(WeatherService.bucket(19.0, 72.8))["address"] == "Ward 19.0, Mumbai"
+
+
+def test_cache_saved_periodically_while_new_entries_arrive(nominatim, monkeypatch, tmp_path):
+    path = tmp_path / "geocode.json"
+    monkeypatch.setattr(settings, "GEOCODE_CACHE_PATH", str(path))
+    monkeypatch.setattr(settings, "GEOCODE_CACHE_SAVE_SECONDS", 0.1)
+    monkeypatch.setattr(WeatherService, "_unsaved", 0)
+
+    async def scenario():
+        WeatherService.start()
+        try:
+            await WeatherService.lookup(19.0, 72.8)
+            await asyncio.sleep(0.3)
+            saved = json.loads(path.read_text(encoding="utf-8"))
+
+            # Nothing new since: the next ticks leave the file alone
+            path.unlink()
+            await asyncio.sleep(0.3)
+            return saved, path.exists()
+        finally:
+            await WeatherService.close()
+
+    saved, rewritten = asyncio.run(scenario())
+    assert [(key, value["address"]) for key, _, value in saved] == [([19.0, 72.8], "Ward 19.0, Mumbai")]
+    assert not rewritten
+    assert WeatherService._saver is None